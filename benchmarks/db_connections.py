@@ -0,0 +1,151 @@
+"""
+Database connection benchmark: the task and user list endpoints requested
+through the WSGI handler from `--threads` threads, the way a gthread gunicorn
+worker serves them, once per database configuration. Unlike the test client,
+the handler closes connections at the end of each request as production does,
+so DB_CONN_MAX_AGE and DB_POOL_SIZE take effect.
+
+Each configuration runs in a fresh process, since settings are read at start.
+SQLite stands in for MySQL unless DB_ENGINE=mysql and the DB_* connection
+variables are set; the replica configuration points its replica at the
+primary. Seed the database first:
+
+    python manage.py seed_benchmark_data --users 200 --tasks 20000
+    python benchmarks/db_connections.py --requests 2000 --threads 8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+PATHS = ['/task/tasks/?perPage=20', '/task/tasks/?perPage=20&pagination=cursor', '/auth/users?perPage=20']
+
+
+def configurations(threads):
+    if os.environ.get('DB_ENGINE', 'sqlite') == 'sqlite':
+        primary = os.environ.get('DB_NAME') or os.path.join(BASE_DIR, 'db.sqlite3')
+    else:
+        primary = os.environ.get('DB_HOST', 'localhost')
+    return {
+        'connection-per-request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL_SIZE': '0'},
+        'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL_SIZE': '0'},
+        'pooled': {'DB_CONN_MAX_AGE': '60', 'DB_POOL_SIZE': str(max(1, threads // 2))},
+        'persistent-replica': {'DB_CONN_MAX_AGE': '60', 'DB_POOL_SIZE': '0', 'DB_REPLICA_HOSTS': primary},
+    }
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+
+def measure(requests, threads, prefix):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('TIMEZONE', 'UTC')
+    # Cached pages would hide the database entirely.
+    os.environ['TASK_LIST_CACHE_TIMEOUT'] = '0'
+
+    import django
+    django.setup()
+
+    from wsgiref.util import setup_testing_defaults
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.db.backends.signals import connection_created
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from users.models import User
+
+    user = User.objects.filter(username__startswith=f'{prefix}-', is_superuser=True).first()
+    if user is None:
+        raise SystemExit(f"No \"{prefix}-*\" superuser found, run seed_benchmark_data first")
+    token   = str(RefreshToken.for_user(user).access_token)
+    host    = next((host for host in settings.ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')), 'localhost')
+    handler = get_wsgi_application()
+
+    opened, latencies, errors, lock = {}, [], [0], threading.Lock()
+
+    # Sent on every connect, including a pooled connection being handed out
+    # again; holding a reference keeps closed connections' ids from being reused.
+    def count_connection(sender, connection, **kwargs):
+        with lock:
+            opened[id(connection.connection)] = connection.connection
+    connection_created.connect(count_connection, weak=False)
+
+    def request(path):
+        url, _, query = path.partition('?')
+        environ = {'PATH_INFO': url, 'QUERY_STRING': query, 'HTTP_HOST': host, 'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        setup_testing_defaults(environ)
+        statuses = []
+        body = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+        for _ in body:
+            pass
+        body.close()
+        return statuses[0].startswith('200')
+
+    counter = iter(range(requests))
+
+    def worker():
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            sent = time.perf_counter()
+            ok   = request(PATHS[index % len(PATHS)])
+            elapsed = time.perf_counter() - sent
+            with lock:
+                latencies.append(elapsed)
+                errors[0] += not ok
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    seconds = time.perf_counter() - started
+
+    return {
+        'requests': requests,
+        'errors': errors[0],
+        'connections_opened': len(opened),
+        'rps': round(requests / seconds, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--prefix', default='bench')
+    parser.add_argument('--config', action='append', help="Run only these configurations")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.requests, args.threads, args.prefix)))
+        return
+
+    configs = configurations(args.threads)
+    results = {}
+    for name in args.config or configs:
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', name, '--requests', str(args.requests),
+             '--threads', str(args.threads), '--prefix', args.prefix],
+            env={**os.environ, **configs[name]}, capture_output=True, text=True, check=True
+        ).stdout
+        results[name] = {**json.loads(output.strip().splitlines()[-1]), 'env': configs[name]}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Closed-loop HTTP load test for the task and user read endpoints.
+
+Each of `--concurrency` threads sends requests back to back for `--duration`
+seconds. Run it against the WSGI and ASGI deployments started with the same
+worker count and compare requests/sec and tail latency:
+
+    docker compose up web web-asgi
+    python benchmarks/http_load.py --url http://localhost:8001 --url http://localhost:8002 \
+        --username admin --password secret --concurrency 64 --duration 30
+"""
+import json
+import time
+import argparse
+import threading
+import statistics
+
+import requests
+
+DEFAULT_PATHS = ['/task/tasks/?perPage=20', '/task/tasks/?perPage=20&pagination=cursor', '/auth/users?perPage=20']
+
+
+def login(base_url, username, password):
+    response = requests.post(f'{base_url}/auth/login', json={'username': username, 'password': password}, timeout=30)
+    response.raise_for_status()
+    return response.json()['data']['access']
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(base_url, token, paths, concurrency, duration, warmup):
+    latencies, errors, lock = [], [0], threading.Lock()
+    headers  = {'Authorization': f'Bearer {token}'}
+    started  = time.perf_counter()
+    deadline = started + warmup + duration
+
+    def worker(offset):
+        session = requests.Session()
+        sent    = offset
+        while (now := time.perf_counter()) < deadline:
+            path  = paths[sent % len(paths)]
+            sent += 1
+            try:
+                ok = session.get(base_url + path, headers=headers, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - now
+            if now - started < warmup:
+                continue
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        'url': base_url,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': round(len(latencies) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', action='append', required=True, help='Base URL of a deployment; repeat to compare')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--path', action='append', help='Path to request; repeat to mix (default: task and user lists)')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=20, help='Measured seconds per deployment')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before measuring')
+    args = parser.parse_args()
+
+    results = []
+    for base_url in args.url:
+        base_url = base_url.rstrip('/')
+        token    = login(base_url, args.username, args.password)
+        results.append(run(base_url, token, args.path or DEFAULT_PATHS, args.concurrency, args.duration, args.warmup))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
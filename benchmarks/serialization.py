@@ -0,0 +1,81 @@
+"""
+Microbenchmark for the list serialization path: DRF ModelSerializer plus the
+stock JSONRenderer against the compiled serializer plus FastJSONRenderer.
+
+Rows are built in memory, so no database is needed:
+
+    python benchmarks/serialization.py --rows 100 --repeat 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from decimal import Decimal
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('TIMEZONE', 'UTC')
+
+import django  # noqa: E402
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from users.models import User  # noqa: E402
+from task_management.models import Task  # noqa: E402
+from task_management.serializer import TaskSerializer, fast_task_serializer  # noqa: E402
+from utils.common import response_payload  # noqa: E402
+from utils.renderers import FastJSONRenderer  # noqa: E402
+
+
+def build_rows(count):
+    now   = timezone.now()
+    users = [
+        User(id=i, username=f'user{i}', email=f'user{i}@example.com', first_name='First', last_name='Last', is_staff=i == 0)
+        for i in range(10)
+    ]
+    return [
+        Task(
+            id=i, title=f'Task {i}', description='Some description of the work to do',
+            assigned_to=users[i % 10], assigned_by=users[0], due_date=date(2030, 1, 1) + timedelta(days=i),
+            status='pending', completion_report=None if i % 2 else 'Done', worked_hours=Decimal('1.50') if i % 3 else None,
+            created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(serialize, renderer, rows, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        body = renderer.render(response_payload(True, "Tasks list retrieved successfully", serialize(rows)))
+    elapsed = time.perf_counter() - started
+    return body, round(len(rows) * repeat / elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100, help='Rows per page')
+    parser.add_argument('--repeat', type=int, default=200, help='Pages rendered per variant')
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    drf_body, drf_rate = measure(lambda page: TaskSerializer(page, many=True).data, JSONRenderer(), rows, args.repeat)
+    fast_body, fast_rate = measure(fast_task_serializer.many, FastJSONRenderer(), rows, args.repeat)
+
+    print(json.dumps({
+        'rows_per_page': args.rows,
+        'pages': args.repeat,
+        'drf_rows_per_sec': drf_rate,
+        'fast_rows_per_sec': fast_rate,
+        'speedup': round(fast_rate / drf_rate, 2),
+        'identical_output': drf_body == fast_body,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,3 +8,54 @@ TIMEZONE: str    = os.getenv('TIMEZONE')
 SECRET_KEY : str     = os.getenv('SECRET_KEY')
 ALLOWED_HOSTS: list  = [host.strip() for host in os.getenv('APP_URL', 'localhost').split(',')]
 DEBUG : bool         = os.getenv('DEBUG')
+
+DB_ENGINE: str              = os.getenv('DB_ENGINE', 'sqlite')
+DB_NAME: str                = os.getenv('DB_NAME', '')
+DB_USER: str                = os.getenv('DB_USER', '')
+DB_PASSWORD: str            = os.getenv('DB_PASSWORD', '')
+DB_HOST: str                = os.getenv('DB_HOST', '')
+DB_PORT: str                = os.getenv('DB_PORT', '')
+DB_REPLICA_HOSTS: list      = [host.strip() for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+DB_REPLICA_MAX_LAG: int     = int(os.getenv('DB_REPLICA_MAX_LAG', 5))
+DB_CONN_MAX_AGE: int        = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_CONN_HEALTH_CHECKS: bool = os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes')
+DB_POOL_SIZE: int           = int(os.getenv('DB_POOL_SIZE', 0))
+DB_POOL_TIMEOUT: float      = float(os.getenv('DB_POOL_TIMEOUT', 10))
+
+AUTH_CACHE_SIZE: int = int(os.getenv('AUTH_CACHE_SIZE', 1024))
+AUTH_CACHE_TTL: int  = int(os.getenv('AUTH_CACHE_TTL', 60))
+AUTH_REVOCATION_REFRESH_SECONDS: float = float(os.getenv('AUTH_REVOCATION_REFRESH_SECONDS', 2))
+
+PASSWORD_HASHER: str         = os.getenv('PASSWORD_HASHER', 'scrypt')
+LOGIN_HASH_WORKERS: int      = int(os.getenv('LOGIN_HASH_WORKERS', os.cpu_count() or 2))
+LOGIN_HASH_QUEUE: int        = int(os.getenv('LOGIN_HASH_QUEUE', 64))
+LOGIN_MAX_ACCOUNT_FAILURES: int = int(os.getenv('LOGIN_MAX_ACCOUNT_FAILURES', 5))
+LOGIN_MAX_IP_FAILURES: int   = int(os.getenv('LOGIN_MAX_IP_FAILURES', 50))
+LOGIN_THROTTLE_WINDOW: int   = int(os.getenv('LOGIN_THROTTLE_WINDOW', 300))
+
+REDIS_URL: str               = os.getenv('REDIS_URL', '')
+TASK_LIST_CACHE_TIMEOUT: int = int(os.getenv('TASK_LIST_CACHE_TIMEOUT', 300))
+TASK_EVENTS_BACKEND: str     = os.getenv('TASK_EVENTS_BACKEND', '')
+TASK_EVENTS_KEEPALIVE: float = float(os.getenv('TASK_EVENTS_KEEPALIVE', 15))
+TASK_EVENTS_QUEUE_SIZE: int  = int(os.getenv('TASK_EVENTS_QUEUE_SIZE', 100))
+
+SERVER_TIMING: bool  = os.getenv('SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+SLOW_REQUEST_MS: int = int(os.getenv('SLOW_REQUEST_MS', 0))
+METRICS_TOKEN: str   = os.getenv('METRICS_TOKEN', '')
+
+ASYNC_VIEWS: bool = os.getenv('ASYNC_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+
+TASK_TOMBSTONE_RETENTION_DAYS: int = int(os.getenv('TASK_TOMBSTONE_RETENTION_DAYS', 30))
+TASK_ARCHIVE_AFTER_DAYS: int       = int(os.getenv('TASK_ARCHIVE_AFTER_DAYS', 90))
+TASK_ARCHIVE_BATCH_SIZE: int       = int(os.getenv('TASK_ARCHIVE_BATCH_SIZE', 1000))
+TASK_AUDIT_BUFFER_SIZE: int        = int(os.getenv('TASK_AUDIT_BUFFER_SIZE', 100))
+TASK_AUDIT_FLUSH_SECONDS: float    = float(os.getenv('TASK_AUDIT_FLUSH_SECONDS', 5))
+
+MEDIA_ROOT: str                = os.getenv('MEDIA_ROOT', '')
+JOBS_WORKER_CONCURRENCY: int   = int(os.getenv('JOBS_WORKER_CONCURRENCY', 4))
+JOBS_WORKER_POOL: str          = os.getenv('JOBS_WORKER_POOL', 'thread')
+JOBS_POLL_INTERVAL: float      = float(os.getenv('JOBS_POLL_INTERVAL', 1.0))
+JOBS_MAX_ATTEMPTS: int         = int(os.getenv('JOBS_MAX_ATTEMPTS', 3))
+JOBS_RETRY_BACKOFF: float      = float(os.getenv('JOBS_RETRY_BACKOFF', 5))
+JOBS_RETRY_MAX_DELAY: float    = float(os.getenv('JOBS_RETRY_MAX_DELAY', 600))
+JOBS_LOCK_TIMEOUT: int         = int(os.getenv('JOBS_LOCK_TIMEOUT', 600))
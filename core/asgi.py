@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Needs the app registry, which get_asgi_application() has just populated.
+from task_management.events import TaskEventStream  # noqa: E402
+
+# /task/tasks/events streams task changes; everything else goes to Django.
+application = TaskEventStream(django_application)
@@ -43,10 +43,12 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'task_management',
-    'users'
+    'users',
+    'jobs'
 ]
 
 MIDDLEWARE = [
+    'utils.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -80,16 +82,87 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+# DB_ENGINE=sqlite (the default) uses DB_NAME or db.sqlite3; DB_ENGINE=mysql
+# connects to DB_HOST. Each thread keeps its connection for DB_CONN_MAX_AGE
+# seconds, checked before reuse. With DB_POOL_SIZE set, connections instead go
+# back to a pool of that size shared by the process's threads at the end of
+# each request, and DB_CONN_MAX_AGE is how long a pooled one is reused (see
+# utils/db/pool.py). Every DB_REPLICA_HOSTS entry (a file for SQLite) becomes
+# a replica_<n> alias that replica-routed reads are spread over.
+DATABASE_ENGINES = {
+    'sqlite': 'utils.db.sqlite3',
+    'mysql': 'utils.db.mysql',
 }
 
+
+def database(host=None):
+    settings = {
+        'ENGINE': DATABASE_ENGINES[config.DB_ENGINE],
+        'CONN_MAX_AGE': 0 if config.DB_POOL_SIZE else config.DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': config.DB_CONN_HEALTH_CHECKS,
+        'POOL_SIZE': config.DB_POOL_SIZE,
+        'POOL_TIMEOUT': config.DB_POOL_TIMEOUT,
+        'POOL_RECYCLE': config.DB_CONN_MAX_AGE,
+    }
+    if config.DB_ENGINE == 'sqlite':
+        settings['NAME'] = host or config.DB_NAME or BASE_DIR / 'db.sqlite3'
+    else:
+        settings.update({
+            'NAME': config.DB_NAME,
+            'USER': config.DB_USER,
+            'PASSWORD': config.DB_PASSWORD,
+            'HOST': host or config.DB_HOST,
+            'PORT': config.DB_PORT,
+            'OPTIONS': {'charset': 'utf8mb4'},
+        })
+    return settings
+
+
+DATABASES = {'default': database()}
+for index, host in enumerate(config.DB_REPLICA_HOSTS):
+    DATABASES[f'replica_{index}'] = {**database(host), 'TEST': {'MIRROR': 'default'}}
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS  = ['utils.db.router.ReplicaRouter']
+# Seconds a replica may trail the primary; bounds how long pages read from one are cached
+DATABASE_REPLICA_MAX_LAG = config.DB_REPLICA_MAX_LAG
+
+# Cache
+# Local memory per process by default; set REDIS_URL to share one Redis cache
+# between workers (needs the redis package).
+
+if config.REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config.REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+# The first hasher hashes new passwords; the rest only verify existing hashes,
+# which are upgraded to the first one on the next successful login.
+# PASSWORD_HASHER=argon2 needs the argon2-cffi package.
+PASSWORD_HASHER_CLASSES = {
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[config.PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CLASSES.items() if name != config.PASSWORD_HASHER
+]
+
+AUTHENTICATION_BACKENDS = ['users.backends.PooledModelBackend']
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -123,6 +196,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded imports and finished exports of background jobs; shared by web and worker
+MEDIA_ROOT = config.MEDIA_ROOT or BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -130,10 +206,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.middleware.UserJWTAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'utils.renderers.FastJSONRenderer',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated', 
@@ -153,3 +229,62 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'TOKEN_USER_CLASS': 'django.contrib.auth.get_user_model',
 }
+
+# Verified access token -> user cache used by JWTAuthenticationMiddleware
+AUTH_CACHE_SIZE = config.AUTH_CACHE_SIZE
+AUTH_CACHE_TTL  = config.AUTH_CACHE_TTL
+
+# How often each process reads new access token revocations; 0 reads them on every request
+AUTH_REVOCATION_REFRESH_SECONDS = config.AUTH_REVOCATION_REFRESH_SECONDS
+
+# Deleted-task records kept for the task changes feed; older sync tokens must resync
+TASK_TOMBSTONE_RETENTION_DAYS = config.TASK_TOMBSTONE_RETENTION_DAYS
+
+# Completed tasks not updated for this long are moved to tasks_archive by
+# `manage.py archive_tasks`, TASK_ARCHIVE_BATCH_SIZE rows per transaction.
+TASK_ARCHIVE_AFTER_DAYS = config.TASK_ARCHIVE_AFTER_DAYS
+TASK_ARCHIVE_BATCH_SIZE = config.TASK_ARCHIVE_BATCH_SIZE
+
+# Task audit entries are buffered per process and written in batches of this
+# many, or at the end of a request once the oldest is this many seconds old.
+TASK_AUDIT_BUFFER_SIZE = config.TASK_AUDIT_BUFFER_SIZE
+TASK_AUDIT_FLUSH_SECONDS = config.TASK_AUDIT_FLUSH_SECONDS
+
+# Route task and user reads to the async views; enable when serving core.asgi
+ASYNC_VIEWS = config.ASYNC_VIEWS
+
+# Login: password hashing pool and failed-attempt throttling; the failure
+# counts are only shared between workers with REDIS_URL
+LOGIN_HASH_WORKERS         = config.LOGIN_HASH_WORKERS
+LOGIN_HASH_QUEUE           = config.LOGIN_HASH_QUEUE
+LOGIN_MAX_ACCOUNT_FAILURES = config.LOGIN_MAX_ACCOUNT_FAILURES
+LOGIN_MAX_IP_FAILURES      = config.LOGIN_MAX_IP_FAILURES
+LOGIN_THROTTLE_WINDOW      = config.LOGIN_THROTTLE_WINDOW
+
+# Task list response cache; a timeout of 0 disables it. Every process that
+# writes tasks (each web worker, the job worker) must bump the same generation
+# tokens, so without the shared Redis cache it stays off.
+TASK_LIST_CACHE_ALIAS   = 'default'
+TASK_LIST_CACHE_TIMEOUT = config.TASK_LIST_CACHE_TIMEOUT if config.REDIS_URL else 0
+
+# Task change event streams (task_management.events, served by core.asgi).
+# Without Redis only streams in the process that made a change receive it.
+TASK_EVENTS_BACKEND    = config.TASK_EVENTS_BACKEND or (
+    'task_management.events.RedisBackend' if config.REDIS_URL else 'task_management.events.LocalBackend'
+)
+TASK_EVENTS_KEEPALIVE  = config.TASK_EVENTS_KEEPALIVE
+TASK_EVENTS_QUEUE_SIZE = config.TASK_EVENTS_QUEUE_SIZE
+
+# Request instrumentation (utils.middleware.PerformanceMiddleware, /metrics)
+SERVER_TIMING   = config.SERVER_TIMING
+SLOW_REQUEST_MS = config.SLOW_REQUEST_MS
+METRICS_TOKEN   = config.METRICS_TOKEN
+
+# Background jobs (jobs app, `manage.py run_jobs`)
+JOBS_WORKER_CONCURRENCY = config.JOBS_WORKER_CONCURRENCY
+JOBS_WORKER_POOL        = config.JOBS_WORKER_POOL
+JOBS_POLL_INTERVAL      = config.JOBS_POLL_INTERVAL
+JOBS_MAX_ATTEMPTS       = config.JOBS_MAX_ATTEMPTS
+JOBS_RETRY_BACKOFF      = config.JOBS_RETRY_BACKOFF
+JOBS_RETRY_MAX_DELAY    = config.JOBS_RETRY_MAX_DELAY
+JOBS_LOCK_TIMEOUT       = config.JOBS_LOCK_TIMEOUT
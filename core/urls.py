@@ -16,9 +16,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include 
+from utils.views import metrics
 
 urlpatterns = [
     path('admin', admin.site.urls),
     path('auth', include('users.urls')),
     path('task', include('task_management.urls')),
+    path('jobs', include('jobs.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import Worker
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the jobs table until stopped with SIGTERM or Ctrl-C."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help="Worker threads or processes (default: JOBS_WORKER_CONCURRENCY)")
+        parser.add_argument('--pool', choices=('thread', 'process'), help="Default: JOBS_WORKER_POOL")
+        parser.add_argument('--poll-interval', type=float, help="Seconds between polls of an empty queue")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due")
+
+    def handle(self, *args, **options):
+        worker = Worker(options['concurrency'], options['pool'], options['poll_interval'], options['burst'])
+        self.stdout.write(f"Running jobs with {worker.concurrency} {worker.pool} worker(s)")
+        worker.run()
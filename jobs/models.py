@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils import timezone
+from users.models import User
+
+
+class Job(models.Model):
+    """
+    A unit of background work run by the `run_jobs` worker. `kind` names the
+    handler registered with jobs.queue.job_handler and `payload` holds its
+    arguments; `result` is what the handler returned.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed')
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    progress_done = models.PositiveBigIntegerField(default=0)
+    progress_total = models.PositiveBigIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    def report_progress(self, done, total=None):
+        """
+        Record progress from inside a handler. Also refreshes locked_at, which
+        keeps a long job from being taken for one whose worker died.
+        """
+        self.progress_done = done
+        if total is not None:
+            self.progress_total = total
+        Job.objects.filter(pk=self.pk).update(
+            progress_done=self.progress_done,
+            progress_total=self.progress_total,
+            locked_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+
+    class Meta:
+        db_table = "jobs"
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='jobs_status_run_after_idx'),
+            models.Index(fields=['status', 'locked_at'], name='jobs_status_locked_idx'),
+        ]
@@ -0,0 +1,210 @@
+"""
+Database-backed job queue. Views enqueue a Job row, and `manage.py run_jobs`
+workers claim queued rows with SELECT ... FOR UPDATE SKIP LOCKED, so any number
+of workers can poll the same table without a broker. A failed job is queued
+again with exponential backoff until it runs out of attempts.
+"""
+import os
+import socket
+import signal
+import logging
+import threading
+import traceback
+import multiprocessing
+from contextlib import nullcontext
+from datetime import timedelta
+
+from tenacity import RetryCallState, wait_random_exponential
+from django.conf import settings
+from django.db import connection, connections, transaction, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('jobs')
+
+HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help, e.g. the input is invalid."""
+
+
+def job_handler(kind, max_attempts=None):
+    """
+    Register `func(job)` to run jobs of `kind`; its return value, which must be
+    JSON serializable, is stored as the job's result. Handlers that are not safe
+    to run twice, such as inserts committed in chunks, should pass max_attempts=1.
+    """
+    def register(func):
+        HANDLERS[kind] = (func, max_attempts)
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, user=None, max_attempts=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"No handler is registered for job kind \"{kind}\"")
+    default_attempts = HANDLERS[kind][1] or settings.JOBS_MAX_ATTEMPTS
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts or default_attempts
+    )
+
+
+def retry_delay(attempt):
+    """Seconds to wait before retrying after `attempt` failed: full-jitter exponential backoff."""
+    backoff = wait_random_exponential(multiplier=settings.JOBS_RETRY_BACKOFF, max=settings.JOBS_RETRY_MAX_DELAY)
+    state   = RetryCallState(None, None, (), {})
+    state.attempt_number = attempt
+    return backoff(state)
+
+
+def claim(worker_id):
+    """Lock and mark running the next due job, or return None when there is none."""
+    now  = timezone.now()
+    due  = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    lock = connection.features.has_select_for_update
+    # Without row locks (SQLite) a read-then-write transaction cannot upgrade its
+    # lock under contention; there the conditional update alone settles races.
+    with transaction.atomic() if lock else nullcontext():
+        if lock:
+            due = due.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+        job = due.first()
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status='queued').update(
+            status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1, updated_at=now
+        )
+    if not claimed:
+        return None
+    job.status, job.locked_by, job.locked_at, job.attempts = 'running', worker_id, now, job.attempts + 1
+    return job
+
+
+def run(job):
+    """Run a claimed job and record its outcome."""
+    func, _ = HANDLERS.get(job.kind, (None, None))
+    try:
+        if func is None:
+            raise PermanentJobError(f"No handler is registered for job kind \"{job.kind}\"")
+        result = func(job)
+    except Exception as e:
+        retry = not isinstance(e, PermanentJobError) and job.attempts < job.max_attempts
+        job.error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        logger.warning("Job %s failed on attempt %d/%d%s", job, job.attempts, job.max_attempts,
+                       ", retrying" if retry else "", exc_info=not isinstance(e, PermanentJobError))
+        if retry:
+            job.status    = 'queued'
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status      = 'failed'
+            job.finished_at = timezone.now()
+        job.locked_by = job.locked_at = None
+        job.save(update_fields=['status', 'error', 'run_after', 'finished_at', 'locked_by', 'locked_at', 'updated_at'])
+        return job
+
+    job.status, job.result, job.finished_at = 'succeeded', result, timezone.now()
+    job.locked_by = job.locked_at = None
+    if job.progress_total is not None:
+        job.progress_done = job.progress_total
+    job.save(update_fields=['status', 'result', 'finished_at', 'locked_by', 'locked_at', 'progress_done', 'updated_at'])
+    return job
+
+
+def requeue_stale():
+    """Queue again the running jobs whose worker stopped reporting, or fail them when out of attempts."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    stale  = Job.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', error="Worker stopped while running the job", finished_at=timezone.now(),
+        locked_by=None, locked_at=None
+    )
+    queued = stale.update(status='queued', run_after=timezone.now(), locked_by=None, locked_at=None)
+    return queued + failed
+
+
+def drain(worker_id='inline'):
+    """Run due jobs in the calling thread until none are left; returns how many ran."""
+    count = 0
+    while (job := claim(worker_id)) is not None:
+        run(job)
+        count += 1
+    return count
+
+
+class Worker:
+    """
+    Polls for jobs with `concurrency` threads, or `concurrency` forked processes
+    when pool is 'process' (for CPU-bound handlers). SIGTERM and SIGINT let the
+    running jobs finish before exiting. With burst=True the worker exits once
+    the queue is empty.
+    """
+
+    def __init__(self, concurrency=None, pool=None, poll_interval=None, burst=False):
+        self.concurrency   = concurrency or settings.JOBS_WORKER_CONCURRENCY
+        self.pool          = pool or settings.JOBS_WORKER_POOL
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOBS_POLL_INTERVAL
+        self.burst         = burst
+        self.stopping      = threading.Event()
+        self.name          = f'{socket.gethostname()}:{os.getpid()}'
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def loop(self, worker_id):
+        while not self.stopping.is_set():
+            close_old_connections()
+            try:
+                job = claim(worker_id)
+                if job is not None:
+                    run(job)
+                    continue
+                requeue_stale()
+            except Exception:
+                logger.exception("Worker %s could not claim a job", worker_id)
+            if self.burst:
+                break
+            self.stopping.wait(self.poll_interval)
+        connections.close_all()
+
+    def run_threads(self, prefix):
+        threads = [
+            threading.Thread(target=self.loop, args=(f'{prefix}/{index}',), name=f'job-worker-{index}')
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if self.pool == 'thread':
+            self.run_threads(self.name)
+            return
+
+        # Forked children must not share the parent's database connections.
+        connections.close_all()
+        context   = multiprocessing.get_context('fork')
+        processes = [context.Process(target=self._child, args=(index,)) for index in range(self.concurrency)]
+        for process in processes:
+            process.start()
+        while any(process.is_alive() for process in processes):
+            if self.stopping.wait(0.5):
+                for process in processes:
+                    if process.is_alive():
+                        process.terminate()
+                break
+        for process in processes:
+            process.join()
+
+    def _child(self, index):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        self.loop(f'{self.name}/p{index}:{os.getpid()}')
+
@@ -0,0 +1,23 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'kind',
+            'status',
+            'attempts',
+            'max_attempts',
+            'progress_done',
+            'progress_total',
+            'result',
+            'error',
+            'run_after',
+            'created_at',
+            'updated_at',
+            'finished_at'
+        ]
+        read_only_fields = fields
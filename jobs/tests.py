@@ -0,0 +1,159 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+from task_management.cache import task_list_cache
+from task_management.models import Task
+from .models import Job
+from .queue import job_handler, enqueue, claim, run, drain, requeue_stale, PermanentJobError
+
+failures = {'tests.flaky': 1}
+
+
+@job_handler('tests.flaky', max_attempts=3)
+def flaky(job):
+    if failures['tests.flaky'] > 0:
+        failures['tests.flaky'] -= 1
+        raise ConnectionError("database went away")
+    return {'ok': True}
+
+
+@job_handler('tests.invalid')
+def invalid(job):
+    raise PermanentJobError("bad input")
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        failures['tests.flaky'] = 1
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        job = enqueue('tests.flaky')
+        with self.assertLogs('jobs', 'WARNING'):
+            self.assertEqual(drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertGreater(job.run_after, timezone.now() - timedelta(seconds=1))
+        self.assertIn('database went away', job.error)
+
+        # Not due yet, so a worker leaves it alone.
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now() + timedelta(hours=1))
+        self.assertEqual(drain(), 0)
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertEqual(drain(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), ('succeeded', 2, {'ok': True}))
+
+    def test_jobs_fail_when_out_of_attempts_or_permanently(self):
+        failures['tests.flaky'] = 5
+        flaky_job = enqueue('tests.flaky', max_attempts=1)
+        invalid_job = enqueue('tests.invalid')
+        with self.assertLogs('jobs', 'WARNING'):
+            drain()
+        flaky_job.refresh_from_db()
+        invalid_job.refresh_from_db()
+        self.assertEqual((flaky_job.status, flaky_job.attempts), ('failed', 1))
+        self.assertEqual((invalid_job.status, invalid_job.attempts), ('failed', 1))
+        self.assertIsNotNone(invalid_job.finished_at)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = enqueue('tests.flaky')
+        self.assertEqual(claim('worker-1').pk, job.pk)
+        self.assertIsNone(claim('worker-2'))
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_jobs_of_dead_workers_are_requeued(self):
+        job = enqueue('tests.flaky')
+        claim('worker-1')
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(requeue_stale(), 1)
+        failures['tests.flaky'] = 0
+        run(claim('worker-2'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('succeeded', 2))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskJobTests(TestCase):
+    """Long task operations answer 202 with a job and the worker produces the same result."""
+
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        media = override_settings(MEDIA_ROOT=self.media)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.superuser = User.objects.create_user(username='root', email='root@example.com', password='secret', is_staff=True, is_superuser=True)
+        self.member    = User.objects.create_user(username='member', email='member@example.com', password='secret')
+        Task.objects.bulk_create(
+            Task(title=f'Task {i}', description='d', assigned_to=self.member, assigned_by=self.superuser, due_date=date(2030, 1, 1), status='pending')
+            for i in range(5)
+        )
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.superuser).access_token}', 'HTTP_PREFER': 'respond-async'}
+
+    def accepted_job(self, response):
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'], reverse('job-detail', args=[response.json()['data']['job_id']]))
+        self.assertEqual(drain(), 1)
+        return self.client.get(response['Location'], **self.headers).json()['data']
+
+    def test_export_runs_in_the_background(self):
+        job = self.accepted_job(self.client.get(reverse('task-export'), {'fileType': 'csv'}, **self.headers))
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual((job['progress_done'], job['progress_total']), (5, 5))
+
+        download = self.client.get(job['download_url'], **self.headers)
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(len(b''.join(download.streaming_content).decode().strip().splitlines()), 6)
+
+    def test_import_runs_in_the_background(self):
+        upload = SimpleUploadedFile('tasks.csv', b'title,description,assigned_to,due_date\nA,a,member,2030-01-01\nB,b,nobody,2030-01-01\n')
+        job = self.accepted_job(self.client.post(reverse('task-import'), {'file': upload}, **self.headers))
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual((job['result']['created'], len(job['result']['errors'])), (1, 1))
+        self.assertEqual(Task.objects.count(), 6)
+
+    def test_bulk_update_runs_in_the_background(self):
+        items = [{'id': pk, 'status': 'paused'} for pk in Task.objects.values_list('id', flat=True)]
+        job = self.accepted_job(self.client.patch(reverse('task-bulk'), items, content_type='application/json', **self.headers))
+        self.assertEqual((job['status'], job['result']['failed']), ('succeeded', 0))
+        self.assertEqual(Task.objects.filter(status='paused').count(), 5)
+
+    def test_bulk_update_invalidates_cached_task_lists(self):
+        # The job worker is another process: it must bump the generations in the
+        # cache the web workers read, which is why the list cache needs REDIS_URL.
+        url    = reverse('task-list-create')
+        member = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.member).access_token}'}
+        with mock.patch.object(task_list_cache, 'timeout', 300):
+            self.client.get(url, **member)
+            with self.assertNumQueries(0):
+                self.client.get(url, **member)
+
+            items    = [{'id': pk, 'status': 'paused'} for pk in Task.objects.values_list('id', flat=True)]
+            response = self.client.patch(reverse('task-bulk'), items, content_type='application/json', **self.headers)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.accepted_job(response)
+
+            statuses = {task['status'] for task in self.client.get(url, **member).json()['data']}
+        self.assertEqual(statuses, {'paused'})
+
+    def test_rollup_rebuild_is_queued(self):
+        job = self.accepted_job(self.client.post(reverse('task-stats-rebuild'), **self.headers))
+        self.assertEqual(job['status'], 'succeeded')
+
+    def test_jobs_are_private_to_their_creator(self):
+        response = self.client.get(reverse('task-export'), **self.headers)
+        member   = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.member).access_token}'}
+        self.assertEqual(self.client.get(response['Location'], **member).status_code, 404)
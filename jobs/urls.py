@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('/<int:pk>', views.JobAPIView.as_view(), name='job-detail'),
+    path('/<int:pk>/download', views.JobDownloadAPIView.as_view(), name='job-download'),
+]
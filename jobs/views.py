@@ -0,0 +1,69 @@
+import os
+
+from rest_framework import status
+from django.urls import reverse
+from django.http import FileResponse
+from django.core.files.storage import default_storage
+
+from utils.common import BaseAPIView, CommonUtils
+from .models import Job
+from .serializer import JobSerializer
+
+
+def visible_jobs(user):
+    jobs = Job.objects.all()
+    return jobs if user.is_superuser else jobs.filter(created_by=user)
+
+
+class BackgroundJobMixin:
+    """
+    For views that can hand long operations to the job queue. A client asks for
+    that with `Prefer: respond-async` (RFC 7240) and gets 202 with the job id and
+    a Location header pointing at the job status endpoint.
+    """
+
+    def wants_background(self, request):
+        preferences = request.headers.get('Prefer', '')
+        return 'respond-async' in (preference.strip().lower() for preference in preferences.split(','))
+
+    def _job_accepted(self, job, message="Job queued"):
+        status_url = reverse('job-detail', args=[job.pk])
+        return self._format_response(
+            True,
+            message,
+            {'job_id': job.pk, 'status': job.status, 'status_url': status_url},
+            status.HTTP_202_ACCEPTED,
+            headers={'Location': status_url}
+        )
+
+
+class JobAPIView(BaseAPIView):
+    """Status and progress of a background job, visible to the user who queued it."""
+    commonUtils = CommonUtils()
+
+    def get(self, request, pk):
+        job = self.commonUtils.get_object(visible_jobs(request.user), pk)
+        data = JobSerializer(job).data
+        if job.status == 'succeeded' and isinstance(job.result, dict) and job.result.get('file'):
+            data['download_url'] = reverse('job-download', args=[job.pk])
+        return self._format_response(True, "Job retrieved successfully", data)
+
+
+class JobDownloadAPIView(BaseAPIView):
+    """The file a succeeded job produced, such as a task export."""
+    commonUtils = CommonUtils()
+
+    def get(self, request, pk):
+        job    = self.commonUtils.get_object(visible_jobs(request.user), pk)
+        result = job.result if isinstance(job.result, dict) else {}
+        if job.status != 'succeeded' or not result.get('file'):
+            return self._format_response(False, "This job has no file to download", None, status.HTTP_404_NOT_FOUND)
+        if not default_storage.exists(result['file']):
+            return self._format_response(False, "The job's file has been removed", None, status.HTTP_410_GONE)
+
+        return FileResponse(
+            default_storage.open(result['file'], 'rb'),
+            as_attachment=True,
+            filename=result.get('filename') or os.path.basename(result['file']),
+            content_type=result.get('content_type')
+        )
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class TaskManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_management'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from utils.metrics import registry
+        from . import signals  # noqa: F401
+        from .cache import task_list_cache
+        from .events import task_events
+        from .audit import audit_log
+        from .search import repair_search_index
+
+        post_migrate.connect(repair_search_index, sender=self)
+        registry.register_collector(lambda: [
+            ('task_list_cache_hits_total', 'counter', 'Task list response cache hits', task_list_cache.hits),
+            ('task_list_cache_misses_total', 'counter', 'Task list response cache misses', task_list_cache.misses),
+            ('task_event_streams', 'gauge', 'Open task event streams', task_events.stats()['streams']),
+            ('task_events_delivered_total', 'counter', 'Task events delivered to streams', task_events.delivered),
+            ('task_audit_buffered', 'gauge', 'Task audit entries waiting to be written', audit_log.stats()['buffered']),
+            ('task_audit_written_total', 'counter', 'Task audit entries written', audit_log.written),
+        ])
@@ -0,0 +1,80 @@
+"""
+Moves completed tasks out of the hot tasks table into tasks_archive, so the
+table behind every list, count and index stays proportional to live work.
+
+archive_tasks() walks the completed tasks not updated for `older_than` in id
+order and moves them `batch_size` at a time, each batch in its own short
+transaction: copy the rows, then delete them from tasks. The delete is raw, so
+no delete signals fire: an archived task is not gone, it is read with
+`?archived=` on the task list, and the rollups and counters keep counting it.
+Only the task list cache is told, through the tasks_archived signal.
+"""
+import time
+
+from django.db import transaction, connections
+from django.utils import timezone
+
+from .models import Task, ArchivedTask
+from .signals import tasks_archived
+
+ARCHIVED_FIELDS = [field.attname for field in Task._meta.concrete_fields]
+
+
+class _BatchChanged(Exception):
+    """A task in the batch was updated between being read and being deleted."""
+
+
+def archivable(older_than):
+    return Task.objects.filter(status='completed', updated_at__lt=timezone.now() - older_than)
+
+
+def archive_batch(candidates, after, batch_size):
+    """
+    Move the next `batch_size` candidates with an id above `after`. Returns
+    the ids moved; none means there is nothing left to move.
+    """
+    connection = connections[candidates.db]
+    with transaction.atomic(using=candidates.db):
+        batch = candidates.filter(id__gt=after).order_by('id')
+        if connection.features.has_select_for_update:
+            # Rows locked by a concurrent update are left for the next run.
+            batch = batch.select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+        rows = list(batch.values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return []
+
+        now = timezone.now()
+        ids = [row['id'] for row in rows]
+        ArchivedTask.objects.using(candidates.db).bulk_create([ArchivedTask(archived_at=now, **row) for row in rows])
+        # Without row locks (SQLite) a row may have changed since it was read;
+        # the filters are applied again and a mismatch rolls the batch back.
+        deleted = candidates.filter(id__in=ids)._raw_delete(candidates.db)
+        if deleted != len(ids):
+            raise _BatchChanged
+        tasks_archived.send(sender=Task, states=[{field: row[field] for field in Task.TRACKED_FIELDS} for row in rows])
+    return ids
+
+
+def archive_tasks(older_than, batch_size=1000, pause=0, limit=None, progress=None):
+    """
+    Archive the completed tasks not updated for `older_than` (a timedelta),
+    sleeping `pause` seconds between batches so replicas and concurrent
+    writers keep up. Stops after about `limit` tasks when given; returns how
+    many were moved. `progress(moved)` is called after every batch.
+    """
+    candidates = archivable(older_than)
+    moved, after = 0, 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        try:
+            ids = archive_batch(candidates, after, size)
+        except _BatchChanged:
+            continue
+        if not ids:
+            break
+        moved, after = moved + len(ids), ids[-1]
+        if progress:
+            progress(moved)
+        if pause:
+            time.sleep(pause)
+    return moved
@@ -0,0 +1,111 @@
+"""
+Who-changed-what trail of task updates in the task_audit_log table, written
+without an INSERT on the request path.
+
+The update paths diff each task against its validated data (TaskSerializer
+.update() and bulk.update_tasks()) and hand the entries to the process's
+AuditBuffer once the update commits. The buffer writes them with one
+bulk_create when it holds TASK_AUDIT_BUFFER_SIZE entries, or at the end of a
+request once its oldest entry is TASK_AUDIT_FLUSH_SECONDS old; request_finished
+is sent after the response has gone out. Whatever is left is written at
+interpreter exit, which covers a graceful worker shutdown, and by the job
+handlers before they return. A worker killed outright loses its buffer.
+"""
+import os
+import time
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import TaskAuditEntry
+
+logger = logging.getLogger('task_management.audit')
+
+AUDITED_FIELDS = ('title', 'description', 'assigned_to_id', 'due_date', 'status', 'completion_report', 'worked_hours')
+# Entries kept for another attempt when the database rejects a flush.
+MAX_PENDING = 10000
+
+
+def diff(task, data):
+    """{field: [old, new]} for each audited field that `data` (validated serializer data) changes on `task`."""
+    changes = {}
+    for field, value in data.items():
+        attname = task._meta.get_field(field).attname
+        new     = getattr(value, 'pk', value)
+        old     = task.__dict__.get(attname)
+        if attname in AUDITED_FIELDS and old != new:
+            changes[attname] = [old, new]
+    return changes
+
+
+class AuditBuffer:
+    def __init__(self, size=100, max_age=5):
+        self.size     = size
+        self.max_age  = max_age
+        self.written  = 0
+        self._entries = []
+        self._oldest  = None
+        self._lock    = threading.Lock()
+
+    def record(self, task, user, changes):
+        """Buffer an entry for `changes` made to `task` by `user`, once the current transaction commits."""
+        if not changes:
+            return
+        entry = TaskAuditEntry(task_id=task.pk, user_id=getattr(user, 'pk', None), changes=changes, created_at=timezone.now())
+        transaction.on_commit(lambda: self._append(entry))
+
+    def _append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._entries) >= self.size
+        if full:
+            self.flush()
+
+    def due(self):
+        with self._lock:
+            return self._oldest is not None and (
+                len(self._entries) >= self.size or time.monotonic() - self._oldest >= self.max_age
+            )
+
+    def flush(self):
+        """Write every buffered entry; returns how many were written."""
+        with self._lock:
+            entries, self._entries, self._oldest = self._entries, [], None
+        if not entries:
+            return 0
+        try:
+            TaskAuditEntry.objects.bulk_create(entries, batch_size=500)
+        except Exception:
+            logger.exception("Could not write %d task audit entries, keeping them for the next flush", len(entries))
+            with self._lock:
+                self._entries = (entries + self._entries)[-MAX_PENDING:]
+                self._oldest  = self._oldest or time.monotonic()
+            return 0
+        with self._lock:
+            self.written += len(entries)
+        return len(entries)
+
+    def flush_if_due(self, **kwargs):
+        if self.due():
+            self.flush()
+
+    def clear(self):
+        with self._lock:
+            self._entries, self._oldest = [], None
+
+    def stats(self):
+        with self._lock:
+            return {'buffered': len(self._entries), 'written': self.written}
+
+
+audit_log = AuditBuffer(settings.TASK_AUDIT_BUFFER_SIZE, settings.TASK_AUDIT_FLUSH_SECONDS)
+
+atexit.register(audit_log.flush)
+# A forked child must not write its parent's entries a second time.
+os.register_at_fork(after_in_child=audit_log.clear)
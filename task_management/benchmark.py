@@ -0,0 +1,320 @@
+"""
+Reproducible load test of the task API: a seeded data set and a scripted
+request mix sent through the real URLconf with Django's test client, so a run
+covers the whole middleware, view, pagination and serialization stack without
+a server. Both are driven by a random seed; the same seed against the same
+data set sends the same requests, so reports from different commits compare.
+"""
+import time
+import random
+import platform
+import subprocess
+from datetime import date, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.contrib.auth.hashers import make_password
+
+from users.models import User
+from users.hierarchy import rebuild_hierarchy
+from .models import Task, TaskTombstone, TaskAuditEntry
+from .views import visible_tasks
+from .audit import audit_log
+from .cache import task_list_cache
+from .rollups import rebuild_rollups
+from .counters import reconcile_counters
+
+DEFAULT_MIX = {'login': 5, 'list': 35, 'detail': 25, 'create': 10, 'patch': 15, 'delete': 10}
+
+# Status values a PATCH may move a task between; completed tasks cannot be reopened.
+OPEN_STATUSES = [value for value, _ in Task.STATUS_CHOICES if value != 'completed']
+
+LIST_QUERIES = [
+    {'perPage': 20},
+    {'perPage': 20, 'page': 2},
+    {'perPage': 50, 'pagination': 'cursor'},
+    {'perPage': 20, 'status': 'pending'},
+    {'perPage': 20, 'overdue': 'true'},
+]
+
+
+def seed_data(users, tasks, fanout=10, seed=1, password='benchmark', prefix='bench', batch_size=1000):
+    """
+    Create `users` users named `<prefix>-<n>` in a tree `fanout` wide: user 0 is a
+    superuser, every user with children is staff, and each user's parent_id is
+    the node above it. Then create `tasks` tasks, each assigned to a random user
+    by that user's parent. Returns the created users.
+    """
+    rng    = random.Random(seed)
+    hashed = make_password(password)
+    today  = date.today()
+
+    with transaction.atomic():
+        created = []
+        for index in range(users):
+            has_children = index * fanout + 1 < users
+            created.append(User(
+                username=f'{prefix}-{index}',
+                email=f'{prefix}-{index}@example.com',
+                password=hashed,
+                first_name='Bench',
+                last_name=str(index),
+                is_staff=has_children,
+                is_superuser=index == 0,
+            ))
+        created = User.objects.bulk_create(created, batch_size=batch_size)
+        if not created or created[0].pk is None:
+            created = list(User.objects.filter(username__startswith=f'{prefix}-').order_by('id'))
+
+        for index, user in enumerate(created[1:], start=1):
+            user.parent_id = created[(index - 1) // fanout]
+        User.objects.bulk_update(created[1:], ['parent_id'], batch_size=batch_size)
+        rebuild_hierarchy()
+
+    for start in range(0, tasks, batch_size):
+        batch = []
+        for index in range(start, min(start + batch_size, tasks)):
+            assignee = created[rng.randrange(len(created))]
+            batch.append(Task(
+                title=f'Benchmark task {index}',
+                description=f'Generated workload task {index} for {assignee.username}',
+                assigned_to=assignee,
+                assigned_by=assignee.parent_id or assignee,
+                due_date=today + timedelta(days=rng.randint(-180, 180)),
+                status=rng.choice(Task.STATUS_CHOICES)[0],
+                worked_hours=Decimal(rng.randint(0, 4000)) / 100 if rng.random() < 0.5 else None,
+            ))
+        Task.objects.bulk_create(batch)
+
+    # One rebuild is much cheaper than applying rollup and counter deltas per generated task.
+    rebuild_rollups()
+    reconcile_counters()
+    task_list_cache.invalidate_tasks([user.pk for user in created])
+    return created
+
+
+def clear_data(prefix='bench'):
+    """Delete the `<prefix>-<n>` users and, through the cascade, their tasks."""
+    return User.objects.filter(username__startswith=f'{prefix}-').delete()[1].get(User._meta.label, 0)
+
+
+def parse_mix(text):
+    """`list=40,detail=30` -> {'list': 40, 'detail': 30}."""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation \"{name}\", expected one of: {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight)
+    return mix
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(latencies, errors):
+    total = sum(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / total, 1) if total else None,
+        'mean_ms': round(total / len(latencies) * 1000, 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class Workload:
+    """
+    Sends `requests` operations drawn from `mix` (weights per operation) as
+    `actors` users sampled from the seeded data set:
+
+    - login:  POST /auth/login with the seeded password
+    - list:   GET /task/tasks/ with one of LIST_QUERIES
+    - detail: GET /task/tasks/<id>/ of a task visible to the actor
+    - create: POST /task/tasks/ by a staff user, assigned to one of their reports
+    - patch:  PATCH /task/tasks/<id>/ by its creator, moving a task this run created to another open status
+    - delete: DELETE /task/tasks/<id>/ by the superuser, of a task this run created
+
+    Patches and deletes only touch tasks the run created. Those left over are
+    removed at the end, with the tombstones and audit entries of every task the
+    run created, so the data set is the same before every run.
+    """
+    expected_status = {'login': 200, 'list': 200, 'detail': 200, 'create': 201, 'patch': 200, 'delete': 204}
+
+    def __init__(self, mix=None, actors=20, seed=1, password='benchmark', prefix='bench', pool_size=200):
+        self.mix      = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.rng      = random.Random(seed)
+        self.seed     = seed
+        self.password = password
+        self.prefix   = prefix
+        self.client   = Client(SERVER_NAME=self._host())
+        # (task id, creating user) of the run's tasks not yet deleted, and every id it created.
+        self.created  = []
+        self.run_ids  = []
+
+        users = list(User.objects.filter(username__startswith=f'{prefix}-').order_by('id'))
+        if not users:
+            raise ValueError(f"No \"{prefix}-*\" users found, run seed_benchmark_data first")
+        self.reports = {}
+        for user in users:
+            if user.parent_id_id is not None:
+                self.reports.setdefault(user.parent_id_id, []).append(user.pk)
+        managers = [user for user in users if user.is_staff and user.pk in self.reports]
+
+        self.superuser = next((user for user in users if user.is_superuser), None)
+        self.actors    = self.rng.sample(users, min(actors, len(users)))
+        self.managers  = self.rng.sample(managers, min(actors, len(managers)))
+        # Task ids each actor can see, for detail.
+        self.visible = {
+            user.pk: list(visible_tasks(user).exclude(status='completed').order_by('-id').values_list('id', flat=True)[:pool_size])
+            for user in self.actors
+        }
+
+        self.tokens = {}
+        for user in {*self.actors, *self.managers, self.superuser} - {None}:
+            response = self._login(user)
+            if response.status_code != 200:
+                raise ValueError(f"Login as {user.username} failed with status {response.status_code}")
+            self.tokens[user.pk] = response.json()['data']['access']
+
+    def _host(self):
+        return next((host for host in settings.ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')), 'localhost')
+
+    def _headers(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.tokens[user.pk]}'}
+
+    def _login(self, user):
+        return self.client.post('/auth/login', {'username': user.username, 'password': self.password}, content_type='application/json')
+
+    def _choose(self):
+        names, weights = zip(*self.mix.items())
+        while True:
+            name = self.rng.choices(names, weights)[0]
+            # Nothing to patch or delete yet, or nobody able to create: draw again.
+            if name == 'delete' and (not self.created or self.superuser is None):
+                continue
+            if name in ('create', 'patch') and not self.managers:
+                continue
+            if name == 'patch' and not self.created:
+                continue
+            if name == 'detail' and not any(self.visible.values()):
+                continue
+            return name
+
+    def _visible_actor(self):
+        return self.rng.choice([user for user in self.actors if self.visible[user.pk]])
+
+    def request(self, name):
+        """Send one `name` operation; returns the response."""
+        if name == 'login':
+            return self._login(self.rng.choice(self.actors))
+        if name == 'list':
+            user = self.rng.choice(self.actors)
+            return self.client.get('/task/tasks/', self.rng.choice(LIST_QUERIES), **self._headers(user))
+        if name == 'detail':
+            user = self._visible_actor()
+            return self.client.get(f'/task/tasks/{self.rng.choice(self.visible[user.pk])}/', **self._headers(user))
+        if name == 'create':
+            user = self.rng.choice(self.managers)
+            response = self.client.post('/task/tasks/', {
+                'title': f'Workload task {self.rng.randrange(10 ** 6)}',
+                'description': 'Created by the benchmark workload',
+                'assigned_to_id': self.rng.choice(self.reports[user.pk]),
+                'due_date': (date.today() + timedelta(days=self.rng.randint(1, 60))).isoformat(),
+                'status': 'pending',
+            }, content_type='application/json', **self._headers(user))
+            if response.status_code == 201:
+                self.created.append((response.json()['data']['id'], user))
+                self.run_ids.append(self.created[-1][0])
+            return response
+        if name == 'patch':
+            task_id, user = self.rng.choice(self.created)
+            return self.client.patch(
+                f'/task/tasks/{task_id}/',
+                {'status': self.rng.choice(OPEN_STATUSES)},
+                content_type='application/json', **self._headers(user)
+            )
+        if name == 'delete':
+            task_id, _ = self.created.pop(self.rng.randrange(len(self.created)))
+            return self.client.delete(f'/task/tasks/{task_id}/', **self._headers(self.superuser))
+        raise ValueError(f"Unknown operation \"{name}\"")
+
+    def cleanup(self):
+        """Delete the run's remaining tasks and every trace of the tasks it created."""
+        Task.objects.filter(id__in=[task_id for task_id, _ in self.created]).delete()
+        audit_log.flush()
+        TaskTombstone.objects.filter(task_id__in=self.run_ids).delete()
+        TaskAuditEntry.objects.filter(task_id__in=self.run_ids).delete()
+        self.created, self.run_ids = [], []
+
+    def run(self, requests, warmup=0):
+        latencies = {name: [] for name in self.mix}
+        errors    = dict.fromkeys(self.mix, 0)
+        started   = None
+        for index in range(warmup + requests):
+            if index == warmup:
+                started = time.perf_counter()
+            name     = self._choose()
+            sent     = time.perf_counter()
+            response = self.request(name)
+            elapsed  = time.perf_counter() - sent
+            if index < warmup:
+                continue
+            latencies[name].append(elapsed)
+            if response.status_code != self.expected_status[name]:
+                errors[name] += 1
+        seconds = time.perf_counter() - started if started else 0.0
+
+        self.cleanup()
+
+        return {
+            'meta': {
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'async_views': settings.ASYNC_VIEWS,
+                'seed': self.seed,
+                'actors': len(self.actors),
+                'users': User.objects.filter(username__startswith=f'{self.prefix}-').count(),
+                'tasks': Task.objects.count(),
+                'mix': self.mix,
+            },
+            'total': {
+                'requests': requests,
+                'errors': sum(errors.values()),
+                'seconds': round(seconds, 3),
+                'rps': round(requests / seconds, 1) if seconds else None,
+            },
+            'endpoints': {name: summarize(samples, errors[name]) for name, samples in latencies.items()},
+        }
+
+
+def compare(report, baseline, max_regression):
+    """Endpoints whose p95 grew by more than `max_regression` percent over `baseline`."""
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous or not previous.get('p95_ms') or current['p95_ms'] is None:
+            continue
+        change = (current['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+        if change > max_regression:
+            regressions.append({'endpoint': name, 'baseline_p95_ms': previous['p95_ms'], 'p95_ms': current['p95_ms'], 'change_pct': round(change, 1)})
+    return regressions
@@ -0,0 +1,131 @@
+"""
+Batch create, update and delete shared by TaskBulkAPIView and the background
+job that runs the same batches off the request path. Each function returns one
+result per item, in input order; valid items are written in chunked
+transactions even when others fail.
+"""
+from django.db import transaction
+from django.utils import timezone
+from django.core.exceptions import PermissionDenied
+
+from utils.common import chunked
+from .models import Task
+from .serializer import TaskSerializer
+from .audit import audit_log, diff
+from .signals import notify_bulk_created, notify_bulk_updated
+
+MEMBER_UPDATE_FIELDS = {'status', 'completion_report', 'worked_hours'}
+
+
+def validate_update_permissions(user, task, data):
+    if user.is_staff or user.is_superuser:
+        return
+
+    if not MEMBER_UPDATE_FIELDS.issuperset(data.keys()):
+        raise PermissionDenied("You can only update status, completion report, and worked hours")
+
+    if task.assigned_to_id != user.id:
+        raise PermissionDenied("You can only update tasks assigned to you")
+
+
+def _task_id(value):
+    """`value` if it is a usable task id, else None; JSON can carry lists, objects and booleans here."""
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _results(errors, done):
+    results = [{'index': index, 'status': False, 'errors': item_errors} for index, item_errors in errors.items()]
+    results += [{'index': index, 'status': True, 'id': pk} for index, pk in done]
+    results.sort(key=lambda result: result['index'])
+    return results
+
+
+def create_tasks(user, items, chunk_size=500, progress=None):
+    serializer    = TaskSerializer(data=items, many=True)
+    valid, errors = serializer.validate_items()
+
+    created = [(index, Task(**data, assigned_by=user)) for index, data in valid]
+    for chunk in chunked(created, chunk_size):
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create([task for _, task in chunk])
+            notify_bulk_created(tasks)
+        if progress:
+            progress(len(chunk))
+    return _results(errors, [(index, task.pk) for index, task in created])
+
+
+def update_tasks(user, queryset, items, chunk_size=500, progress=None):
+    ids   = [_task_id(item.get('id')) for item in items if isinstance(item, dict)]
+    tasks = queryset.in_bulk([pk for pk in ids if pk is not None])
+
+    errors, pending, seen = {}, [], set()
+    for index, item in enumerate(items):
+        pk = _task_id(item.get('id')) if isinstance(item, dict) else None
+        if pk is None:
+            errors[index] = "Task id must be an integer"
+            continue
+        task = tasks.get(pk)
+        if task is None:
+            errors[index] = "Task not found"
+            continue
+        # in_bulk() holds one object per task; a repeat would be written, counted and audited twice.
+        if pk in seen:
+            errors[index] = "Duplicate task id in batch"
+            continue
+        seen.add(pk)
+        payload = {key: value for key, value in item.items() if key != 'id'}
+        try:
+            validate_update_permissions(user, task, payload)
+        except PermissionDenied as e:
+            errors[index] = str(e)
+            continue
+        pending.append((index, task, payload))
+
+    serializer = TaskSerializer(
+        [task for _, task, _ in pending],
+        data=[payload for _, _, payload in pending],
+        many=True,
+        partial=True
+    )
+    valid, invalid = serializer.validate_items([task for _, task, _ in pending])
+    for position, item_errors in invalid.items():
+        errors[pending[position][0]] = item_errors
+
+    now, updated, fields, changes = timezone.now(), [], {'updated_at'}, {}
+    for position, data in valid:
+        index, task, _ = pending[position]
+        changes[task.pk] = diff(task, data)
+        for field, value in data.items():
+            setattr(task, field, value)
+        task.updated_at = now
+        fields.update(data.keys())
+        updated.append((index, task))
+
+    for chunk in chunked(updated, chunk_size):
+        with transaction.atomic():
+            tasks = [task for _, task in chunk]
+            Task.objects.bulk_update(tasks, sorted(fields))
+            notify_bulk_updated(tasks)
+            for task in tasks:
+                audit_log.record(task, user, changes[task.pk])
+        if progress:
+            progress(len(chunk))
+    return _results(errors, [(index, task.pk) for index, task in updated])
+
+
+def delete_tasks(queryset, ids, chunk_size=500, progress=None):
+    deleted = set()
+    for chunk in chunked(ids, chunk_size):
+        with transaction.atomic():
+            tasks = queryset.filter(id__in=[pk for pk in map(_task_id, chunk) if pk is not None])
+            found = set(tasks.values_list('id', flat=True))
+            Task.objects.filter(id__in=found).delete()
+        deleted |= found
+        if progress:
+            progress(len(chunk))
+
+    return [
+        {'index': index, 'status': True, 'id': pk} if pk in deleted
+        else {'index': index, 'status': False, 'errors': "Task not found" if pk is not None else "Task id must be an integer"}
+        for index, pk in enumerate(map(_task_id, ids))
+    ]
@@ -0,0 +1,134 @@
+import uuid
+import hashlib
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from utils.db.router import reading_from_replica
+
+ALL_TASKS_SCOPE = 'all'
+USERS_SCOPE     = 'users'
+
+
+def _generation_key(scope):
+    return f'task-list-gen:{scope}'
+
+
+class TaskListCache:
+    """
+    Caches serialized task list pages in a Django cache.
+
+    Keys combine the user's scope, the query string and generation tokens:
+    one for the tasks the user can see and one for user rows, which are
+    nested into every task. A change never deletes entries; it replaces the
+    generation tokens it affects, so later lookups build new keys and old
+    entries simply age out. Tokens are random rather than incremented, so a
+    generation evicted from the cache cannot repeat an old key.
+    """
+
+    def __init__(self, alias='default', timeout=300):
+        self.alias   = alias
+        self.timeout = timeout
+        self.hits    = 0
+        self.misses  = 0
+        self._lock   = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _generation_keys(self, user):
+        scope = ALL_TASKS_SCOPE if user.is_superuser else user.pk
+        return [_generation_key(scope), _generation_key(USERS_SCOPE)]
+
+    def _key(self, user, params, generations):
+        raw = repr((user.pk, user.is_superuser, user.is_staff, sorted(params.lists()), generations))
+        return 'task-list:' + hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _record(self, entry):
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def lookup(self, user, params):
+        """Return (key, entry) for a list request; entry is None on a miss."""
+        if not self.timeout:
+            return None, None
+        gen_keys    = self._generation_keys(user)
+        generations = self.cache.get_many(gen_keys)
+        for gen_key in gen_keys:
+            if gen_key not in generations:
+                self.cache.add(gen_key, uuid.uuid4().hex, None)
+                generations[gen_key] = self.cache.get(gen_key)
+
+        key = self._key(user, params, [generations[gen_key] for gen_key in gen_keys])
+        return key, self._record(self.cache.get(key))
+
+    async def alookup(self, user, params):
+        if not self.timeout:
+            return None, None
+        gen_keys    = self._generation_keys(user)
+        generations = await self.cache.aget_many(gen_keys)
+        for gen_key in gen_keys:
+            if gen_key not in generations:
+                await self.cache.aadd(gen_key, uuid.uuid4().hex, None)
+                generations[gen_key] = await self.cache.aget(gen_key)
+
+        key = self._key(user, params, [generations[gen_key] for gen_key in gen_keys])
+        return key, self._record(await self.cache.aget(key))
+
+    def _store_timeout(self):
+        # A replica may not have a write yet when its generation is bumped, so
+        # a page read from one is kept no longer than replicas are allowed to lag.
+        if reading_from_replica():
+            return min(self.timeout, settings.DATABASE_REPLICA_MAX_LAG)
+        return self.timeout
+
+    def store(self, key, entry):
+        if key:
+            self.cache.set(key, entry, self._store_timeout())
+
+    async def astore(self, key, entry):
+        if key:
+            await self.cache.aset(key, entry, self._store_timeout())
+
+    def _bump(self, scopes):
+        # After commit, so a page read between the write and the commit is cached
+        # under the old generation and never served again.
+        tokens = {_generation_key(scope): uuid.uuid4().hex for scope in scopes}
+        transaction.on_commit(lambda: self.cache.set_many(tokens, None))
+
+    def invalidate_tasks(self, user_ids):
+        """Tasks assigned to or by `user_ids` changed."""
+        self._bump([ALL_TASKS_SCOPE, *{user_id for user_id in user_ids if user_id is not None}])
+
+    def invalidate_users(self):
+        """A user row changed; it may be nested into any page."""
+        self._bump([USERS_SCOPE])
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+task_list_cache = TaskListCache(settings.TASK_LIST_CACHE_ALIAS, settings.TASK_LIST_CACHE_TIMEOUT)
+
+
+def list_entry(data, pagination, etag, last_modified):
+    """What a cache hit needs to rebuild the list response without touching the database."""
+    return {
+        'data': list(data),
+        'pagination': {key: value for key, value in pagination.items() if key != 'data'},
+        'etag': etag,
+        'last_modified': last_modified,
+    }
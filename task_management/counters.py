@@ -0,0 +1,90 @@
+"""
+Per-assignee task counts by status in the task_counters table, so the "my
+tasks" badge is one indexed read instead of a COUNT(*) per status. The change
+signals apply every create, status or assignee change and delete (including the
+bulk paths and the deletes cascaded from a User) as atomic F() deltas;
+QuerySet.update() sends no signals, so reconcile_counters() repairs any drift.
+Archived tasks stay counted.
+"""
+from django.db import transaction, IntegrityError
+from django.db.models import F, Count
+
+from .models import Task, ArchivedTask, TaskCounter
+
+
+def _deltas(changes):
+    """Fold (previous_state, new_state) pairs into {(assignee id, status): count delta}."""
+    deltas = {}
+    for previous, current in changes:
+        for state, sign in ((previous, -1), (current, 1)):
+            if not state or state['assigned_to_id'] is None:
+                continue
+            key = (state['assigned_to_id'], state['status'])
+            deltas[key] = deltas.get(key, 0) + sign
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def apply_changes(changes):
+    """Apply task state changes to the counters with atomic F() updates."""
+    deltas = _deltas(changes)
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        # A stable key order keeps concurrent writers from deadlocking on the same rows.
+        for key in sorted(deltas, key=str):
+            user_id, status = key
+            delta   = deltas[key]
+            counter = TaskCounter.objects.filter(user_id=user_id, status=status)
+            if counter.update(task_count=F('task_count') + delta) or delta < 0:
+                continue
+            try:
+                with transaction.atomic():
+                    TaskCounter.objects.create(user_id=user_id, status=status, task_count=delta)
+            except IntegrityError:
+                counter.update(task_count=F('task_count') + delta)
+
+
+def counts_for(user_id):
+    """{status: count} for every status, zeros included."""
+    counts = dict.fromkeys((value for value, _ in Task.STATUS_CHOICES), 0)
+    counts.update(TaskCounter.objects.filter(user_id=user_id).values_list('status', 'task_count'))
+    return counts
+
+
+def reconcile_counters(dry_run=False):
+    """
+    Compare the counters with a GROUP BY over the tasks and tasks_archive
+    tables and fix the rows that differ. Returns [(user id, status, stored,
+    actual)] for each of them.
+    """
+    with transaction.atomic():
+        # Counter rows are locked before the tasks are counted, so a concurrent
+        # delta lands either before the count or after the repair.
+        stored = {
+            (user_id, status): (pk, count)
+            for pk, user_id, status, count in TaskCounter.objects.select_for_update().values_list('id', 'user_id', 'status', 'task_count')
+        }
+        actual = {}
+        for model in (Task, ArchivedTask):
+            for row in model.objects.order_by().values('assigned_to_id', 'status').annotate(count=Count('id')).iterator():
+                key = (row['assigned_to_id'], row['status'])
+                actual[key] = actual.get(key, 0) + row['count']
+
+        drift = []
+        for key in sorted(actual.keys() | stored.keys(), key=str):
+            count = stored.get(key, (None, 0))[1]
+            if count != actual.get(key, 0):
+                drift.append((*key, count, actual.get(key, 0)))
+        if dry_run:
+            return drift
+
+        for user_id, status, _, count in drift:
+            pk = stored.get((user_id, status), (None, 0))[0]
+            if pk is None:
+                TaskCounter.objects.create(user_id=user_id, status=status, task_count=count)
+            elif count:
+                TaskCounter.objects.filter(pk=pk).update(task_count=count)
+            else:
+                TaskCounter.objects.filter(pk=pk).delete()
+    return drift
@@ -0,0 +1,250 @@
+"""
+Server-sent events for task changes, so clients learn of new assignments
+without polling the task list.
+
+The task signals publish a `task.created`, `task.updated` or `task.deleted`
+event once the change commits. Each event goes to its assignee and assigner,
+before and after the change, and to every superuser. An ASGI worker keeps one
+EventHub that maps users to the queues of their open streams; an idle stream
+costs a queue and a parked coroutine. The backend decides how events reach
+the hubs: LocalBackend delivers in-process only, RedisBackend publishes over
+Redis pub/sub so every process (web workers, job workers) reaches every hub.
+"""
+import io
+import json
+import time
+import asyncio
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+from users.middleware import JWTAuthenticationMiddleware
+from users.revocation import token_revocations
+from utils.db import release_connections
+
+logger = logging.getLogger('task_management.events')
+
+# Put in a stream's queue in place of the events it was too slow to take.
+OVERFLOW = object()
+
+
+class Subscription:
+    def __init__(self, user_id, is_superuser, queue_size):
+        self.user_id      = user_id
+        self.is_superuser = is_superuser
+        self.loop         = asyncio.get_running_loop()
+        self.queue        = asyncio.Queue(queue_size)
+
+    def put(self, event):
+        """Runs on the subscription's loop; a full queue is replaced with OVERFLOW."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+
+class EventHub:
+    """Per-process registry of open streams, safe to deliver to from any thread."""
+
+    def __init__(self):
+        self.delivered   = 0
+        self._by_user    = {}
+        self._superusers = set()
+        self._backend    = None
+        self._lock       = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = import_string(settings.TASK_EVENTS_BACKEND)()
+        return self._backend
+
+    def subscribe(self, user):
+        subscription = Subscription(user.pk, user.is_superuser, settings.TASK_EVENTS_QUEUE_SIZE)
+        self.backend.listen(self)
+        with self._lock:
+            self._by_user.setdefault(user.pk, set()).add(subscription)
+            if user.is_superuser:
+                self._superusers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._by_user.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._by_user.pop(subscription.user_id, None)
+            self._superusers.discard(subscription)
+
+    def deliver(self, events):
+        for event in events:
+            with self._lock:
+                targets = set(self._superusers)
+                for user_id in event['users']:
+                    targets |= self._by_user.get(user_id, set())
+            for subscription in targets:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.put, event)
+                except RuntimeError:
+                    # The stream's loop has closed; its stream is gone.
+                    self.unsubscribe(subscription)
+            self.delivered += len(targets)
+
+    def publish(self, events):
+        if events:
+            self.backend.publish(self, events)
+
+    def stats(self):
+        with self._lock:
+            return {'streams': sum(len(subscriptions) for subscriptions in self._by_user.values()), 'delivered': self.delivered}
+
+
+class LocalBackend:
+    """Delivers events to the hub of the publishing process only."""
+
+    def publish(self, hub, events):
+        hub.deliver(events)
+
+    def listen(self, hub):
+        pass
+
+
+class RedisBackend:
+    """
+    Publishes events on a Redis channel that one thread per process listens
+    to, so a change made in any process reaches the streams of every process.
+    """
+    channel = 'task-events'
+
+    def __init__(self):
+        import redis
+
+        self.client  = redis.Redis.from_url(settings.REDIS_URL)
+        self._thread = None
+        self._lock   = threading.Lock()
+
+    def publish(self, hub, events):
+        self.client.publish(self.channel, json.dumps(events, cls=DjangoJSONEncoder))
+
+    def listen(self, hub):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, args=(hub,), name='task-events', daemon=True)
+                self._thread.start()
+
+    def _listen(self, hub):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    hub.deliver(json.loads(message['data']))
+            except Exception:
+                logger.exception("Task event listener lost its Redis connection, reconnecting")
+                time.sleep(1)
+
+
+task_events = EventHub()
+
+
+def task_event(kind, task, previous=None):
+    """A `task.<kind>` event for `task`, addressed to everyone assigned to or by it before and after."""
+    current = task.tracked_state() if kind != 'deleted' else None
+    users   = {state[f'{role}_id'] for state in (previous, current) if state for role in ('assigned_to', 'assigned_by')}
+    data    = {'id': task.pk, **(current or previous or {})}
+    if kind != 'deleted':
+        data['title'] = task.__dict__.get('title')
+    return {'type': f'task.{kind}', 'data': data, 'users': sorted(users - {None})}
+
+
+def _frame(event):
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {payload}\n\n".encode()
+
+
+class TaskEventStream:
+    """
+    ASGI app serving GET `path` as a text/event-stream of the caller's task
+    events and passing every other request to `application`. The bearer token
+    is checked by JWTAuthenticationMiddleware's own logic; browsers' EventSource
+    cannot set headers, so `?access_token=` is accepted here as well. A stream
+    ends when its token expires or is revoked, and on client disconnect.
+    """
+
+    def __init__(self, application, path='/task/tasks/events', hub=task_events):
+        self.application   = application
+        self.path          = path
+        self.hub           = hub
+        self.authenticator = JWTAuthenticationMiddleware(application)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path or scope['method'] != 'GET':
+            return await self.application(scope, receive, send)
+
+        request = ASGIRequest(scope, io.BytesIO())
+        token   = request.GET.get('access_token')
+        if token and 'HTTP_AUTHORIZATION' not in request.META:
+            request.META['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+        user, payload, error = await self.authenticator.aauthenticate(request)
+        await sync_to_async(release_connections)()
+        if error:
+            return await self._send_response(send, error)
+
+        subscription = self.hub.subscribe(user)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no'),
+                ],
+            })
+            await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+            stream       = asyncio.ensure_future(self._stream(subscription, payload, send))
+            disconnected = asyncio.ensure_future(self._disconnected(receive))
+            done, pending = await asyncio.wait([stream, disconnected], return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            if stream in done:
+                stream.result()
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            self.hub.unsubscribe(subscription)
+
+    async def _stream(self, subscription, payload, send):
+        keepalive = settings.TASK_EVENTS_KEEPALIVE
+        while True:
+            remaining = payload['exp'] - time.time()
+            if remaining <= 0 or token_revocations.is_revoked(payload):
+                return
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=min(keepalive, remaining))
+            except asyncio.TimeoutError:
+                await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                continue
+            if event is OVERFLOW:
+                # Events were dropped: the client reconnects and catches up through /tasks/changes.
+                await send({'type': 'http.response.body', 'body': b'event: overflow\ndata: {}\n\n', 'more_body': True})
+                return
+            await send({'type': 'http.response.body', 'body': _frame(event), 'more_body': True})
+
+    async def _disconnected(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    async def _send_response(self, send, response):
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response.items()],
+        })
+        await send({'type': 'http.response.body', 'body': response.content})
@@ -0,0 +1,121 @@
+import io
+import csv
+import json
+import tempfile
+
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('description', 'description'),
+    ('assigned_to_id', 'assigned_to_id'),
+    ('assigned_to', 'assigned_to__username'),
+    ('assigned_by_id', 'assigned_by_id'),
+    ('assigned_by', 'assigned_by__username'),
+    ('due_date', 'due_date'),
+    ('status', 'status'),
+    ('completion_report', 'completion_report'),
+    ('worked_hours', 'worked_hours'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+]
+EXPORT_HEADERS = [header for header, _ in EXPORT_COLUMNS]
+EXPORT_FIELDS  = [field for _, field in EXPORT_COLUMNS]
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def iter_batches(queryset, chunk_size=2000, progress=None):
+    """
+    Yield lists of export rows, walking the queryset by descending primary key.
+
+    Each batch is its own `LIMIT` query seeking past the previous one, so memory
+    stays flat on every backend (MySQL's driver buffers a whole `.iterator()`
+    result client side). `progress(rows)`, if given, is called after each batch.
+    """
+    rows    = queryset.order_by('-id').values_list(*EXPORT_FIELDS)
+    last_pk = None
+    while True:
+        page  = rows if last_pk is None else rows.filter(id__lt=last_pk)
+        batch = list(page[:chunk_size])
+        if not batch:
+            return
+        yield batch
+        if progress:
+            progress(len(batch))
+        if len(batch) < chunk_size:
+            return
+        last_pk = batch[-1][0]
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_csv(queryset, chunk_size=2000, progress=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    for batch in iter_batches(queryset, chunk_size, progress):
+        writer.writerows([_text(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(queryset, chunk_size=2000, progress=None):
+    for batch in iter_batches(queryset, chunk_size, progress):
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_HEADERS, row)), cls=DjangoJSONEncoder) + '\n'
+            for row in batch
+        )
+
+
+def _cell(value):
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        # Excel has no timezone support; write local wall-clock time.
+        return timezone.localtime(value).replace(tzinfo=None)
+    if isinstance(value, str):
+        # Control characters are not allowed in XLSX cells and would abort the export mid-stream.
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+def stream_xlsx(queryset, chunk_size=2000, block_size=64 * 1024, progress=None):
+    """
+    Build the workbook with openpyxl's write-only mode, which spools rows to disk,
+    then stream the finished file. XLSX is a zip archive, so no bytes can be sent
+    before the last row has been written.
+    """
+    workbook  = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('tasks')
+    worksheet.append(EXPORT_HEADERS)
+    for batch in iter_batches(queryset, chunk_size, progress):
+        for row in batch:
+            worksheet.append([_cell(value) for value in row])
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while block := output.read(block_size):
+            yield block
+
+
+EXPORTERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'xlsx': stream_xlsx,
+}
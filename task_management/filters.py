@@ -0,0 +1,89 @@
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ParseError
+
+from .models import Task
+from .search import search
+
+STATUSES = [value for value, _ in Task.STATUS_CHOICES]
+BOOLEANS = {'true': True, '1': True, 'false': False, '0': False}
+ARCHIVED = ('include', 'only')
+
+
+def _date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ParseError(f"{name} must be a date in YYYY-MM-DD format")
+    return parsed
+
+
+def _id(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ParseError(f"{name} must be a user id")
+    return int(value)
+
+
+def archived_mode(params):
+    """
+    `archived=include` reads archived tasks along with the live ones and
+    `archived=only` reads just those; without it only live tasks are read.
+    """
+    mode = params.get('archived')
+    if mode and mode not in ARCHIVED:
+        raise ParseError(f"archived must be one of: {', '.join(ARCHIVED)}")
+    return mode or None
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the task list filters found in `params` (request.GET):
+
+        status       one or more statuses, comma separated
+        dueFrom      due on or after this date
+        dueTo        due on or before this date
+        assignedTo   assignee user id
+        assignedBy   assigner user id
+        overdue      true: past due and not completed; false: the rest
+        q            full-text search over title, description and completion report
+
+    Filters narrow the visible rows only; they never widen the user's scope.
+    """
+    if params.get('status'):
+        statuses = [value.strip() for value in params['status'].split(',') if value.strip()]
+        invalid  = [value for value in statuses if value not in STATUSES]
+        if invalid:
+            raise ParseError(f"status must be one of: {', '.join(STATUSES)}")
+        queryset = queryset.filter(status__in=statuses)
+
+    due_from, due_to = _date(params, 'dueFrom'), _date(params, 'dueTo')
+    if due_from:
+        queryset = queryset.filter(due_date__gte=due_from)
+    if due_to:
+        queryset = queryset.filter(due_date__lte=due_to)
+
+    assigned_to, assigned_by = _id(params, 'assignedTo'), _id(params, 'assignedBy')
+    if assigned_to is not None:
+        queryset = queryset.filter(assigned_to_id=assigned_to)
+    if assigned_by is not None:
+        queryset = queryset.filter(assigned_by_id=assigned_by)
+
+    if params.get('overdue'):
+        overdue = BOOLEANS.get(params['overdue'].lower())
+        if overdue is None:
+            raise ParseError("overdue must be true or false")
+        past_due = Q(due_date__lt=timezone.localdate()) & ~Q(status='completed')
+        queryset = queryset.filter(past_due if overdue else ~past_due)
+
+    if params.get('q'):
+        queryset = search(queryset, params['q'])
+    return queryset
@@ -0,0 +1,127 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+from django.db import transaction
+from django.db.models import Q
+
+from users.models import User
+from utils.common import chunked
+from .models import Task
+from .serializer import TaskSerializer
+from .signals import notify_bulk_created
+
+IMPORT_COLUMNS  = ['title', 'description', 'assigned_to', 'due_date', 'status', 'completion_report', 'worked_hours']
+OPTIONAL_FIELDS = {'status', 'completion_report', 'worked_hours'}
+FILE_TYPES      = ('csv', 'xlsx')
+
+
+def detect_file_type(name):
+    extension = os.path.splitext(name or '')[1].lower().lstrip('.')
+    return extension if extension in FILE_TYPES else None
+
+
+def read_csv_chunks(source, chunk_size):
+    """Yield lists of row dicts, parsing the CSV `chunk_size` rows at a time."""
+    reader = pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    for frame in reader:
+        yield frame.to_dict('records')
+
+
+def read_xlsx_chunks(source, chunk_size):
+    """Yield lists of row dicts from the first sheet, using openpyxl's streaming read-only mode."""
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows   = workbook.active.iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+        for chunk in chunked(rows, chunk_size):
+            yield [dict(zip(header, row)) for row in chunk]
+    finally:
+        workbook.close()
+
+
+READERS = {
+    'csv': read_csv_chunks,
+    'xlsx': read_xlsx_chunks,
+}
+
+
+class TaskImporter:
+    """
+    Import tasks from a CSV or XLSX file in chunks.
+
+    Each chunk resolves its `assigned_to` usernames/emails in one query, validates
+    rows through TaskSerializer and inserts the valid ones with a single
+    bulk_create. Invalid rows are reported by their line number in the file.
+    """
+
+    def __init__(self, assigned_by, chunk_size=1000):
+        self.assigned_by = assigned_by
+        self.chunk_size  = chunk_size
+
+    def run(self, source, file_type, progress=None):
+        """`progress(rows read so far)`, if given, is called after each chunk."""
+        report = {'total': 0, 'created': 0, 'errors': []}
+        # Line 1 is the header row.
+        line = 2
+        for rows in READERS[file_type](source, self.chunk_size):
+            created, errors = self.import_chunk(rows, line)
+            report['total']   += len(rows)
+            report['created'] += created
+            report['errors']  += errors
+            line += len(rows)
+            if progress:
+                progress(report['total'])
+        return report
+
+    def resolve_assignees(self, rows):
+        keys   = {str(row.get('assigned_to') or '').strip() for row in rows} - {''}
+        users  = User.objects.filter(Q(username__in=keys) | Q(email__in=keys)).only('id', 'username', 'email')
+        lookup = {}
+        for user in users:
+            lookup[user.username] = user
+            lookup[user.email]    = user
+        return lookup
+
+    def clean_row(self, row, assignees):
+        data = {}
+        for column in IMPORT_COLUMNS:
+            value = row.get(column)
+            if isinstance(value, str):
+                value = value.strip()
+            if isinstance(value, datetime):
+                value = value.date()
+            if value in (None, '') and column in OPTIONAL_FIELDS:
+                continue
+            data[column] = value
+
+        assignee = assignees.get(str(data.pop('assigned_to', '') or ''))
+        data['assigned_to_id'] = assignee.pk if assignee else None
+        return data, assignee
+
+    def import_chunk(self, rows, first_line):
+        assignees = self.resolve_assignees(rows)
+        payloads, errors, lines = [], [], []
+        for offset, row in enumerate(rows):
+            data, assignee = self.clean_row(row, assignees)
+            if assignee is None:
+                errors.append({'row': first_line + offset, 'errors': {'assigned_to': [f"No user matches \"{row.get('assigned_to')}\""]}})
+                continue
+            payloads.append(data)
+            lines.append(first_line + offset)
+
+        serializer = TaskSerializer(
+            data=payloads,
+            many=True,
+            context={'assignees': {user.pk: user for user in assignees.values()}}
+        )
+        valid, invalid = serializer.validate_items()
+        errors += [{'row': lines[position], 'errors': detail} for position, detail in invalid.items()]
+        errors.sort(key=lambda error: error['row'])
+
+        tasks = [Task(**data, assigned_by=self.assigned_by) for _, data in valid]
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            notify_bulk_created(tasks)
+        return len(tasks), errors
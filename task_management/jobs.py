@@ -0,0 +1,109 @@
+"""
+Background job handlers for task operations too slow for a request: exports,
+imports, bulk batches and rollup rebuilds. Each runs as the user who queued it,
+with that user's visibility rules applied when the job runs.
+"""
+import tempfile
+
+from django.http import QueryDict
+from django.core.files import File
+from django.core.files.storage import default_storage
+from rest_framework.exceptions import ParseError
+
+from jobs.queue import job_handler, PermanentJobError
+from users.models import User
+from .audit import audit_log
+from .bulk import create_tasks, update_tasks, delete_tasks
+from .exports import EXPORTERS, CONTENT_TYPES
+from .filters import filter_tasks
+from .imports import TaskImporter
+from .rollups import rebuild_rollups
+from .views import visible_tasks, TaskBulkAPIView, TaskExportAPIView, TaskImportAPIView
+
+
+def _job_user(job):
+    try:
+        return User.objects.get(pk=job.payload.get('user_id'), is_active=True)
+    except User.DoesNotExist:
+        raise PermanentJobError("The user who queued this job no longer exists")
+
+
+class _Counter:
+    """Adds up the rows a step reports and records the total on the job."""
+
+    def __init__(self, job, total=None):
+        self.job  = job
+        self.done = 0
+        job.report_progress(0, total)
+
+    def __call__(self, rows):
+        self.done += rows
+        self.job.report_progress(self.done)
+
+
+@job_handler('tasks.export')
+def export_tasks(job):
+    user      = _job_user(job)
+    file_type = job.payload['file_type']
+    params    = QueryDict(mutable=True)
+    for key, values in job.payload.get('params', {}).items():
+        params.setlist(key, values)
+    try:
+        tasks = filter_tasks(visible_tasks(user), params)
+    except ParseError as e:
+        raise PermanentJobError(str(e))
+
+    total   = tasks.count()
+    counter = _Counter(job, total)
+    name    = f'exports/tasks-{job.pk}.{file_type}'
+    with tempfile.TemporaryFile() as output:
+        for chunk in EXPORTERS[file_type](tasks, TaskExportAPIView.chunk_size, progress=counter):
+            output.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        output.seek(0)
+        # A retried attempt overwrites the partial file of the one before it.
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        name = default_storage.save(name, File(output))
+
+    return {'file': name, 'filename': f'tasks.{file_type}', 'content_type': CONTENT_TYPES[file_type], 'rows': total}
+
+
+# Imported chunks are committed as they go, so a second attempt would duplicate them.
+@job_handler('tasks.import', max_attempts=1)
+def import_tasks(job):
+    user = _job_user(job)
+    name = job.payload['file']
+    try:
+        with default_storage.open(name, 'rb') as source:
+            # The row count is unknown until the file has been read.
+            return TaskImporter(user, chunk_size=TaskImportAPIView.chunk_size).run(
+                source, job.payload['file_type'], progress=job.report_progress
+            )
+    finally:
+        default_storage.delete(name)
+
+
+@job_handler('tasks.bulk', max_attempts=1)
+def bulk_tasks(job):
+    user    = _job_user(job)
+    items   = job.payload['items']
+    method  = job.payload['method']
+    counter = _Counter(job, len(items))
+    chunk   = TaskBulkAPIView.chunk_size
+
+    if method == 'post':
+        results = create_tasks(user, items, chunk, counter)
+    elif method == 'patch':
+        results = update_tasks(user, visible_tasks(user), items, chunk, counter)
+    elif method == 'delete':
+        results = delete_tasks(visible_tasks(user), items, chunk, counter)
+    else:
+        raise PermanentJobError(f"Unknown bulk method \"{method}\"")
+    # Forked job processes exit without running atexit handlers.
+    audit_log.flush()
+    return {'results': results, 'failed': sum(1 for result in results if not result['status'])}
+
+
+@job_handler('tasks.rebuild_rollups')
+def rebuild_task_rollups(job):
+    return {'rows': rebuild_rollups()}
@@ -0,0 +1,44 @@
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_management.archive import archive_tasks, archivable
+
+UNITS = {'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def age(value):
+    """`90`, `90d`, `12w` or `36h`; a bare number is days."""
+    match = re.fullmatch(r'(\d+)([hdw]?)', value.strip())
+    if match is None:
+        raise CommandError(f"Invalid age \"{value}\", expected a number of days or e.g. 12w, 36h")
+    return timedelta(**{UNITS[match.group(2) or 'd']: int(match.group(1))})
+
+
+class Command(BaseCommand):
+    help = "Move completed tasks not updated for --older-than into the tasks_archive table, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', default=str(settings.TASK_ARCHIVE_AFTER_DAYS),
+                            help="Age since the last update, e.g. 90 (days), 12w or 36h; defaults to TASK_ARCHIVE_AFTER_DAYS")
+        parser.add_argument('--batch-size', type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.1, help="Seconds to sleep between batches")
+        parser.add_argument('--limit', type=int, help="Stop after about this many tasks")
+        parser.add_argument('--dry-run', action='store_true', help="Count the tasks that would be archived")
+
+    def handle(self, *args, **options):
+        older_than = age(options['older_than'])
+        if options['dry_run']:
+            self.stdout.write(f"{archivable(older_than).count()} tasks would be archived")
+            return
+
+        moved = archive_tasks(
+            older_than,
+            batch_size=max(1, options['batch_size']),
+            pause=options['pause'],
+            limit=options['limit'],
+            progress=lambda moved: self.stdout.write(f"Archived {moved} tasks") if options['verbosity'] > 1 else None
+        )
+        self.stdout.write(f"Archived {moved} tasks")
@@ -0,0 +1,45 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_management.benchmark import Workload, DEFAULT_MIX, parse_mix, compare
+
+
+class Command(BaseCommand):
+    help = (
+        "Send a seeded mix of login, list, detail, create, patch and delete requests through "
+        "the URLconf and report throughput and p50/p95/p99 latency per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Measured requests")
+        parser.add_argument('--warmup', type=int, default=200, help="Unmeasured requests sent first")
+        parser.add_argument('--mix', default='', help=f"Operation weights, e.g. list=40,detail=30 (default: {DEFAULT_MIX})")
+        parser.add_argument('--actors', type=int, default=20, help="Number of seeded users sending requests")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='benchmark')
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--output', help="Also write the report to this file")
+        parser.add_argument('--baseline', help="Report of an earlier run to compare p95 latencies against")
+        parser.add_argument('--max-regression', type=float, default=20.0, help="Allowed p95 increase over --baseline, in percent")
+
+    def handle(self, *args, **options):
+        try:
+            mix      = {**DEFAULT_MIX, **parse_mix(options['mix'])}
+            workload = Workload(mix, options['actors'], options['seed'], options['password'], options['prefix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        report = workload.run(options['requests'], options['warmup'])
+        if options['baseline']:
+            with open(options['baseline']) as baseline:
+                report['regressions'] = compare(report, json.load(baseline), options['max_regression'])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as target:
+                target.write(output + '\n')
+        self.stdout.write(output)
+
+        if report.get('regressions'):
+            raise CommandError(f"p95 regressed on: {', '.join(item['endpoint'] for item in report['regressions'])}")
@@ -0,0 +1,35 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import User
+from task_management.imports import TaskImporter, FILE_TYPES, detect_file_type
+
+
+class Command(BaseCommand):
+    help = "Import tasks from a CSV or XLSX file and print a per-row error report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--assigned-by', required=True, help="Username of the user the tasks are assigned by")
+        parser.add_argument('--file-type', choices=FILE_TYPES, help="Defaults to the file extension")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        file_type = options['file_type'] or detect_file_type(options['path'])
+        if file_type is None:
+            raise CommandError("Cannot infer the file type, pass --file-type")
+
+        try:
+            assigned_by = User.objects.get(username=options['assigned_by'])
+        except User.DoesNotExist:
+            raise CommandError(f"User \"{options['assigned_by']}\" does not exist")
+
+        started  = time.perf_counter()
+        importer = TaskImporter(assigned_by, chunk_size=options['chunk_size'])
+        with open(options['path'], 'rb') as source:
+            report = importer.run(source, file_type)
+        report['seconds'] = round(time.perf_counter() - started, 3)
+
+        self.stdout.write(json.dumps(report, indent=2, default=str))
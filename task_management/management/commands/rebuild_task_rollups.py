@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from task_management.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the task_rollups table from the tasks table."
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups()
+        self.stdout.write(f"Rebuilt {rows} rollup rows")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from task_management.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Compare the task_counters table with the tasks table and repair the counts that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without repairing it")
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(dry_run=options['dry_run'])
+        for user_id, status, stored, actual in drift:
+            self.stdout.write(f"user {user_id} {status}: stored {stored}, actual {actual}")
+        verb = "Found" if options['dry_run'] else "Repaired"
+        self.stdout.write(f"{verb} {len(drift)} drifted counters")
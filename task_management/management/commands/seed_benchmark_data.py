@@ -0,0 +1,42 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import User
+from task_management.benchmark import seed_data, clear_data
+
+
+class Command(BaseCommand):
+    help = "Create a reproducible data set of users in a parent_id hierarchy and tasks for benchmark_workload."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--tasks', type=int, default=100000)
+        parser.add_argument('--fanout', type=int, default=10, help="Direct reports per staff user")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--password', default='benchmark', help="Password of every generated user")
+        parser.add_argument('--prefix', default='bench', help="Generated usernames are <prefix>-<n>")
+        parser.add_argument('--clear', action='store_true', help="Delete a previous data set with the same prefix first")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['fanout'] < 1 or options['tasks'] < 0:
+            raise CommandError("--users and --fanout must be positive and --tasks not negative")
+
+        prefix = options['prefix']
+        if options['clear']:
+            clear_data(prefix)
+        elif User.objects.filter(username__startswith=f'{prefix}-').exists():
+            raise CommandError(f"\"{prefix}-*\" users already exist, pass --clear to replace them")
+
+        started = time.perf_counter()
+        users   = seed_data(
+            options['users'], options['tasks'],
+            fanout=options['fanout'], seed=options['seed'], password=options['password'], prefix=prefix
+        )
+        self.stdout.write(json.dumps({
+            'users': len(users),
+            'staff': sum(1 for user in users if user.is_staff),
+            'tasks': options['tasks'],
+            'seconds': round(time.perf_counter() - started, 3),
+        }, indent=2))
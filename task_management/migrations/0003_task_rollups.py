@@ -0,0 +1,58 @@
+# Generated by Django 4.2.5 on 2026-10-18 02:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    Task       = apps.get_model('task_management', 'Task')
+    TaskRollup = apps.get_model('task_management', 'TaskRollup')
+    for role in ('assigned_to', 'assigned_by'):
+        grouped = (
+            Task.objects.order_by()
+            .values(f'{role}_id', 'status', 'due_date')
+            .annotate(task_count=models.Count('id'), worked_hours=models.Sum('worked_hours'))
+        )
+        TaskRollup.objects.bulk_create(
+            (
+                TaskRollup(
+                    user_id=row[f'{role}_id'], role=role, status=row['status'], due_date=row['due_date'],
+                    task_count=row['task_count'], worked_hours=row['worked_hours'] or 0
+                )
+                for row in grouped.iterator()
+            ),
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_management', '0002_task_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('assigned_to', 'Assigned to'), ('assigned_by', 'Assigned by')], max_length=20)),
+                ('status', models.CharField(max_length=20)),
+                ('due_date', models.DateField()),
+                ('task_count', models.IntegerField(default=0)),
+                ('worked_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'task_rollups',
+                'indexes': [models.Index(fields=['role', 'due_date'], name='task_rollups_role_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'role', 'status', 'due_date'), name='task_rollups_bucket_uniq'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
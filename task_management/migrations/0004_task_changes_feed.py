@@ -0,0 +1,46 @@
+# Generated by Django 4.2.5 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0003_task_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('assigned_to_id', models.BigIntegerField(null=True)),
+                ('assigned_by_id', models.BigIntegerField(null=True)),
+                ('deleted_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'task_tombstones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at'], name='tasks_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'updated_at'], name='tasks_assignee_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['deleted_at'], name='task_tombstones_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['assigned_to_id', 'deleted_at'], name='task_tombstones_assignee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['assigned_by_id', 'deleted_at'], name='task_tombstones_assigner_idx'),
+        ),
+    ]
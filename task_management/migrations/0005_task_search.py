@@ -0,0 +1,32 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:03
+
+from django.db import migrations, models
+
+from task_management.search import install_search_index, uninstall_search_index
+
+
+def install(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0004_task_changes_feed'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'created_at'], name='tasks_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date'], name='tasks_due_idx'),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_counters(apps, schema_editor):
+    Task        = apps.get_model('task_management', 'Task')
+    TaskCounter = apps.get_model('task_management', 'TaskCounter')
+    grouped     = Task.objects.order_by().values('assigned_to_id', 'status').annotate(task_count=models.Count('id'))
+    TaskCounter.objects.bulk_create(
+        (
+            TaskCounter(user_id=row['assigned_to_id'], status=row['status'], task_count=row['task_count'])
+            for row in grouped.iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_management', '0005_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(max_length=20)),
+                ('task_count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'task_counters',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskcounter',
+            constraint=models.UniqueConstraint(fields=('user', 'status'), name='task_counters_user_status_uniq'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
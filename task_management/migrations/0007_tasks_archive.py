@@ -0,0 +1,38 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:39
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_management', '0006_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('due_date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_rogress', 'In Progress'), ('completed', 'Completed'), ('paused', 'Paused')], max_length=20)),
+                ('completion_report', models.TextField(blank=True, null=True)),
+                ('worked_hours', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField()),
+                ('assigned_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('assigned_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'tasks_archive',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['created_at'], name='tasks_archive_created_idx'), models.Index(fields=['assigned_to', 'created_at'], name='tasks_archive_assignee_idx'), models.Index(fields=['assigned_by', 'created_at'], name='tasks_archive_assigner_idx'), models.Index(fields=['archived_at'], name='tasks_archive_archived_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:43
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_management', '0007_tasks_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskAuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('user_id', models.BigIntegerField(null=True)),
+                ('changes', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'task_audit_log',
+                'indexes': [models.Index(fields=['task_id', 'created_at'], name='task_audit_task_created_idx')],
+            },
+        ),
+    ]
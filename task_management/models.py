@@ -1,7 +1,14 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from users.models import User
 
 
+class TaskQuerySet(models.QuerySet):
+    def with_users(self):
+        """Join the assignee and assigner rows so serializing a page needs no extra lookups."""
+        return self.select_related('assigned_to', 'assigned_by')
+
+
 class Task(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -20,10 +27,157 @@ class Task(models.Model):
     worked_hours = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    # Fields whose before/after values are handed to the change signals in signals.py
+    TRACKED_FIELDS = ('assigned_to_id', 'assigned_by_id', 'status', 'due_date', 'worked_hours')
     
     def __str__(self):
         return f"{self.title} - {self.assigned_to.username}"
+
+    def tracked_state(self):
+        """Current values of TRACKED_FIELDS, without loading deferred fields."""
+        return {field: self.__dict__.get(field) for field in self.TRACKED_FIELDS}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_state = self.tracked_state()
     
     class Meta:
         db_table = "tasks"
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # Ascending indexes ending in created_at serve ORDER BY created_at DESC, id DESC
+        # as a backward scan; the primary key is the implicit last index column.
+        indexes = [
+            models.Index(fields=['created_at'], name='tasks_created_idx'),
+            models.Index(fields=['assigned_to', 'created_at'], name='tasks_assignee_created_idx'),
+            models.Index(fields=['assigned_by', 'created_at'], name='tasks_assigner_created_idx'),
+            models.Index(fields=['status', 'due_date'], name='tasks_status_due_idx'),
+            models.Index(fields=['status', 'created_at'], name='tasks_status_created_idx'),
+            models.Index(fields=['due_date'], name='tasks_due_idx'),
+            models.Index(fields=['assigned_to', 'status', 'due_date'], name='tasks_assignee_status_due_idx'),
+            models.Index(fields=['updated_at'], name='tasks_updated_idx'),
+            models.Index(fields=['assigned_to', 'updated_at'], name='tasks_assignee_updated_idx'),
+        ]
+        # The full-text search index is vendor specific: see search.py and migration 0005.
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of the tasks table by archive.py, with its id
+    and timestamps kept. Archived tasks are read-only and still counted by the
+    rollups and counters.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    assigned_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    assigned_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    due_date = models.DateField()
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    completion_report = models.TextField(blank=True, null=True)
+    worked_hours = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField()
+
+    objects = TaskQuerySet.as_manager()
+
+    TRACKED_FIELDS = Task.TRACKED_FIELDS
+    tracked_state  = Task.tracked_state
+
+    def __str__(self):
+        return f"{self.title} - {self.assigned_to.username}"
+
+    class Meta:
+        db_table = "tasks_archive"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='tasks_archive_created_idx'),
+            models.Index(fields=['assigned_to', 'created_at'], name='tasks_archive_assignee_idx'),
+            models.Index(fields=['assigned_by', 'created_at'], name='tasks_archive_assigner_idx'),
+            models.Index(fields=['archived_at'], name='tasks_archive_archived_idx'),
+        ]
+
+
+class TaskRollup(models.Model):
+    """
+    Per-user task totals for one (role, status, due_date) bucket, kept up to date
+    incrementally from the task change signals.
+    """
+    ROLE_CHOICES = [
+        ('assigned_to', 'Assigned to'),
+        ('assigned_by', 'Assigned by')
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_rollups')
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+    status = models.CharField(max_length=20)
+    due_date = models.DateField()
+    task_count = models.IntegerField(default=0)
+    worked_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "task_rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'role', 'status', 'due_date'], name='task_rollups_bucket_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['role', 'due_date'], name='task_rollups_role_due_idx'),
+        ]
+
+
+class TaskCounter(models.Model):
+    """
+    Number of tasks assigned to a user in one status, kept exact incrementally
+    from the task change signals so a user's counts are one indexed read.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_counters', db_index=False)
+    status = models.CharField(max_length=20)
+    task_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "task_counters"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'status'], name='task_counters_user_status_uniq'),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """
+    Record of a deleted task for the changes feed, or of a reassigned task's
+    previous assignee and assigner. Ids are plain integers so the tombstone
+    outlives the task and the users it referenced.
+    """
+    task_id = models.BigIntegerField()
+    assigned_to_id = models.BigIntegerField(null=True)
+    assigned_by_id = models.BigIntegerField(null=True)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "task_tombstones"
+        indexes = [
+            models.Index(fields=['deleted_at'], name='task_tombstones_deleted_idx'),
+            models.Index(fields=['assigned_to_id', 'deleted_at'], name='task_tombstones_assignee_idx'),
+            models.Index(fields=['assigned_by_id', 'deleted_at'], name='task_tombstones_assigner_idx'),
+        ]
+
+
+class TaskAuditEntry(models.Model):
+    """
+    One update of a task: who made it and the [old, new] value of each audited
+    field it changed. Append-only; ids are plain integers so the trail outlives
+    the task and the user, like TaskTombstone.
+    """
+    task_id = models.BigIntegerField()
+    user_id = models.BigIntegerField(null=True)
+    changes = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "task_audit_log"
+        # Serves WHERE task_id = ? ORDER BY created_at DESC, id DESC as a backward scan.
+        indexes = [
+            models.Index(fields=['task_id', 'created_at'], name='task_audit_task_created_idx'),
+        ]
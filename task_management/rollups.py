@@ -0,0 +1,131 @@
+from decimal import Decimal
+
+import pandas as pd
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum, Count
+
+from .models import Task, ArchivedTask, TaskRollup
+
+ROLES          = ('assigned_to', 'assigned_by')
+BUCKET_PERIODS = {'day': 'D', 'week': 'W', 'month': 'M'}
+
+
+def _deltas(changes):
+    """
+    Fold (previous_state, new_state) pairs into per-bucket count and hours deltas.
+    A None state means the task did not exist before, or no longer exists.
+    """
+    deltas = {}
+    for previous, current in changes:
+        for state, sign in ((previous, -1), (current, 1)):
+            if not state:
+                continue
+            hours = state['worked_hours'] or Decimal('0')
+            for role in ROLES:
+                if state[f'{role}_id'] is None:
+                    continue
+                key = (state[f'{role}_id'], role, state['status'], state['due_date'])
+                count, total = deltas.get(key, (0, Decimal('0')))
+                deltas[key] = (count + sign, total + sign * hours)
+    return {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+
+
+def apply_changes(changes):
+    """Apply task state changes to the rollup table with atomic F() updates."""
+    deltas = _deltas(changes)
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        # A stable key order keeps concurrent writers from deadlocking on the same rows.
+        for key in sorted(deltas, key=str):
+            user_id, role, status, due_date = key
+            count, hours = deltas[key]
+            bucket  = TaskRollup.objects.filter(user_id=user_id, role=role, status=status, due_date=due_date)
+            updated = bucket.update(task_count=F('task_count') + count, worked_hours=F('worked_hours') + hours)
+            if updated or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    TaskRollup.objects.create(
+                        user_id=user_id, role=role, status=status, due_date=due_date,
+                        task_count=count, worked_hours=hours
+                    )
+            except IntegrityError:
+                bucket.update(task_count=F('task_count') + count, worked_hours=F('worked_hours') + hours)
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from the tasks and tasks_archive tables with one GROUP BY per role and table."""
+    totals = {}
+    for model in (Task, ArchivedTask):
+        for role in ROLES:
+            grouped = (
+                model.objects.order_by()
+                .values(f'{role}_id', 'status', 'due_date')
+                .annotate(task_count=Count('id'), worked_hours=Sum('worked_hours'))
+            )
+            for row in grouped.iterator():
+                key = (row[f'{role}_id'], role, row['status'], row['due_date'])
+                count, hours = totals.get(key, (0, Decimal('0')))
+                totals[key] = (count + row['task_count'], hours + (row['worked_hours'] or 0))
+    rows = [
+        TaskRollup(user_id=user_id, role=role, status=status, due_date=due_date, task_count=count, worked_hours=hours)
+        for (user_id, role, status, due_date), (count, hours) in totals.items()
+    ]
+
+    with transaction.atomic():
+        TaskRollup.objects.all().delete()
+        TaskRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _hours(value):
+    return str(Decimal(value or 0).quantize(Decimal('0.01')))
+
+
+def summarize(rollups, today):
+    by_status, total_hours = {}, Decimal('0')
+    for row in rollups.order_by().values('status').annotate(count=Sum('task_count'), hours=Sum('worked_hours')):
+        by_status[row['status']] = {'count': row['count'], 'worked_hours': _hours(row['hours'])}
+        total_hours += Decimal(row['hours'] or 0)
+
+    overdue = rollups.filter(due_date__lt=today).exclude(status='completed').aggregate(count=Sum('task_count'))
+    return {
+        'task_count': sum(item['count'] for item in by_status.values()),
+        'worked_hours': _hours(total_hours),
+        'overdue': overdue['count'] or 0,
+        'by_status': by_status,
+    }
+
+
+def bucket_report(rollups, bucket):
+    """
+    Totals and completion rate per due-date period, grouped with pandas over the
+    rollup rows, so the cost follows the number of buckets rather than tasks.
+    """
+    records = rollups.order_by().values_list('due_date', 'status', 'task_count', 'worked_hours')
+    frame   = pd.DataFrame.from_records(list(records), columns=['due_date', 'status', 'task_count', 'worked_hours'])
+    if frame.empty:
+        return []
+
+    frame['period']       = pd.to_datetime(frame['due_date']).dt.to_period(BUCKET_PERIODS[bucket])
+    frame['completed']    = frame['task_count'].where(frame['status'] == 'completed', 0)
+    frame['worked_hours'] = frame['worked_hours'].astype(float)
+    grouped = frame.groupby('period').agg(
+        total=('task_count', 'sum'),
+        completed=('completed', 'sum'),
+        worked_hours=('worked_hours', 'sum'),
+    )
+    grouped['completion_rate'] = (grouped['completed'] / grouped['total'].where(grouped['total'] > 0)).fillna(0).round(4)
+
+    return [
+        {
+            'period': str(period),
+            'total': int(row.total),
+            'completed': int(row.completed),
+            'worked_hours': round(float(row.worked_hours), 2),
+            'completion_rate': float(row.completion_rate),
+        }
+        for period, row in grouped.iterrows()
+    ]
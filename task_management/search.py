@@ -0,0 +1,111 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+SEARCH_FIELDS = ('title', 'description', 'completion_report')
+MAX_TERMS     = 8
+TERM_RE       = re.compile(r'\w+')
+
+# External-content FTS5 table over tasks; the triggers keep it in step with every
+# write, including bulk_create()/bulk_update() and raw SQL.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts (rowid, title, description, completion_report)
+        VALUES (new.id, new.title, new.description, new.completion_report);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, completion_report)
+        VALUES ('delete', old.id, old.title, old.description, old.completion_report);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description, completion_report ON tasks BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description, completion_report)
+        VALUES ('delete', old.id, old.title, old.description, old.completion_report);
+        INSERT INTO tasks_fts (rowid, title, description, completion_report)
+        VALUES (new.id, new.title, new.description, new.completion_report);
+    END
+    """,
+]
+SQLITE_INSTALL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, completion_report, content='tasks', content_rowid='id')",
+    *SQLITE_TRIGGERS,
+    "INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')",
+]
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS tasks_fts_insert",
+    "DROP TRIGGER IF EXISTS tasks_fts_delete",
+    "DROP TRIGGER IF EXISTS tasks_fts_update",
+    "DROP TABLE IF EXISTS tasks_fts",
+]
+
+# InnoDB maintains FULLTEXT indexes itself.
+MYSQL_INSTALL   = ["CREATE FULLTEXT INDEX tasks_search_idx ON tasks (title, description, completion_report)"]
+MYSQL_UNINSTALL = ["DROP INDEX tasks_search_idx ON tasks"]
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def install_search_index(connection):
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_INSTALL)
+    elif connection.vendor == 'mysql':
+        _execute(connection, MYSQL_INSTALL)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_UNINSTALL)
+    elif connection.vendor == 'mysql':
+        _execute(connection, MYSQL_UNINSTALL)
+
+
+def repair_search_index(sender, using, **kwargs):
+    """
+    post_migrate hook. SQLite migrations that alter the tasks table rebuild it,
+    which drops its triggers; recreate them and reindex when that happened.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name LIKE 'tasks_fts%'")
+        names = {row[0] for row in cursor.fetchall()}
+    if 'tasks_fts' in names and not {'tasks_fts_insert', 'tasks_fts_delete', 'tasks_fts_update'} <= names:
+        install_search_index(connection)
+
+
+def search(queryset, text):
+    """
+    Restrict `queryset` to tasks matching every word of `text` (prefix matches)
+    in any of SEARCH_FIELDS, using the full-text index where there is one.
+    """
+    terms = TERM_RE.findall(text)[:MAX_TERMS]
+    if not terms:
+        return queryset
+
+    # The index covers the tasks table only; archived tasks are matched with LIKE.
+    vendor = connections[queryset.db].vendor if queryset.model._meta.db_table == 'tasks' else None
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(id__in=RawSQL("SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH %s", [match]))
+    if vendor == 'mysql':
+        match = ' '.join(f'+{term}*' for term in terms)
+        return queryset.filter(id__in=RawSQL(
+            "SELECT id FROM tasks WHERE MATCH (title, description, completion_report) AGAINST (%s IN BOOLEAN MODE)",
+            [match]
+        ))
+
+    for term in terms:
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term) | Q(completion_report__icontains=term))
+    return queryset
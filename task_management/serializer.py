@@ -1,13 +1,73 @@
 from rest_framework import serializers
-from .models import Task
+from .models import Task, TaskAuditEntry
+from .audit import audit_log, diff
 from users.models import User
 from users.serializer import UserSerializer
+from utils.fast_serializer import CompiledSerializer
+
+
+class AssigneeField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves users from `context['assignees']` when a batch
+    has preloaded them, instead of running one lookup per item.
+    """
+
+    def to_internal_value(self, data):
+        assignees = self.context.get('assignees')
+        if assignees is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            user = assignees.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if user is None:
+            self.fail('does_not_exist', pk_value=data)
+        return user
+
+
+class TaskListSerializer(serializers.ListSerializer):
+    def preload_assignees(self, items):
+        if 'assignees' in self._context:
+            return
+        ids = set()
+        for item in items:
+            try:
+                ids.add(int(item.get('assigned_to_id')))
+            except (AttributeError, TypeError, ValueError):
+                continue
+        self._context['assignees'] = User.objects.in_bulk(ids)
+
+    def validate_items(self, instances=None):
+        """
+        Validate every item on its own so one bad row does not reject the batch.
+
+        Returns a list of (index, validated_data) for the valid items and a dict of
+        index -> errors for the rest. `instances`, when given, lines up with
+        `initial_data` and is used for the per-item status transition checks.
+        """
+        items = self.initial_data
+        if not isinstance(items, list):
+            raise serializers.ValidationError({'non_field_errors': ['Expected a list of items.']})
+
+        self.preload_assignees(items)
+        valid, errors = [], {}
+        for index, item in enumerate(items):
+            self.child.instance = instances[index] if instances is not None else None
+            try:
+                valid.append((index, self.child.run_validation(item)))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+        self.child.instance = None
+        return valid, errors
 
 
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to = UserSerializer(read_only=True)
     assigned_by = UserSerializer(read_only=True)
-    assigned_to_id = serializers.PrimaryKeyRelatedField(
+    assigned_to_id = AssigneeField(
         queryset=User.objects.all(),
         source='assigned_to',
         write_only=True,
@@ -16,6 +76,7 @@ class TaskSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Task
+        list_serializer_class = TaskListSerializer
         fields = [
             'id',
             'title',
@@ -66,4 +127,24 @@ class TaskSerializer(serializers.ModelSerializer):
         Automatically set the assigned_by user from the request context
         """
         validated_data['assigned_by'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """
+        Record the audited fields this update changes, as the requesting user
+        """
+        changes = diff(instance, validated_data)
+        instance = super().update(instance, validated_data)
+        request = self.context.get('request')
+        audit_log.record(instance, request.user if request else None, changes)
+        return instance
+
+
+class TaskAuditEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskAuditEntry
+        fields = ['id', 'task_id', 'user_id', 'changes', 'created_at']
+
+
+# Read-only fast path for list endpoints; same output as TaskSerializer(rows, many=True).data.
+fast_task_serializer = CompiledSerializer(TaskSerializer)
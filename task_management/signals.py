@@ -0,0 +1,211 @@
+from django.db import transaction
+from django.core.signals import request_finished
+from django.utils import timezone
+from django.dispatch import receiver, Signal
+from django.db.models.signals import post_init, post_save, post_delete
+
+from users.models import User
+from users.hierarchy import ancestor_ids
+from utils.db import release_connections
+from .models import Task, ArchivedTask, TaskTombstone
+from .cache import task_list_cache
+from . import rollups, counters
+from .events import task_events, task_event
+from .audit import audit_log
+
+# bulk_create()/bulk_update() send no model signals; the bulk paths send these instead.
+tasks_bulk_created = Signal()  # tasks: list of Task
+tasks_bulk_updated = Signal()  # changes: list of (previous_state, Task)
+# Archiving moves rows with raw deletes; only the caches care, see archive.py.
+tasks_archived = Signal()  # states: list of tracked_state() dicts
+
+
+def notify_bulk_created(tasks):
+    tasks_bulk_created.send(sender=Task, tasks=tasks)
+    for task in tasks:
+        task._loaded_state = task.tracked_state()
+
+
+def notify_bulk_updated(tasks):
+    tasks_bulk_updated.send(sender=Task, changes=[(task._loaded_state, task) for task in tasks])
+    for task in tasks:
+        task._loaded_state = task.tracked_state()
+
+
+@receiver(post_init, sender=Task)
+def remember_loaded_state(sender, instance, **kwargs):
+    instance._loaded_state = instance.tracked_state() if instance.pk else None
+
+
+@receiver(post_save, sender=Task)
+def rollup_saved_task(sender, instance, created, **kwargs):
+    previous = None if created else instance._loaded_state
+    rollups.apply_changes([(previous, instance.tracked_state())])
+
+
+@receiver(post_delete, sender=Task)
+def rollup_deleted_task(sender, instance, **kwargs):
+    rollups.apply_changes([(instance._loaded_state or instance.tracked_state(), None)])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def rollup_bulk_created(sender, tasks, **kwargs):
+    rollups.apply_changes([(None, task.tracked_state()) for task in tasks])
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def rollup_bulk_updated(sender, changes, **kwargs):
+    rollups.apply_changes([(previous, task.tracked_state()) for previous, task in changes])
+
+
+# Archived tasks are only ever deleted through the CASCADE from a deleted User.
+@receiver(post_delete, sender=ArchivedTask)
+def rollup_deleted_archived_task(sender, instance, **kwargs):
+    rollups.apply_changes([(instance.tracked_state(), None)])
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    previous = None if created else instance._loaded_state
+    counters.apply_changes([(previous, instance.tracked_state())])
+
+
+# Also sent for the tasks deleted through the CASCADE from a deleted User.
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    counters.apply_changes([(instance._loaded_state or instance.tracked_state(), None)])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def count_bulk_created(sender, tasks, **kwargs):
+    counters.apply_changes([(None, task.tracked_state()) for task in tasks])
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def count_bulk_updated(sender, changes, **kwargs):
+    counters.apply_changes([(previous, task.tracked_state()) for previous, task in changes])
+
+
+@receiver(post_delete, sender=ArchivedTask)
+def count_deleted_archived_task(sender, instance, **kwargs):
+    counters.apply_changes([(instance.tracked_state(), None)])
+
+
+@receiver(post_delete, sender=Task)
+def record_tombstone(sender, instance, **kwargs):
+    TaskTombstone.objects.create(
+        task_id=instance.pk,
+        assigned_to_id=instance.assigned_to_id,
+        assigned_by_id=instance.assigned_by_id,
+        deleted_at=timezone.now()
+    )
+
+
+def _reassigned(previous, task):
+    return previous is not None and any(previous[f'{role}_id'] != getattr(task, f'{role}_id') for role in rollups.ROLES)
+
+
+def _removal(previous, task):
+    # Scoped to the previous assignee and assigner, so those who no longer see
+    # the task get it in `deleted`; changes_since() drops it for those who still do.
+    return TaskTombstone(
+        task_id=task.pk,
+        assigned_to_id=previous['assigned_to_id'],
+        assigned_by_id=previous['assigned_by_id'],
+        deleted_at=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Task)
+def record_reassignment(sender, instance, created, **kwargs):
+    if not created and _reassigned(instance._loaded_state, instance):
+        _removal(instance._loaded_state, instance).save()
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def record_bulk_reassignments(sender, changes, **kwargs):
+    removals = [_removal(previous, task) for previous, task in changes if _reassigned(previous, task)]
+    if removals:
+        TaskTombstone.objects.bulk_create(removals)
+
+
+def _involved_users(*states):
+    """The assignees and assigners in `states` and every manager above them, who see the same tasks."""
+    user_ids = {state[f'{role}_id'] for state in states if state for role in rollups.ROLES} - {None}
+    return user_ids | ancestor_ids(user_ids) if user_ids else user_ids
+
+
+@receiver(post_save, sender=Task)
+def invalidate_saved_task(sender, instance, created, **kwargs):
+    task_list_cache.invalidate_tasks(_involved_users(instance._loaded_state, instance.tracked_state()))
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_deleted_task(sender, instance, **kwargs):
+    task_list_cache.invalidate_tasks(_involved_users(instance._loaded_state, instance.tracked_state()))
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def invalidate_bulk_created(sender, tasks, **kwargs):
+    task_list_cache.invalidate_tasks(_involved_users(*(task.tracked_state() for task in tasks)))
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def invalidate_bulk_updated(sender, changes, **kwargs):
+    states = [state for previous, task in changes for state in (previous, task.tracked_state())]
+    task_list_cache.invalidate_tasks(_involved_users(*states))
+
+
+@receiver(tasks_archived, sender=Task)
+def invalidate_archived(sender, states, **kwargs):
+    task_list_cache.invalidate_tasks(_involved_users(*states))
+
+
+def _publish(events):
+    # After commit, so a client fetching the task on the event sees the change.
+    transaction.on_commit(lambda: task_events.publish(events))
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, **kwargs):
+    _publish([task_event('created', instance) if created else task_event('updated', instance, instance._loaded_state)])
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_task(sender, instance, **kwargs):
+    _publish([task_event('deleted', instance, instance._loaded_state or instance.tracked_state())])
+
+
+@receiver(tasks_bulk_created, sender=Task)
+def publish_bulk_created(sender, tasks, **kwargs):
+    _publish([task_event('created', task) for task in tasks])
+
+
+@receiver(tasks_bulk_updated, sender=Task)
+def publish_bulk_updated(sender, changes, **kwargs):
+    _publish([task_event('updated', task, previous) for previous, task in changes])
+
+
+# Saves that only touch these columns leave every serialized task unchanged.
+UNSERIALIZED_USER_FIELDS = {'password', 'last_login'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and set(update_fields) <= UNSERIALIZED_USER_FIELDS):
+        return
+    task_list_cache.invalidate_users()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    task_list_cache.invalidate_users()
+
+
+# Runs after Django's own end-of-request cleanup, so the connection the flush
+# opens is released here.
+@receiver(request_finished)
+def flush_audit_log(sender, **kwargs):
+    if audit_log.due():
+        audit_log.flush()
+        release_connections()
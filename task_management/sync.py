@@ -0,0 +1,98 @@
+import json
+import base64
+import binascii
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import TaskTombstone
+
+# Rows newer than this are held back one poll: a transaction that stamped an
+# earlier updated_at may still be uncommitted, and the cursor must never pass it.
+SAFETY_LAG = timedelta(seconds=2)
+
+
+class SyncTokenError(ValueError):
+    pass
+
+
+class SyncTokenExpired(SyncTokenError):
+    pass
+
+
+def encode_token(position):
+    payload = json.dumps(position, default=lambda value: value.isoformat())
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    """
+    Positions in both streams, [updated_at, task id] and [deleted_at, tombstone id],
+    plus `synced_at`, the time up to which the client has seen every change.
+    """
+    if not token:
+        return {'tasks': None, 'tombstones': None, 'synced_at': None}
+    try:
+        position = json.loads(base64.urlsafe_b64decode((token + '=' * (-len(token) % 4)).encode()))
+        decoded  = {
+            stream: [datetime.fromisoformat(position[stream][0]), int(position[stream][1])] if position.get(stream) else None
+            for stream in ('tasks', 'tombstones')
+        }
+        decoded['synced_at'] = datetime.fromisoformat(position['synced_at']) if position.get('synced_at') else None
+        return decoded
+    except (TypeError, ValueError, KeyError, IndexError, AttributeError, binascii.Error, UnicodeDecodeError):
+        raise SyncTokenError("Invalid sync token")
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    stamp, pk = position
+    return queryset.filter(Q(**{f'{field}__gt': stamp}) | Q(**{field: stamp, 'id__gt': pk}))
+
+
+def changes_since(tasks, visibility, token, limit):
+    """
+    Return tasks updated and ids of tasks deleted or no longer visible after
+    `token`, at most `limit` of each, ordered by (timestamp, id), plus the
+    token to resume from.
+    """
+    position = decode_token(token)
+    horizon  = timezone.now() - SAFETY_LAG
+
+    # Tombstones are pruned after the retention period, so older tokens could miss deletes.
+    retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    if position['synced_at'] and position['synced_at'] < timezone.now() - retention:
+        raise SyncTokenExpired("Sync token has expired, a full resync is required")
+
+    changed = list(
+        _after(tasks, 'updated_at', position['tasks'])
+        .filter(updated_at__lt=horizon)
+        .order_by('updated_at', 'id')[:limit + 1]
+    )
+    deleted = list(
+        _after(TaskTombstone.objects.filter(visibility), 'deleted_at', position['tombstones'])
+        .filter(deleted_at__lt=horizon)
+        .order_by('deleted_at', 'id')
+        .values_list('deleted_at', 'id', 'task_id')[:limit + 1]
+    )
+    has_more = len(changed) > limit or len(deleted) > limit
+    changed, deleted = changed[:limit], deleted[:limit]
+
+    next_position = {
+        'tasks': [changed[-1].updated_at, changed[-1].pk] if changed else position['tasks'],
+        'tombstones': [deleted[-1][0], deleted[-1][1]] if deleted else position['tombstones'],
+        'synced_at': position['synced_at'] if has_more else horizon,
+    }
+    # A reassignment tombstone also matches users who can still see the task.
+    removed  = {task_id for _, _, task_id in deleted}
+    removed -= set(tasks.filter(id__in=removed).values_list('id', flat=True)) if removed else set()
+    return changed, [task_id for _, _, task_id in deleted if task_id in removed], encode_token(next_position), has_more
+
+
+def prune_tombstones():
+    cutoff = timezone.now() - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
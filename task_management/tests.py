@@ -1,3 +1,1137 @@
-from django.test import TestCase
+import json
+import time
+import tempfile
+import threading
+from io import BytesIO, StringIO
+from decimal import Decimal
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.db import connection, transaction, OperationalError
+from django.core.signals import request_finished
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import http_date
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import path, reverse
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.models import User
+from users.revocation import token_revocations
+from users.serializer import UserSerializer, fast_user_serializer
+from utils.renderers import FastJSONRenderer
+from utils.pagination import MAX_PER_PAGE
+from utils.db.router import ReplicaRouter, replica_reads, read_from_replica, reading_from_replica
+from utils.db import pool as pool_module
+from utils.db.sqlite3.base import DatabaseWrapper as PooledSQLiteWrapper
+from .cache import task_list_cache
+from .archive import archive_tasks
+from .audit import audit_log
+from .bulk import create_tasks, update_tasks, delete_tasks
+from .counters import reconcile_counters, counts_for
+from .rollups import rebuild_rollups
+from .events import TaskEventStream, task_events, task_event
+from .models import Task, ArchivedTask, TaskRollup, TaskCounter, TaskAuditEntry, TaskTombstone
+from .serializer import TaskSerializer, fast_task_serializer
+from .views import TaskAPIView, AsyncTaskAPIView
+
+# Serves the sync and async task views side by side for AsyncTaskAPITests.
+urlpatterns = [
+    path('sync/tasks/', TaskAPIView.as_view(), name='sync-task-list'),
+    path('sync/tasks/<int:pk>/', TaskAPIView.as_view(), name='sync-task-detail'),
+    path('async/tasks/', AsyncTaskAPIView.as_view(), name='async-task-list'),
+    path('async/tasks/<int:pk>/', AsyncTaskAPIView.as_view(), name='async-task-detail'),
+]
+
+
+class TaskTestMixin:
+    def create_user(self, username, **extra):
+        return User.objects.create_user(username=username, email=f'{username}@example.com', password='secret', **extra)
+
+    def create_tasks(self, count, assigned_to, assigned_by):
+        return Task.objects.bulk_create(
+            Task(
+                title=f'Task {i}',
+                description='description',
+                assigned_to=assigned_to[i % len(assigned_to)],
+                assigned_by=assigned_by,
+                due_date=date(2030, 1, 1),
+                status='pending',
+            )
+            for i in range(count)
+        )
+
+    def auth_headers(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskListQueryCountTests(TaskTestMixin, TestCase):
+    """A list page must cost the same number of queries whatever its size."""
+
+    def setUp(self):
+        cache.clear()
+        self.superuser = self.create_user('root', is_staff=True, is_superuser=True)
+        self.admin     = self.create_user('admin', is_staff=True)
+        self.members   = [self.create_user(f'member{i}') for i in range(5)]
+        self.create_tasks(60, self.members, self.admin)
+
+    def list_queries(self, user, per_page, **params):
+        headers = self.auth_headers(user)
+        url     = reverse('task-list-create')
+        # Warm the authenticated-user cache so only the list itself is measured.
+        self.client.get(url, {'perPage': 1}, **headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'perPage': per_page, **params}, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), per_page)
+        return len(queries)
+
+    def test_superuser_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(self.superuser, 5), 2)
+        self.assertEqual(self.list_queries(self.superuser, 50), 2)
+
+    def test_admin_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(self.admin, 5), 2)
+        self.assertEqual(self.list_queries(self.admin, 50), 2)
+
+    def test_member_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(self.members[0], 2), 2)
+        self.assertEqual(self.list_queries(self.members[0], 12), 2)
+
+    def test_cursor_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(self.superuser, 5, cursor=''), 1)
+        self.assertEqual(self.list_queries(self.superuser, 50, cursor=''), 1)
+
+    def test_detail_is_a_single_query(self):
+        task    = Task.objects.filter(assigned_to=self.members[0]).first()
+        headers = self.auth_headers(self.members[0])
+        url     = reverse('task-detail', args=[task.pk])
+        self.client.get(url, **headers)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.json()['data']['assigned_to']['username'], 'member0')
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskQueryPlanTests(TaskTestMixin, TestCase):
+    """
+    Run EXPLAIN on every query the list endpoint issues against the tasks table and
+    fail on full table scans or sorts that an index should have served.
+
+    The staff scope is an OR over two indexed columns: it is allowed to merge both
+    indexes and sort the merged rows, which are bounded by that user's own tasks.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.superuser = self.create_user('root', is_staff=True, is_superuser=True)
+        self.admin     = self.create_user('admin', is_staff=True)
+        self.members   = [self.create_user(f'member{i}') for i in range(10)]
+        self.create_tasks(300, self.members, self.admin)
+
+    def captured_task_queries(self, user, **params):
+        headers = self.auth_headers(user)
+        url     = reverse('task-list-create')
+        self.client.get(url, {'perPage': 1}, **headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'perPage': 10, **params}, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), [q['sql'] for q in queries.captured_queries if 'FROM "tasks"' in q['sql'] or 'FROM `tasks`' in q['sql']]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('EXPLAIN FORMAT=JSON ' + sql)
+                return cursor.fetchone()[0]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return '\n'.join(row[-1] for row in cursor.fetchall())
+
+    def assertIndexedPlan(self, sql, allow_index_merge=False):
+        plan = self.explain(sql)
+        if connection.vendor == 'mysql':
+            self.assertNotIn('"access_type": "ALL"', plan, f'Full table scan:\n{sql}\n{plan}')
+            if not (allow_index_merge and '"access_type": "index_merge"' in plan):
+                self.assertNotIn('"using_filesort": true', plan, f'Filesort:\n{sql}\n{plan}')
+        elif connection.vendor == 'sqlite':
+            for line in plan.splitlines():
+                self.assertFalse(line.strip() == 'SCAN tasks', f'Full table scan:\n{sql}\n{plan}')
+            if not (allow_index_merge and 'MULTI-INDEX OR' in plan):
+                self.assertNotIn('USE TEMP B-TREE', plan, f'Sort not served by an index:\n{sql}\n{plan}')
+        else:
+            self.skipTest(f'No plan assertions for {connection.vendor}')
+
+    def assertListPlans(self, user, allow_index_merge=False):
+        body, queries = self.captured_task_queries(user)
+        for sql in queries:
+            self.assertIndexedPlan(sql, allow_index_merge)
+
+        body, queries = self.captured_task_queries(user, cursor='')
+        for sql in queries:
+            self.assertIndexedPlan(sql, allow_index_merge)
+
+        body, queries = self.captured_task_queries(user, cursor=body['next'])
+        self.assertTrue(queries)
+        for sql in queries:
+            self.assertIndexedPlan(sql, allow_index_merge)
+
+    def test_superuser_list_uses_created_at_index(self):
+        self.assertListPlans(self.superuser)
+
+    def test_member_list_uses_assignee_index(self):
+        self.assertListPlans(self.members[0])
+
+    def test_admin_list_merges_assignee_and_assigner_indexes(self):
+        self.assertListPlans(self.admin, allow_index_merge=True)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    ROOT_URLCONF='task_management.tests'
+)
+class AsyncTaskAPITests(TaskTestMixin, TestCase):
+    """The async read path must answer exactly like the sync view it mirrors."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin   = self.create_user('admin', is_staff=True)
+        self.members = [self.create_user(f'member{i}') for i in range(3)]
+        self.tasks   = self.create_tasks(12, self.members, self.admin)
+        self.token   = self.auth_headers(self.members[0])['HTTP_AUTHORIZATION']
+
+    async def both(self, method, name, *args, **params):
+        headers  = {'Authorization': self.token}
+        sync     = await getattr(self.async_client, method)(reverse(f'sync-{name}', args=args), params, headers=headers)
+        response = await getattr(self.async_client, method)(reverse(f'async-{name}', args=args), params, headers=headers)
+        return sync, response
+
+    async def test_list_matches_sync_view(self):
+        for params in ({'perPage': 3}, {'perPage': 3, 'page': 2}, {'cursor': '', 'count': 'exact'}):
+            sync, response = await self.both('get', 'task-list', **params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, sync.content)
+            self.assertEqual(response['ETag'], sync['ETag'])
+            self.assertEqual(response['Content-Type'], sync['Content-Type'])
+
+    async def test_detail_matches_sync_view(self):
+        sync, response = await self.both('get', 'task-detail', self.tasks[0].pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync.content)
+
+        sync, response = await self.both('get', 'task-detail', self.tasks[1].pk)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content, sync.content)
+
+    async def test_archived_reads_match_sync_view(self):
+        archived = [task.pk for task in self.tasks[:6]]
+        await Task.objects.filter(pk__in=archived).aupdate(status='completed', updated_at=timezone.now() - timedelta(days=2))
+        await sync_to_async(archive_tasks)(timedelta(days=1))
+        for params in ({'perPage': 3, 'page': 2, 'archived': 'include'}, {'cursor': '', 'archived': 'include'}, {'archived': 'only'}):
+            sync, response = await self.both('get', 'task-list', **params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, sync.content)
+        sync, response = await self.both('get', 'task-detail', self.tasks[0].pk, archived='include')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync.content)
+
+    async def test_conditional_get_returns_not_modified(self):
+        url      = reverse('async-task-list')
+        response = await self.async_client.get(url, headers={'Authorization': self.token})
+        response = await self.async_client.get(url, headers={'Authorization': self.token, 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_writes_are_served_by_sync_view(self):
+        sync, response = await self.both('delete', 'task-detail', self.tasks[0].pk)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.content, sync.content)
+
+    async def test_async_queries_are_measured(self):
+        response = await self.async_client.get(reverse('async-task-list'), headers={'Authorization': self.token})
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
+    async def test_requires_token(self):
+        response = await self.async_client.get(reverse('async-task-list'))
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskListCacheTests(TaskTestMixin, TestCase):
+    """Cached list pages are served without queries and dropped by any change they show."""
+
+    def setUp(self):
+        cache.clear()
+        # Settings leave the cache off without REDIS_URL; the test cache is shared by the test process.
+        self.enterContext(mock.patch.object(task_list_cache, 'timeout', 300))
+        # PATCHes buffer audit entries that a later request or exit would write.
+        self.addCleanup(audit_log.clear)
+        self.superuser = self.create_user('root', is_staff=True, is_superuser=True)
+        self.admin     = self.create_user('admin', is_staff=True)
+        self.members   = [self.create_user(f'member{i}') for i in range(2)]
+        self.create_tasks(6, self.members, self.admin)
+        self.url     = reverse('task-list-create')
+        self.headers = {user.pk: self.auth_headers(user) for user in (self.superuser, *self.members)}
+
+    def fetch(self, user, **params):
+        response = self.client.get(self.url, {'perPage': 10, **params}, **self.headers[user.pk])
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertCached(self, user, **params):
+        self.fetch(user, **params)
+        with self.assertNumQueries(0):
+            return self.fetch(user, **params)
+
+    def assertNotCached(self, user, **params):
+        with CaptureQueriesContext(connection) as queries:
+            body = self.fetch(user, **params)
+        self.assertTrue(any('FROM "tasks"' in q['sql'] or 'FROM `tasks`' in q['sql'] for q in queries.captured_queries))
+        return body
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.fetch(self.members[0])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.fetch(self.members[0]), first)
+        self.assertNotCached(self.members[0], page=2)
+
+    def test_task_change_invalidates_involved_users_only(self):
+        self.assertCached(self.members[0])
+        self.assertCached(self.members[1])
+        self.assertCached(self.superuser)
+
+        task = Task.objects.filter(assigned_to=self.members[0]).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('task-detail', args=[task.pk]), {'status': 'paused'},
+                content_type='application/json', **self.headers[self.members[0].pk]
+            )
+
+        body = self.assertNotCached(self.members[0])
+        self.assertIn('paused', [item['status'] for item in body['data']])
+        self.assertNotCached(self.superuser)
+        with self.assertNumQueries(0):
+            self.fetch(self.members[1])
+
+    def test_user_change_invalidates_nested_pages(self):
+        self.assertCached(self.members[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.first_name = 'Changed'
+            self.admin.save()
+
+        body = self.assertNotCached(self.members[0])
+        self.assertEqual(body['data'][0]['assigned_by']['first_name'], 'Changed')
+
+    def test_hit_rate_is_tracked(self):
+        from .cache import task_list_cache
+        before = task_list_cache.stats()
+        self.assertCached(self.members[0])
+        after = task_list_cache.stats()
+        self.assertEqual(after['hits'] - before['hits'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskFilterTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.superuser = self.create_user('root', is_staff=True, is_superuser=True)
+        self.admin     = self.create_user('admin', is_staff=True)
+        self.members   = [self.create_user(f'member{i}') for i in range(2)]
+        self.headers   = self.auth_headers(self.superuser)
+        rows = [
+            ('Quarterly report', 'Compile the finance numbers', 'pending', date(2020, 1, 10), self.members[0]),
+            ('Fix login page', 'Broken redirect after login', 'completed', date(2020, 2, 1), self.members[0]),
+            ('Write onboarding guide', 'Document the reporting tools', 'paused', date(2031, 5, 1), self.members[1]),
+            ('Order supplies', 'Paper and toner', 'pending', date(2031, 6, 1), self.members[1]),
+        ]
+        self.tasks = Task.objects.bulk_create(
+            Task(title=title, description=description, status=task_status, due_date=due_date,
+                 assigned_to=assignee, assigned_by=self.admin)
+            for title, description, task_status, due_date, assignee in rows
+        )
+
+    def titles(self, **params):
+        response = self.client.get(reverse('task-list-create'), {'perPage': 50, **params}, **self.headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(item['title'] for item in response.json()['data'])
+
+    def test_status_filter(self):
+        self.assertEqual(self.titles(status='pending'), ['Order supplies', 'Quarterly report'])
+        self.assertEqual(self.titles(status='paused,completed'), ['Fix login page', 'Write onboarding guide'])
+
+    def test_due_date_range(self):
+        self.assertEqual(self.titles(dueFrom='2020-01-15', dueTo='2031-05-01'), ['Fix login page', 'Write onboarding guide'])
+
+    def test_assignee_and_assigner(self):
+        self.assertEqual(self.titles(assignedTo=self.members[1].pk), ['Order supplies', 'Write onboarding guide'])
+        self.assertEqual(self.titles(assignedBy=self.superuser.pk), [])
+
+    def test_overdue(self):
+        self.assertEqual(self.titles(overdue='true'), ['Quarterly report'])
+        self.assertEqual(len(self.titles(overdue='false')), 3)
+
+    def test_invalid_filters_are_rejected(self):
+        for params in ({'status': 'done'}, {'dueFrom': '01/02/2020'}, {'assignedTo': 'me'}, {'overdue': 'maybe'}):
+            response = self.client.get(reverse('task-list-create'), params, **self.headers)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_search_matches_all_words_by_prefix(self):
+        self.assertEqual(self.titles(q='report'), ['Quarterly report', 'Write onboarding guide'])
+        self.assertEqual(self.titles(q='login redir'), ['Fix login page'])
+        # Query syntax characters are treated as separators, never as FTS operators.
+        self.assertEqual(self.titles(q='"supplies" OR ('), ['Order supplies'])
+
+    def test_search_follows_updates_and_deletes(self):
+        task = self.tasks[3]
+        with self.captureOnCommitCallbacks(execute=True):
+            task.completion_report = 'Delivered by courier'
+            task.save()
+        self.assertEqual(self.titles(q='courier'), ['Order supplies'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(self.titles(q='courier'), [])
+
+    def test_filters_narrow_but_never_widen_scope(self):
+        self.headers = self.auth_headers(self.members[0])
+        self.assertEqual(self.titles(assignedTo=self.members[1].pk), [])
+        self.assertEqual(self.titles(q='report'), ['Quarterly report'])
+
+    def test_search_uses_full_text_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plan assertion is SQLite specific')
+        with CaptureQueriesContext(connection) as queries:
+            self.titles(q='report', status='pending')
+        sql = next(q['sql'] for q in queries.captured_queries if 'tasks_fts' in q['sql'] and 'COUNT' not in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            plan = '\n'.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+        self.assertFalse(any(line.strip() == 'SCAN tasks' for line in plan.splitlines()), plan)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class FastSerializationTests(TaskTestMixin, TestCase):
+    """The list fast path must produce exactly what the DRF serializers and renderer do."""
+
+    def setUp(self):
+        self.admin  = self.create_user('admin', is_staff=True, first_name='Zoë')
+        self.member = self.create_user('member')
+        self.create_tasks(3, [self.member], self.admin)
+        Task.objects.filter(pk=Task.objects.first().pk).update(
+            title='Line\u2028separator \u2029 ünïcode', completion_report='Done', worked_hours=Decimal('3.5')
+        )
+        self.tasks = list(Task.objects.with_users())
+
+    def test_compiled_task_serializer_matches_drf(self):
+        self.assertEqual(fast_task_serializer.many(self.tasks), TaskSerializer(self.tasks, many=True).data)
+        with override_settings(TIME_ZONE='Asia/Kolkata'):
+            self.assertEqual(fast_task_serializer.many(self.tasks), TaskSerializer(self.tasks, many=True).data)
+            self.assertEqual(fast_task_serializer.one(self.tasks[0]), TaskSerializer(self.tasks[0]).data)
+
+    def test_compiled_user_serializer_matches_drf(self):
+        users = list(User.objects.all())
+        self.assertEqual(fast_user_serializer.many(users), UserSerializer(users, many=True).data)
+
+    def test_renderer_is_byte_compatible(self):
+        payloads = [
+            {'status': True, 'message': None, 'data': fast_task_serializer.many(self.tasks), 'total_pages': 1},
+            {'errors': {0: ['Invalid'], 12: {'title': ['Required']}}, 'ok': [1.5, 0.25, -3, False]},
+            {'at': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc), 'day': date(2024, 5, 1), 'hours': Decimal('1.10')},
+            {'big': 2 ** 70, 'text': 'quote " backslash \\ tab \t \u2028'},
+        ]
+        for payload in payloads:
+            self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class PerformanceMiddlewareTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin   = self.create_user('admin', is_staff=True)
+        self.member  = self.create_user('member')
+        self.create_tasks(5, [self.member], self.admin)
+        self.headers = self.auth_headers(self.member)
+
+    def test_server_timing_reports_phases_and_queries(self):
+        self.client.get(reverse('task-list-create'), {'perPage': 1}, **self.headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-list-create'), **self.headers)
+        timing = response['Server-Timing']
+        for phase in ('auth', 'serialize', 'render', 'total'):
+            self.assertIn(f'{phase};dur=', timing)
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+
+    def test_metrics_endpoint_exposes_route_histograms(self):
+        self.client.get(reverse('task-list-create'), **self.headers)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{method="GET",route="task/tasks/",le="+Inf"}', body)
+        self.assertIn('http_request_db_queries_total{method="GET",route="task/tasks/"}', body)
+        self.assertIn('task_list_cache_misses_total', body)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_metrics_token_is_enforced(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(SLOW_REQUEST_MS=0.001)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('performance.slow_requests', 'WARNING') as logs:
+            self.client.get(reverse('task-list-create'), **self.headers)
+        self.assertIn('FROM "tasks"' if connection.vendor != 'mysql' else 'FROM `tasks`', logs.output[0])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BenchmarkCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_and_workload(self):
+        call_command('seed_benchmark_data', users=13, tasks=80, fanout=3, stdout=StringIO())
+        root = User.objects.get(username='bench-0')
+        self.assertTrue(root.is_superuser)
+        self.assertEqual(User.objects.filter(parent_id=root).count(), 3)
+        self.assertEqual(User.objects.get(username='bench-12').parent_id.username, 'bench-3')
+        self.assertEqual(Task.objects.count(), 80)
+        self.assertEqual(sum(TaskRollup.objects.filter(role='assigned_to').values_list('task_count', flat=True)), 80)
+
+        seeded = sorted(Task.objects.values_list('id', 'status', 'updated_at'))
+        out = StringIO()
+        call_command('benchmark_workload', requests=120, warmup=10, actors=6, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['total']['errors'], 0)
+        self.assertEqual(sum(endpoint['requests'] for endpoint in report['endpoints'].values()), 120)
+        for endpoint in report['endpoints'].values():
+            self.assertLessEqual(endpoint['p50_ms'], endpoint['p95_ms'])
+            self.assertLessEqual(endpoint['p95_ms'], endpoint['p99_ms'])
+        self.assertGreater(report['endpoints']['patch']['requests'], 0)
+        # Tasks created by the run are removed again and seeded tasks are never
+        # written, so runs start from the same data.
+        self.assertEqual(sorted(Task.objects.values_list('id', 'status', 'updated_at')), seeded)
+        self.assertFalse(TaskTombstone.objects.exists())
+        self.assertFalse(TaskAuditEntry.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class HierarchyVisibilityTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.director = self.create_user('director', is_staff=True)
+        self.manager  = self.create_user('manager', parent_id=self.director, is_staff=True)
+        self.member   = self.create_user('member', parent_id=self.manager)
+        self.outsider = self.create_user('outsider')
+        self.create_tasks(3, [self.member], self.manager)
+        self.create_tasks(2, [self.outsider], self.outsider)
+
+    def task_count(self, user):
+        response = self.client.get(reverse('task-list-create'), **self.auth_headers(user))
+        self.assertEqual(response.status_code, 200)
+        return len(response.json()['data'])
+
+    def test_managers_see_tasks_in_their_subtree(self):
+        self.assertEqual(self.task_count(self.director), 3)
+        self.assertEqual(self.task_count(self.manager), 3)
+        self.assertEqual(self.task_count(self.member), 3)
+
+    def test_subordinate_task_change_invalidates_manager_lists(self):
+        self.assertEqual(self.task_count(self.director), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_tasks(1, [self.member], self.member)[0].save()
+        self.assertEqual(self.task_count(self.director), 4)
+
+    def test_list_pages_send_no_last_modified(self):
+        url     = reverse('task-list-create')
+        headers = self.auth_headers(self.member)
+        first   = self.client.get(url, **headers)
+        self.assertIn('ETag', first)
+        self.assertNotIn('Last-Modified', first)
+
+        task = Task.objects.filter(assigned_to=self.member).first()
+        task.assigned_to = self.outsider
+        task.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 2)
+        self.assertIn('Last-Modified', self.client.get(reverse('task-detail', args=[task.pk]), **self.auth_headers(self.outsider)))
+
+
+@mock.patch('task_management.sync.SAFETY_LAG', timedelta(0))
+class TaskChangesTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        self.manager = self.create_user('manager', is_staff=True)
+        self.member  = self.create_user('member', parent_id=self.manager)
+        self.other   = self.create_user('other', parent_id=self.manager)
+        self.tasks   = self.create_tasks(2, [self.member], self.manager)
+
+    def changes(self, user):
+        response = self.client.get(reverse('task-changes'), **self.auth_headers(user))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        return sorted(task['id'] for task in data['changed']), sorted(data['deleted'])
+
+    def test_reassigned_tasks_are_removed_for_the_previous_assignee(self):
+        first, second = (task.pk for task in self.tasks)
+        task = Task.objects.get(pk=first)
+        task.assigned_to = self.other
+        task.save()
+        update_tasks(self.manager, Task.objects.all(), [{'id': second, 'assigned_to_id': self.other.pk}])
+
+        self.assertEqual(self.changes(self.member), ([], [first, second]))
+        self.assertEqual(self.changes(self.other), ([first, second], []))
+        self.assertEqual(self.changes(self.manager), ([first, second], []))
+
+
+class TaskEndpointMethodTests(TaskTestMixin, TestCase):
+    """Views derived from TaskAPIView answer only the methods they implement."""
+
+    def test_unsupported_methods_are_not_allowed(self):
+        admin   = self.create_user('admin', is_staff=True, is_superuser=True)
+        task    = self.create_tasks(1, [admin], admin)[0]
+        headers = self.auth_headers(admin)
+        not_allowed = {
+            'task-export': ('post', 'patch', 'delete'),
+            'task-stats': ('post', 'patch', 'delete'),
+            'task-counts': ('post', 'patch', 'delete'),
+            'task-changes': ('post', 'patch', 'delete'),
+            'task-stats-rebuild': ('get', 'patch', 'delete'),
+            'task-import': ('get', 'patch', 'delete'),
+            'task-bulk': ('get',),
+        }
+        for name, methods in not_allowed.items():
+            for method in methods:
+                with self.subTest(name=name, method=method):
+                    response = getattr(self.client, method)(reverse(name), {'id': task.pk}, content_type='application/json', **headers)
+                    self.assertEqual(response.status_code, 405)
+        self.assertEqual(Task.objects.count(), 1)
+
+        member = self.auth_headers(self.create_user('member'))
+        self.assertEqual(self.client.delete(reverse('task-export'), **member).status_code, 405)
+        self.assertEqual(self.client.get(reverse('task-counts'), **member).status_code, 200)
+
+
+class TaskBulkTests(TaskTestMixin, TestCase):
+    def test_malformed_ids_fail_per_item(self):
+        admin   = self.create_user('admin', is_staff=True, is_superuser=True)
+        tasks   = self.create_tasks(2, [admin], admin)
+        headers = self.auth_headers(admin)
+        bad_ids = [[1], {'id': 1}, True, '1', None]
+
+        items    = [{'id': pk, 'status': 'paused'} for pk in bad_ids] + [{'id': tasks[0].pk, 'status': 'paused'}]
+        response = self.client.patch(reverse('task-bulk'), items, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['data']
+        self.assertEqual([result['errors'] for result in results[:5]], ["Task id must be an integer"] * 5)
+        self.assertEqual(results[5], {'index': 5, 'status': True, 'id': tasks[0].pk})
+
+        response = self.client.delete(reverse('task-bulk'), {'ids': bad_ids + [tasks[1].pk]}, content_type='application/json', **headers)
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['data']
+        self.assertEqual([result['errors'] for result in results[:5]], ["Task id must be an integer"] * 5)
+        self.assertTrue(results[5]['status'])
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [tasks[0].pk])
+
+
+class TaskExportTests(TaskTestMixin, TestCase):
+    def test_xlsx_export_strips_control_characters(self):
+        admin = self.create_user('admin', is_staff=True, is_superuser=True)
+        task  = self.create_tasks(1, [admin], admin)[0]
+        Task.objects.filter(pk=task.pk).update(title='Bell\x07 task', description='Line\x0bbreak\nkept')
+
+        response = self.client.get(reverse('task-export'), {'fileType': 'xlsx'}, **self.auth_headers(admin))
+        self.assertEqual(response.status_code, 200)
+        sheet = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)['tasks']
+        header, row = list(sheet.iter_rows(values_only=True))
+        self.assertEqual((row[header.index('title')], row[header.index('description')]), ('Bell task', 'Linebreak\nkept'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], DATABASE_REPLICA_MAX_LAG=5)
+class ReplicaRoutingTests(SimpleTestCase):
+    def test_reads_use_replicas_only_when_asked(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Task), 'default')
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Task), 'replica_0')
+        with override_settings(DATABASE_REPLICAS=[]), replica_reads():
+            self.assertEqual(router.db_for_read(Task), 'default')
+
+    def test_writes_use_primary(self):
+        task = Task()
+        task._state.db = 'replica_0'
+        self.assertEqual(ReplicaRouter().db_for_write(Task, instance=task), 'default')
+
+    def test_view_methods_read_from_replica(self):
+        @read_from_replica
+        def get():
+            return reading_from_replica()
+
+        @read_from_replica
+        async def aget():
+            return reading_from_replica()
+
+        self.assertTrue(get())
+        self.assertTrue(async_to_sync(aget)())
+        self.assertFalse(reading_from_replica())
+
+    @mock.patch.object(task_list_cache, 'timeout', 300)
+    def test_pages_read_from_replica_are_cached_briefly(self):
+        self.assertEqual(task_list_cache._store_timeout(), task_list_cache.timeout)
+        with replica_reads():
+            self.assertEqual(task_list_cache._store_timeout(), 5)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        database = tempfile.NamedTemporaryFile(suffix='.sqlite3')
+        self.addCleanup(database.close)
+        self.settings_dict = {
+            **connection.settings_dict, 'NAME': database.name, 'TEST': {},
+            'CONN_HEALTH_CHECKS': True, 'POOL_SIZE': 1, 'POOL_TIMEOUT': 0.05, 'POOL_RECYCLE': 0,
+        }
+        self.addCleanup(pool_module._pools.pop, 'pool-test', None)
+
+    def wrapper(self):
+        return PooledSQLiteWrapper(self.settings_dict, alias='pool-test')
+
+    def test_closed_connections_are_reused_by_other_threads(self):
+        first = self.wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+
+        second = self.wrapper()
+        thread = threading.Thread(target=second.ensure_connection)
+        thread.start()
+        thread.join()
+        self.assertIs(second.connection, raw)
+        second.close()
+
+    def test_open_connections_are_capped(self):
+        first, second = self.wrapper(), self.wrapper()
+        first.ensure_connection()
+        with self.assertRaises(OperationalError):
+            second.ensure_connection()
+
+        first.close()
+        second.ensure_connection()
+        second.close()
+
+    def test_broken_connections_are_not_reused(self):
+        first = self.wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.errors_occurred = True
+        first.close()
+
+        second = self.wrapper()
+        second.ensure_connection()
+        self.assertIsNot(second.connection, raw)
+        second.close()
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskCounterTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = self.create_user('manager', is_staff=True)
+        self.member  = self.create_user('member', parent_id=self.manager)
+        self.other   = self.create_user('other', parent_id=self.manager)
+
+    def counts(self, user):
+        return dict(TaskCounter.objects.filter(user=user, task_count__gt=0).values_list('status', 'task_count'))
+
+    def test_counts_follow_single_task_changes(self):
+        task = Task.objects.create(
+            title='Task', description='description', assigned_to=self.member, assigned_by=self.manager,
+            due_date=date(2030, 1, 1), status='pending'
+        )
+        self.assertEqual(self.counts(self.member), {'pending': 1})
+        task.status = 'paused'
+        task.save()
+        self.assertEqual(self.counts(self.member), {'paused': 1})
+        task.assigned_to = self.other
+        task.save()
+        self.assertEqual(self.counts(self.member), {})
+        self.assertEqual(self.counts(self.other), {'paused': 1})
+        task.delete()
+        self.assertEqual(self.counts(self.other), {})
+
+    def test_counts_follow_bulk_paths(self):
+        items   = [{'title': f'Task {i}', 'description': 'd', 'assigned_to_id': self.member.id, 'due_date': '2030-01-01', 'status': 'pending'} for i in range(4)]
+        results = create_tasks(self.manager, items)
+        ids     = [result['id'] for result in results]
+        self.assertEqual(self.counts(self.member), {'pending': 4})
+
+        update_tasks(self.manager, Task.objects.all(), [{'id': pk, 'status': 'completed'} for pk in ids[:3]])
+        self.assertEqual(self.counts(self.member), {'pending': 1, 'completed': 3})
+
+        delete_tasks(Task.objects.all(), ids[:2])
+        self.assertEqual(self.counts(self.member), {'pending': 1, 'completed': 1})
+        self.assertEqual(reconcile_counters(dry_run=True), [])
+
+    def test_repeated_ids_in_a_bulk_update_are_applied_once(self):
+        ids     = [task.pk for task in self.create_tasks(3, [self.member], self.manager)]
+        reconcile_counters()
+        rebuild_rollups()
+
+        results = update_tasks(self.manager, Task.objects.all(), [{'id': ids[0], 'status': 'paused'}, {'id': ids[0], 'status': 'paused'}])
+        self.assertEqual([result['status'] for result in results], [True, False])
+        self.assertEqual(results[1]['errors'], "Duplicate task id in batch")
+        self.assertEqual(self.counts(self.member), {'pending': 2, 'paused': 1})
+        self.assertEqual(reconcile_counters(dry_run=True), [])
+        # The incrementally maintained rollups match a rebuild from the tasks table.
+        rollups = sorted(TaskRollup.objects.filter(task_count__gt=0).values_list('user_id', 'role', 'status', 'due_date', 'task_count'))
+        rebuild_rollups()
+        self.assertEqual(sorted(TaskRollup.objects.filter(task_count__gt=0).values_list('user_id', 'role', 'status', 'due_date', 'task_count')), rollups)
+
+    def test_stats_reject_malformed_due_dates(self):
+        headers = self.auth_headers(self.manager)
+        for param in ('dueFrom', 'dueTo'):
+            response = self.client.get(reverse('task-stats'), {param: 'bad'}, **headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['message'], f"{param} must be a date in YYYY-MM-DD format")
+        response = self.client.get(reverse('task-stats'), {'dueFrom': '2030-01-01', 'dueTo': '2030-12-31'}, **headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleting_a_user_updates_counts_of_cascaded_tasks(self):
+        assigner = self.create_user('assigner', is_staff=True)
+        Task.objects.create(
+            title='Task', description='description', assigned_to=self.member, assigned_by=assigner,
+            due_date=date(2030, 1, 1), status='pending'
+        )
+        self.assertEqual(self.counts(self.member), {'pending': 1})
+        assigner.delete()
+        self.assertEqual(self.counts(self.member), {})
+
+    def test_endpoint_reads_counters_only(self):
+        create_tasks(self.manager, [
+            {'title': 'Task', 'description': 'd', 'assigned_to_id': self.member.id, 'due_date': '2030-01-01', 'status': status}
+            for status in ('pending', 'pending', 'paused')
+        ])
+        headers = self.auth_headers(self.member)
+        self.client.get(reverse('task-counts'), **headers)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('task-counts'), **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {
+            'user_id': self.member.id,
+            'total': 3,
+            'by_status': {'pending': 2, 'in_rogress': 0, 'completed': 0, 'paused': 1},
+        })
+        self.assertFalse([query for query in queries if '"tasks"' in query['sql']])
+
+        # Members only see their own counts; managers see their reports'.
+        other = self.client.get(reverse('task-counts'), {'userId': self.other.id}, **headers)
+        self.assertEqual(other.status_code, 403)
+        managed = self.client.get(reverse('task-counts'), {'userId': self.member.id}, **self.auth_headers(self.manager))
+        self.assertEqual(managed.json()['data']['total'], 3)
+
+    def test_reconcile_repairs_drift(self):
+        create_tasks(self.manager, [
+            {'title': 'Task', 'description': 'd', 'assigned_to_id': self.member.id, 'due_date': '2030-01-01', 'status': 'pending'}
+            for _ in range(2)
+        ])
+        Task.objects.update(status='paused')  # No signals: the counters drift.
+
+        output = StringIO()
+        call_command('reconcile_task_counters', '--dry-run', stdout=output)
+        self.assertIn("Found 2 drifted counters", output.getvalue())
+        self.assertEqual(self.counts(self.member), {'pending': 2})
+
+        call_command('reconcile_task_counters', stdout=StringIO())
+        self.assertEqual(self.counts(self.member), {'paused': 2})
+        self.assertEqual(reconcile_counters(), [])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskArchiveTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = self.create_user('manager', is_staff=True)
+        self.member  = self.create_user('member', parent_id=self.manager)
+        self.other   = self.create_user('other', parent_id=self.manager)
+        results = create_tasks(self.manager, [
+            {'title': f'Task {i}', 'description': 'd', 'assigned_to_id': (self.member if i % 2 else self.other).id,
+             'due_date': '2030-01-01', 'status': 'completed' if i < 6 else 'pending'}
+            for i in range(9)
+        ])
+        self.ids = [result['id'] for result in results]
+        # Tasks 0-3 are old enough to archive; 4 and 5 were completed recently.
+        Task.objects.filter(id__in=self.ids[:4] + self.ids[6:]).update(updated_at=timezone.now() - timedelta(days=100))
+        self.headers = self.auth_headers(self.manager)
+
+    def archive(self, *args):
+        output = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('archive_tasks', *args, stdout=output)
+        return output.getvalue()
+
+    def listed(self, **params):
+        response = self.client.get(reverse('task-list-create'), {'perPage': 20, **params}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['data']]
+
+    def test_moves_old_completed_tasks_in_batches(self):
+        self.assertIn("4 tasks would be archived", self.archive('--older-than', '90d', '--dry-run'))
+        self.assertIn("Archived 4 tasks", self.archive('--older-than', '90', '--batch-size', '3', '--pause', '0'))
+
+        self.assertCountEqual(ArchivedTask.objects.values_list('id', flat=True), self.ids[:4])
+        self.assertCountEqual(Task.objects.values_list('id', flat=True), self.ids[4:])
+        archived = ArchivedTask.objects.get(pk=self.ids[0])
+        self.assertEqual((archived.title, archived.assigned_to_id, archived.status), ('Task 0', self.other.id, 'completed'))
+        self.assertIn("Archived 0 tasks", self.archive('--older-than', '90d'))
+
+    def test_counters_and_rollups_keep_archived_tasks(self):
+        counts   = counts_for(self.member.id)
+        rollups  = sorted(TaskRollup.objects.values_list('user_id', 'role', 'status', 'due_date', 'task_count'))
+        self.archive('--older-than', '12w')
+        self.assertEqual(counts_for(self.member.id), counts)
+        self.assertEqual(reconcile_counters(dry_run=True), [])
+        rebuild_rollups()
+        self.assertEqual(sorted(TaskRollup.objects.values_list('user_id', 'role', 'status', 'due_date', 'task_count')), rollups)
+
+        self.manager.delete()
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertEqual(counts_for(self.member.id)['completed'], 0)
+
+    def test_list_reads_archived_tasks_only_when_asked(self):
+        everything = self.listed()
+        self.listed(archived='include')
+        self.archive('--older-than', '90d')
+
+        self.assertEqual(self.listed(), [pk for pk in everything if pk not in self.ids[:4]])
+        self.assertEqual(self.listed(archived='include'), everything)
+        self.assertEqual(self.listed(archived='only'), [pk for pk in everything if pk in self.ids[:4]])
+        self.assertEqual(self.listed(archived='only', q='Task 2'), [self.ids[2]])
+
+        pages, cursor = [], ''
+        while cursor is not None:
+            response = self.client.get(reverse('task-list-create'), {'perPage': 4, 'archived': 'include', 'cursor': cursor}, **self.headers)
+            pages   += [item['id'] for item in response.json()['data']]
+            cursor   = response.json()['next']
+        self.assertEqual(pages, everything)
+        # Merged lists are cursor paginated whatever page is asked for.
+        deep = self.client.get(reverse('task-list-create'), {'perPage': 4, 'page': 1000, 'archived': 'include', 'count': 'exact'}, **self.headers)
+        self.assertEqual([item['id'] for item in deep.json()['data']], everything[:4])
+        self.assertEqual(deep.json()['total_items'], 9)
+        self.assertIsNotNone(deep.json()['next'])
+
+        response = self.client.get(reverse('task-list-create'), {'archived': 'yes'}, **self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_per_page_is_capped(self):
+        self.create_tasks(MAX_PER_PAGE + 5, [self.member], self.manager)
+        for params in ({}, {'archived': 'include'}):
+            response = self.client.get(reverse('task-list-create'), {'perPage': 1000, **params}, **self.headers)
+            self.assertEqual(len(response.json()['data']), MAX_PER_PAGE)
+
+    def test_archived_task_detail_is_read_only(self):
+        self.archive('--older-than', '90d')
+        url = reverse('task-detail', args=[self.ids[1]])
+        self.assertEqual(self.client.get(url, **self.headers).status_code, 400)
+        response = self.client.get(url, {'archived': 'include'}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['title'], 'Task 1')
+
+        member  = self.auth_headers(self.other)
+        self.assertEqual(self.client.get(url, {'archived': 'only'}, **member).status_code, 400)
+        patched = self.client.patch(url, {'title': 'Changed'}, content_type='application/json', **self.headers)
+        self.assertEqual(patched.status_code, 400)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskAuditTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        audit_log.clear()
+        self.addCleanup(audit_log.clear)
+        self.manager = self.create_user('manager', is_staff=True)
+        self.member  = self.create_user('member', parent_id=self.manager)
+        self.other   = self.create_user('other', parent_id=self.manager)
+        self.task    = Task.objects.create(
+            title='Task', description='description', assigned_to=self.member, assigned_by=self.manager,
+            due_date=date(2030, 1, 1), status='pending'
+        )
+        self.headers = self.auth_headers(self.member)
+
+    def patch(self, data, headers=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('task-detail', args=[self.task.pk]), data, content_type='application/json', **(headers or self.headers)
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_updates_are_buffered_and_written_in_one_batch(self):
+        self.patch({'status': 'in_rogress'})
+        self.patch({'status': 'in_rogress', 'worked_hours': '1.50'})
+        self.patch({'status': 'in_rogress'})
+        self.assertFalse(TaskAuditEntry.objects.exists())
+        self.assertEqual(audit_log.stats()['buffered'], 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(audit_log.flush(), 2)
+        entries = list(TaskAuditEntry.objects.order_by('id').values('task_id', 'user_id', 'changes'))
+        self.assertEqual(entries, [
+            {'task_id': self.task.pk, 'user_id': self.member.pk, 'changes': {'status': ['pending', 'in_rogress']}},
+            {'task_id': self.task.pk, 'user_id': self.member.pk, 'changes': {'worked_hours': [None, '1.50']}},
+        ])
+
+    def test_flushes_on_size_and_age_thresholds(self):
+        with mock.patch.object(audit_log, 'size', 2):
+            self.patch({'status': 'in_rogress'})
+            self.assertFalse(TaskAuditEntry.objects.exists())
+            self.patch({'status': 'completed'})
+            self.assertEqual(TaskAuditEntry.objects.count(), 2)
+
+        self.patch({'completion_report': 'Done'})
+        request_finished.send(sender=None)
+        self.assertEqual(TaskAuditEntry.objects.count(), 2)
+        with mock.patch.object(audit_log, 'max_age', 0):
+            request_finished.send(sender=None)
+        self.assertEqual(TaskAuditEntry.objects.count(), 3)
+
+    def test_rolled_back_and_bulk_updates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                serializer = TaskSerializer(self.task, data={'status': 'paused'}, partial=True)
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+                raise RuntimeError
+        self.assertEqual(audit_log.stats()['buffered'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            update_tasks(self.manager, Task.objects.all(), [{'id': self.task.pk, 'due_date': '2030-02-01', 'title': 'Task'}])
+        audit_log.flush()
+        entry = TaskAuditEntry.objects.get()
+        self.assertEqual((entry.user_id, entry.changes), (self.manager.pk, {'due_date': ['2030-01-01', '2030-02-01']}))
+
+    def test_history_endpoint(self):
+        self.patch({'status': 'in_rogress'})
+        self.patch({'status': 'completed', 'worked_hours': '2.00'})
+        url      = reverse('task-history', args=[self.task.pk])
+        response = self.client.get(url, {'perPage': 1}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_items'], 2)
+        self.assertEqual(response.json()['data'][0]['changes'], {'status': ['in_rogress', 'completed'], 'worked_hours': [None, '2.00']})
+
+        self.assertEqual(self.client.get(url, **self.auth_headers(self.other)).status_code, 400)
+        self.assertEqual(self.client.get(url, **self.auth_headers(self.manager)).status_code, 200)
+
+        patched = self.client.patch(url, {'title': 'Changed'}, content_type='application/json', **self.auth_headers(self.manager))
+        self.assertEqual(patched.status_code, 405)
+        self.assertEqual(self.client.delete(url, **self.auth_headers(self.manager)).status_code, 405)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, 'Task')
+
+        root = self.create_user('root', is_staff=True, is_superuser=True)
+        self.task.delete()
+        response = self.client.get(url, **self.auth_headers(root))
+        self.assertEqual(len(response.json()['data']), 2)
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TaskEventStreamTests(TaskTestMixin, TestCase):
+    def setUp(self):
+        token_revocations.clear()
+        self.addCleanup(token_revocations.clear)
+        self.root    = self.create_user('root', is_staff=True, is_superuser=True)
+        self.manager = self.create_user('manager', is_staff=True)
+        self.member  = self.create_user('member', parent_id=self.manager)
+        self.other   = self.create_user('other', parent_id=self.manager)
+        self.app     = TaskEventStream(not_found)
+        self.tokens  = {user.pk: str(RefreshToken.for_user(user).access_token) for user in (self.root, self.member, self.other)}
+
+    def task(self):
+        return Task(
+            id=1, title='Report', description='d', assigned_to_id=self.member.id, assigned_by_id=self.manager.id,
+            due_date=date(2030, 1, 1), status='pending'
+        )
+
+    async def request(self, headers=(), query_string=b''):
+        communicator = ApplicationCommunicator(self.app, {
+            'type': 'http', 'method': 'GET', 'path': '/task/tasks/events', 'query_string': query_string,
+            'headers': list(headers), 'server': ('testserver', 80),
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        return communicator, await communicator.receive_output(1)
+
+    async def open(self, user):
+        token = self.tokens[user.pk]
+        communicator, start = await self.request([(b'authorization', f'Bearer {token}'.encode())])
+        self.assertEqual(start['status'], 200)
+        self.assertEqual((await communicator.receive_output(1))['body'], b'retry: 5000\n\n')
+        return communicator
+
+    async def close(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(1)
+
+    async def test_events_reach_involved_users_and_superusers_only(self):
+        member, other, root = await self.open(self.member), await self.open(self.other), await self.open(self.root)
+        self.assertEqual(task_events.stats()['streams'], 3)
+
+        task_events.publish([task_event('created', self.task())])
+        for stream in (member, root):
+            body = (await stream.receive_output(1))['body'].decode()
+            self.assertTrue(body.startswith('event: task.created\ndata: '))
+            self.assertEqual(json.loads(body.split('data: ', 1)[1])['title'], 'Report')
+        self.assertTrue(await other.receive_nothing(0.1))
+
+        for stream in (member, other, root):
+            await self.close(stream)
+        self.assertEqual(task_events.stats()['streams'], 0)
+
+    async def test_stream_requires_a_valid_token(self):
+        communicator, start = await self.request()
+        self.assertEqual(start['status'], 401)
+        await communicator.wait(1)
+
+        # EventSource cannot send headers, so the token may come in the query string.
+        communicator, start = await self.request(query_string=f'access_token={self.tokens[self.member.pk]}'.encode())
+        self.assertEqual(start['status'], 200)
+        await self.close(communicator)
+
+    @override_settings(TASK_EVENTS_KEEPALIVE=0.05)
+    async def test_stream_ends_when_its_token_is_revoked(self):
+        stream = await self.open(self.member)
+        self.assertEqual((await stream.receive_output(1))['body'], b': keepalive\n\n')
+
+        token_revocations.add(None, self.member.id, timezone.now(), timezone.now() + timedelta(hours=1))
+        while (message := await stream.receive_output(1))['body'] == b': keepalive\n\n':
+            pass
+        self.assertEqual(message, {'type': 'http.response.body', 'body': b''})
+        await stream.wait(1)
+
+    def test_changes_are_published_after_commit(self):
+        with mock.patch.object(task_events, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(
+                    title='Report', description='d', assigned_to=self.member, assigned_by=self.manager,
+                    due_date=date(2030, 1, 1), status='pending'
+                )
+                publish.assert_not_called()
+            with self.captureOnCommitCallbacks(execute=True):
+                task.assigned_to = self.other
+                task.save()
+
+        created, updated = (call.args[0][0] for call in publish.call_args_list)
+        self.assertEqual((created['type'], created['users']), ('task.created', sorted([self.member.id, self.manager.id])))
+        self.assertEqual(updated['users'], sorted([self.member.id, self.other.id, self.manager.id]))
+
+    async def test_other_requests_pass_through(self):
+        communicator = ApplicationCommunicator(self.app, {'type': 'http', 'method': 'GET', 'path': '/task/tasks/', 'headers': []})
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        self.assertEqual((await communicator.receive_output(1))['status'], 404)
@@ -1,7 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the task reads run on the async ORM instead of a worker thread.
+TaskView = views.AsyncTaskAPIView if settings.ASYNC_VIEWS else views.TaskAPIView
+
 urlpatterns = [
-    path('tasks/', views.TaskAPIView.as_view(), name='task-list-create'),
-    path('tasks/<int:pk>/', views.TaskAPIView.as_view(), name='task-detail'), 
+    path('/tasks/', TaskView.as_view(), name='task-list-create'),
+    path('/tasks/bulk', views.TaskBulkAPIView.as_view(), name='task-bulk'),
+    path('/tasks/export', views.TaskExportAPIView.as_view(), name='task-export'),
+    path('/tasks/import', views.TaskImportAPIView.as_view(), name='task-import'),
+    path('/tasks/stats', views.TaskStatsAPIView.as_view(), name='task-stats'),
+    path('/tasks/counts', views.TaskCountsAPIView.as_view(), name='task-counts'),
+    path('/tasks/stats/rebuild', views.TaskRollupRebuildAPIView.as_view(), name='task-stats-rebuild'),
+    path('/tasks/changes', views.TaskChangesAPIView.as_view(), name='task-changes'),
+    path('/tasks/<int:pk>/', TaskView.as_view(), name='task-detail'), 
+    path('/tasks/<int:pk>/history', views.TaskHistoryAPIView.as_view(), name='task-history'),
 ]
\ No newline at end of file
@@ -1,13 +1,36 @@
+import uuid
+
 from rest_framework.views import APIView
 from rest_framework import status, permissions
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ParseError
 
+from django.http import StreamingHttpResponse, Http404
+from django.core.files.storage import default_storage
 from django.db.models import Q
+from django.utils import timezone
 from django.core.exceptions import PermissionDenied
-from .models import Task
-from .serializer import TaskSerializer
-from utils.pagination import paginate
+from django.shortcuts import get_object_or_404
+from .models import Task, ArchivedTask, TaskRollup, TaskAuditEntry
+from users.models import User
+from users.hierarchy import subtree
+from jobs.queue import enqueue
+from jobs.views import BackgroundJobMixin
+from .serializer import TaskSerializer, TaskAuditEntrySerializer, fast_task_serializer
+from .exports import EXPORTERS, CONTENT_TYPES
+from .imports import TaskImporter, FILE_TYPES, detect_file_type
+from .cache import task_list_cache, list_entry
+from .filters import filter_tasks, archived_mode, _date
+from .bulk import create_tasks, update_tasks, delete_tasks, validate_update_permissions
+from .rollups import summarize, bucket_report, BUCKET_PERIODS, ROLES
+from .counters import counts_for
+from .audit import audit_log
+from .sync import changes_since, SyncTokenError, SyncTokenExpired
+from utils.pagination import paginate, paginate_merged, apaginate_merged
+from utils.async_views import AsyncAPIView
+from utils.db.router import read_from_replica
 from utils.common import CommonUtils, BaseAPIView
+from utils.conditional import make_validators, page_validators, validator_headers, conditional_response
 
 
 class IsSuperAdmin(permissions.BasePermission):
@@ -18,8 +41,43 @@ class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.is_staff
 
-class TaskAPIView(BaseAPIView):
+def task_visibility(user):
+    """
+    Rows the user may see, as a Q over assigned_to_id/assigned_by_id. Staff see
+    the tasks they assigned and those assigned to anyone in their subtree.
+    """
+    if user.is_superuser:
+        return Q()
+    elif user.is_staff:
+        return Q(assigned_to_id__in=subtree(user)) | Q(assigned_by_id=user.id)
+    return Q(assigned_to_id=user.id)
+
+
+def visible_tasks(user):
+    return Task.objects.with_users().filter(task_visibility(user))
+
+
+def task_sources(user, params):
+    """The visible live and/or archived tasks, as `?archived=` asks for; live first."""
+    mode    = archived_mode(params)
+    sources = [] if mode == 'only' else [visible_tasks(user)]
+    if mode:
+        sources.append(ArchivedTask.objects.with_users().filter(task_visibility(user)))
+    return sources
+
+
+class ReadOnlyMixin:
+    """For views derived from TaskAPIView: GET only, so the task list's POST, PATCH and DELETE are not reachable."""
+    http_method_names = ['get', 'head', 'options']
+
+    def get_permissions(self):
+        return [IsAuthenticated()]
+
+
+class TaskAPIView(BackgroundJobMixin, BaseAPIView):
     commonUtils = CommonUtils()
+    # Everything the serialized task depends on; used to build ETags.
+    version_fields = ('id', 'updated_at', 'assigned_to__updated_at', 'assigned_by__updated_at')
 
     def get_permissions(self):
         method = self.request.method
@@ -33,31 +91,50 @@ class TaskAPIView(BaseAPIView):
             return [IsAuthenticated(), IsSuperAdmin()]
         return super().get_permissions()
 
+    def visibility_filter(self):
+        return task_visibility(self.request.user)
+
     def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Task.objects.all()
-        elif user.is_staff:
-            return Task.objects.filter(Q(assigned_to=user) | Q(assigned_by=user))
-        return Task.objects.filter(assigned_to=user)
+        return visible_tasks(self.request.user)
 
+    @read_from_replica
     def get(self, request, pk=None):
         try:
+            sources = task_sources(request.user, request.GET)
             if pk:
-                task = self.commonUtils.get_object(pk)
+                task = self._get_task(sources, pk)
+                etag, last_modified = make_validators([task], self.version_fields)
+                not_modified = conditional_response(request, etag, last_modified)
+                if not_modified:
+                    return not_modified
+
                 serializer = TaskSerializer(task)
-                return self._format_response(True, "Task retrieved successfully", serializer.data)
+                return self._format_response(
+                    True,
+                    "Task retrieved successfully",
+                    serializer.data,
+                    headers=validator_headers(etag, last_modified)
+                )
 
-            tasks = self.get_queryset()
-            paginated_data = paginate(tasks, request)
-            serializer = TaskSerializer(paginated_data['data'], many=True)
+            cache_key, page = task_list_cache.lookup(request.user, request.GET)
+            if page is None:
+                paginated_data = paginate_merged([filter_tasks(source, request.GET) for source in sources], request)
+                rows = list(paginated_data['data'])
+                etag, last_modified = page_validators(rows, self.version_fields, paginated_data)
+                page = list_entry(fast_task_serializer.many(rows), paginated_data, etag, last_modified)
+                task_list_cache.store(cache_key, page)
+
+            not_modified = conditional_response(request, page['etag'], page['last_modified'])
+            if not_modified:
+                return not_modified
 
             return self._format_response(
                 True,
                 "Tasks list retrieved successfully",
-                serializer.data,
+                page['data'],
                 status_code=status.HTTP_200_OK,
-                pagination=paginated_data
+                pagination=page['pagination'],
+                headers=validator_headers(page['etag'], page['last_modified'])
             )
         except Exception as e:
             return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
@@ -79,9 +156,14 @@ class TaskAPIView(BaseAPIView):
 
     def patch(self, request, pk):
         try:
-            task = self.commonUtils.get_object(pk)
+            task = self.commonUtils.get_object(self.get_queryset(), pk)
             self._validate_user_update_permissions(request.user, task, request.data)
 
+            # If-Match makes the update conditional on the version the client last read.
+            precondition_failed = conditional_response(request, *make_validators([task], self.version_fields))
+            if precondition_failed:
+                return precondition_failed
+
             serializer = TaskSerializer(
                 task,
                 data=request.data,
@@ -94,7 +176,8 @@ class TaskAPIView(BaseAPIView):
             return self._format_response(
                 True,
                 "Task updated successfully",
-                serializer.data
+                serializer.data,
+                headers=validator_headers(*make_validators([task], self.version_fields))
             )
         except PermissionDenied as e:
             return self._format_response(False, str(e), None, status.HTTP_403_FORBIDDEN)
@@ -103,7 +186,7 @@ class TaskAPIView(BaseAPIView):
 
     def delete(self, request, pk):
         try:
-            task = self.commonUtils.get_object(pk)
+            task = self.commonUtils.get_object(self.get_queryset(), pk)
             task.delete()
             return self._format_response(
                 True,
@@ -114,13 +197,359 @@ class TaskAPIView(BaseAPIView):
         except Exception as e:
             return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
 
+    def _get_task(self, sources, pk):
+        for queryset in sources[:-1]:
+            task = queryset.filter(pk=pk).first()
+            if task is not None:
+                return task
+        return self.commonUtils.get_object(sources[-1], pk)
+
     def _validate_user_update_permissions(self, user, task, data):
-        if user.is_staff or user.is_superuser:
-            return
+        validate_update_permissions(user, task, data)
+
+
+class AsyncTaskAPIView(AsyncAPIView):
+    """TaskAPIView with the read path on the async ORM, served when ASYNC_VIEWS is enabled."""
+    sync_view = TaskAPIView
+
+    @read_from_replica
+    async def get(self, request, pk=None):
+        try:
+            sources = task_sources(request.user, request.GET)
+            if pk:
+                for queryset in sources:
+                    task = await queryset.filter(pk=pk).afirst()
+                    if task is not None:
+                        break
+                else:
+                    raise Http404("No Task matches the given query.")
+                etag, last_modified = make_validators([task], TaskAPIView.version_fields)
+                not_modified = conditional_response(request, etag, last_modified)
+                if not_modified:
+                    return not_modified
+
+                serializer = TaskSerializer(task)
+                return self._format_response(
+                    True,
+                    "Task retrieved successfully",
+                    serializer.data,
+                    headers=validator_headers(etag, last_modified)
+                )
+
+            cache_key, page = await task_list_cache.alookup(request.user, request.GET)
+            if page is None:
+                paginated_data = await apaginate_merged([filter_tasks(source, request.GET) for source in sources], request)
+                rows = paginated_data['data']
+                etag, last_modified = page_validators(rows, TaskAPIView.version_fields, paginated_data)
+                page = list_entry(fast_task_serializer.many(rows), paginated_data, etag, last_modified)
+                await task_list_cache.astore(cache_key, page)
+
+            not_modified = conditional_response(request, page['etag'], page['last_modified'])
+            if not_modified:
+                return not_modified
+
+            return self._format_response(
+                True,
+                "Tasks list retrieved successfully",
+                page['data'],
+                status_code=status.HTTP_200_OK,
+                pagination=page['pagination'],
+                headers=validator_headers(page['etag'], page['last_modified'])
+            )
+        except Exception as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskBulkAPIView(TaskAPIView):
+    """
+    Batch create, update and delete. Each item is validated on its own and the
+    response carries one result per item, in request order; valid items are
+    written in chunked transactions even when others fail. With
+    `Prefer: respond-async` the batch runs as a background job instead.
+    """
+    http_method_names = ['post', 'patch', 'delete', 'options']
+    chunk_size = 500
+    max_items  = 5000
+
+    def _get_items(self, data):
+        if not isinstance(data, list) or not data:
+            raise ValueError("Expected a non-empty list of items")
+        if len(data) > self.max_items:
+            raise ValueError(f"A batch can contain at most {self.max_items} items")
+        return data
+
+    def _bulk_response(self, message, results, success_status=status.HTTP_200_OK):
+        failed = sum(1 for result in results if not result['status'])
+        if not failed:
+            return self._format_response(True, message, results, success_status)
+        if failed == len(results):
+            return self._format_response(False, "No items were processed", results, status.HTTP_400_BAD_REQUEST)
+        return self._format_response(True, f"{message} with {failed} failed item(s)", results, status.HTTP_207_MULTI_STATUS)
+
+    def _queue(self, request, items):
+        job = enqueue('tasks.bulk', {'user_id': request.user.id, 'method': request.method.lower(), 'items': items}, request.user)
+        return self._job_accepted(job, "Bulk operation queued")
+
+    def post(self, request):
+        try:
+            items = self._get_items(request.data)
+        except ValueError as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+        if self.wants_background(request):
+            return self._queue(request, items)
+
+        results = create_tasks(request.user, items, self.chunk_size)
+        return self._bulk_response("Tasks created successfully", results, status.HTTP_201_CREATED)
+
+    def patch(self, request):
+        try:
+            items = self._get_items(request.data)
+        except ValueError as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+        if self.wants_background(request):
+            return self._queue(request, items)
+
+        results = update_tasks(request.user, self.get_queryset(), items, self.chunk_size)
+        return self._bulk_response("Tasks updated successfully", results)
+
+    def delete(self, request):
+        try:
+            ids = self._get_items(request.data.get('ids') if isinstance(request.data, dict) else request.data)
+        except ValueError as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+        if self.wants_background(request):
+            return self._queue(request, ids)
+
+        results = delete_tasks(self.get_queryset(), ids, self.chunk_size)
+        return self._bulk_response("Tasks deleted successfully", results)
+
+
+class TaskExportAPIView(ReadOnlyMixin, TaskAPIView):
+    """
+    Stream every task visible to the caller as CSV, NDJSON or XLSX
+    (`?fileType=csv|ndjson|xlsx`), reading the table in fixed-size batches.
+    Accepts the same filters as the task list. With `Prefer: respond-async` the
+    file is written by a background job and downloaded from the job instead.
+    """
+    chunk_size = 2000
+
+    def get(self, request):
+        file_type = request.GET.get('fileType', 'csv')
+        if file_type not in EXPORTERS:
+            return self._format_response(
+                False,
+                f"Unsupported file type, expected one of: {', '.join(EXPORTERS)}",
+                None,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            tasks = filter_tasks(self.get_queryset(), request.GET)
+        except ParseError as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+
+        if self.wants_background(request):
+            job = enqueue(
+                'tasks.export',
+                {'user_id': request.user.id, 'file_type': file_type, 'params': dict(request.GET.lists())},
+                request.user
+            )
+            return self._job_accepted(job, "Export queued")
+
+        response = StreamingHttpResponse(
+            EXPORTERS[file_type](tasks, self.chunk_size),
+            content_type=CONTENT_TYPES[file_type]
+        )
+        response['Content-Disposition'] = f'attachment; filename="tasks.{file_type}"'
+        return response
+
+
+class TaskImportAPIView(TaskAPIView):
+    """
+    Create tasks from an uploaded CSV or XLSX `file`. Rows are processed in chunks
+    and the response reports every rejected row by its line number. With
+    `Prefer: respond-async` the file is stored and imported by a background job,
+    whose result is the same report.
+    """
+    http_method_names = ['post', 'options']
+    chunk_size = 1000
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return self._format_response(False, "A CSV or XLSX file is required", None, status.HTTP_400_BAD_REQUEST)
+
+        file_type = request.data.get('fileType') or detect_file_type(upload.name)
+        if file_type not in FILE_TYPES:
+            return self._format_response(
+                False,
+                f"Unsupported file type, expected one of: {', '.join(FILE_TYPES)}",
+                None,
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        if self.wants_background(request):
+            name = default_storage.save(f'imports/{uuid.uuid4().hex}.{file_type}', upload)
+            job  = enqueue('tasks.import', {'user_id': request.user.id, 'file': name, 'file_type': file_type}, request.user)
+            return self._job_accepted(job, "Import queued")
+
+        try:
+            report = TaskImporter(request.user, chunk_size=self.chunk_size).run(upload, file_type)
+        except Exception as e:
+            return self._format_response(False, f"Could not read file: {e}", None, status.HTTP_400_BAD_REQUEST)
+
+        if report['errors']:
+            return self._format_response(
+                report['created'] > 0,
+                f"Imported {report['created']} of {report['total']} rows",
+                report,
+                status.HTTP_207_MULTI_STATUS if report['created'] else status.HTTP_400_BAD_REQUEST
+            )
+        return self._format_response(True, f"Imported {report['created']} rows", report, status.HTTP_201_CREATED)
+
+
+class TaskStatsAPIView(ReadOnlyMixin, TaskAPIView):
+    """
+    Per-user task totals read from the task_rollups table: counts and worked hours
+    by status, overdue count, and optionally completion rate per due-date bucket
+    (`?bucket=day|week|month`).
+    """
+
+    def _stats_user(self, request):
+        user    = request.user
+        user_id = request.GET.get('userId')
+        if not user_id:
+            return None if user.is_superuser else user
+        if user.is_superuser:
+            return get_object_or_404(User, id=user_id)
+        if user.is_staff:
+            return get_object_or_404(User.objects.filter(id__in=subtree(user)), id=user_id)
+        if str(user.id) != user_id:
+            raise PermissionDenied("You can only view your own statistics")
+        return user
+
+    def get(self, request):
+        role   = request.GET.get('role', 'assigned_to')
+        bucket = request.GET.get('bucket')
+        if role not in ROLES:
+            return self._format_response(False, f"role must be one of: {', '.join(ROLES)}", None, status.HTTP_400_BAD_REQUEST)
+        if bucket and bucket not in BUCKET_PERIODS:
+            return self._format_response(False, f"bucket must be one of: {', '.join(BUCKET_PERIODS)}", None, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            stats_user = self._stats_user(request)
+            rollups    = TaskRollup.objects.filter(role=role)
+            if stats_user is not None:
+                rollups = rollups.filter(user=stats_user)
+            due_from, due_to = _date(request.GET, 'dueFrom'), _date(request.GET, 'dueTo')
+            if due_from:
+                rollups = rollups.filter(due_date__gte=due_from)
+            if due_to:
+                rollups = rollups.filter(due_date__lte=due_to)
+
+            data = {
+                'user_id': stats_user.id if stats_user else None,
+                'role': role,
+                **summarize(rollups, timezone.localdate()),
+            }
+            if bucket:
+                data['buckets'] = bucket_report(rollups, bucket)
+            return self._format_response(True, "Task statistics retrieved successfully", data)
+        except PermissionDenied as e:
+            return self._format_response(False, str(e), None, status.HTTP_403_FORBIDDEN)
+        except Exception as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskCountsAPIView(TaskStatsAPIView):
+    """
+    Counts of the tasks assigned to a user per status, for badges: one indexed
+    read of the task_counters table. Defaults to the requesting user; `?userId=`
+    follows the same rules as TaskStatsAPIView.
+    """
+
+    def get(self, request):
+        try:
+            counts_user = self._stats_user(request) or request.user
+            counts      = counts_for(counts_user.id)
+            data        = {'user_id': counts_user.id, 'total': sum(counts.values()), 'by_status': counts}
+            return self._format_response(True, "Task counts retrieved successfully", data)
+        except PermissionDenied as e:
+            return self._format_response(False, str(e), None, status.HTTP_403_FORBIDDEN)
+        except Exception as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskRollupRebuildAPIView(TaskAPIView):
+    """Queue a rebuild of the task_rollups table from the tasks table. Superusers only; always answers 202."""
+    http_method_names = ['post', 'options']
+
+    def get_permissions(self):
+        return [IsAuthenticated(), IsSuperAdmin()]
+
+    def post(self, request):
+        job = enqueue('tasks.rebuild_rollups', user=request.user)
+        return self._job_accepted(job, "Rollup rebuild queued")
+
 
-        allowed_fields = {'status', 'completion_report', 'worked_hours'}
-        if not allowed_fields.issuperset(data.keys()):
-            raise PermissionDenied("You can only update status, completion report, and worked hours")
+class TaskHistoryAPIView(ReadOnlyMixin, TaskAPIView):
+    """
+    Audit trail of a task, newest first: who changed which fields, from what to
+    what. Open to anyone who can see the task, archived or not; superusers can
+    also read the history of deleted tasks. Entries buffered by other workers
+    show up once those flush.
+    """
+    def get(self, request, pk):
+        try:
+            if not request.user.is_superuser:
+                self._get_task(task_sources(request.user, {'archived': 'include'}), pk)
+            audit_log.flush()
+            paginated_data = paginate(TaskAuditEntry.objects.filter(task_id=pk), request)
+            return self._format_response(
+                True,
+                "Task history retrieved successfully",
+                TaskAuditEntrySerializer(paginated_data['data'], many=True).data,
+                pagination=paginated_data
+            )
+        except Exception as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskChangesAPIView(ReadOnlyMixin, TaskAPIView):
+    """
+    Delta sync feed: tasks created or updated and ids of tasks deleted, or
+    reassigned away from the caller, since the `since` token, using the same
+    visibility rules as the task list. Clients keep
+    calling with the returned `next` token; `has_more` means another page is ready.
+    """
+    default_limit = 100
+    max_limit     = 1000
+
+    def get(self, request):
+        try:
+            limit = min(max(1, int(request.GET.get('limit', self.default_limit))), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        try:
+            changed, deleted, token, has_more = changes_since(
+                self.get_queryset(),
+                self.visibility_filter(),
+                request.GET.get('since'),
+                limit
+            )
+        except SyncTokenExpired as e:
+            return self._format_response(False, str(e), None, status.HTTP_410_GONE)
+        except SyncTokenError as e:
+            return self._format_response(False, str(e), None, status.HTTP_400_BAD_REQUEST)
 
-        if task.assigned_to != user:
-            raise PermissionDenied("You can only update tasks assigned to you")
\ No newline at end of file
+        return self._format_response(
+            True,
+            "Task changes retrieved successfully",
+            {
+                'changed': fast_task_serializer.many(changed),
+                'deleted': deleted,
+                'next': token,
+                'has_more': has_more,
+            }
+        )
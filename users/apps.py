@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .cache import token_user_cache
+        from utils.metrics import registry
+
+        registry.register_collector(lambda: [
+            ('auth_cache_hits_total', 'counter', 'Token user cache hits', token_user_cache.hits),
+            ('auth_cache_misses_total', 'counter', 'Token user cache misses', token_user_cache.misses),
+        ])
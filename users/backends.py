@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password
+
+
+class LoginBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashPool:
+    """
+    Runs password hashing on a fixed number of threads. hashlib's PBKDF2 and
+    scrypt release the GIL, so the hashes run in parallel while the number of
+    cores a login storm can occupy stays bounded. At most `max_queued` hashes
+    wait for a thread; beyond that logins fail fast with LoginBusy. The
+    request thread still blocks until its hash is done.
+    """
+
+    def __init__(self, workers, max_queued):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots    = threading.BoundedSemaphore(workers + max_queued)
+
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise LoginBusy("Too many logins in progress, try again shortly")
+        try:
+            return self.executor.submit(func, *args).result()
+        finally:
+            self.slots.release()
+
+
+password_hash_pool = PasswordHashPool(settings.LOGIN_HASH_WORKERS, settings.LOGIN_HASH_QUEUE)
+
+
+class PooledModelBackend(ModelBackend):
+    """
+    ModelBackend with the password check moved onto the hashing pool.
+
+    Like AbstractBaseUser.check_password(), a successful login rehashes with the
+    first PASSWORD_HASHERS entry, so stored hashes move to the configured hasher.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown usernames take as long as wrong passwords.
+            password_hash_pool.run(UserModel().set_password, password)
+            return None
+        # Only the hashing runs on the pool; the rehash is saved on this thread's connection.
+        outdated = []
+        if not password_hash_pool.run(check_password, password, user.password, outdated.append):
+            return None
+        if outdated:
+            password_hash_pool.run(user.set_password, password)
+            user.save(update_fields=['password'])
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,93 @@
+import time
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class TokenUserCache:
+    """
+    Bounded, thread-safe LRU cache mapping a verified access token (by jti) to its User.
+
+    Entries expire after `ttl` seconds or when the token itself expires, whichever
+    comes first, and can be dropped per user when the User row changes.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl      = ttl
+        self.hits     = 0
+        self.misses   = 0
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock    = threading.Lock()
+
+    def get(self, jti, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry is None or entry[0] != user_id:
+                self.misses += 1
+                return None
+            _, user, expires_at = entry
+            if expires_at <= now:
+                self._remove(jti)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(jti)
+            self.hits += 1
+            return user
+
+    def set(self, jti, user, token_exp=None):
+        expires_at = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, time.monotonic() + token_exp - time.time())
+
+        with self._lock:
+            if jti in self._entries:
+                self._remove(jti)
+            self._entries[jti] = (user.pk, user, expires_at)
+            self._by_user.setdefault(user.pk, set()).add(jti)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_token(self, jti):
+        with self._lock:
+            self._remove(jti)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for jti in list(self._by_user.get(user_id, ())):
+                self._remove(jti)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def _remove(self, jti):
+        entry = self._entries.pop(jti, None)
+        if entry is None:
+            return
+        jtis = self._by_user.get(entry[0])
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                del self._by_user[entry[0]]
+
+
+token_user_cache = TokenUserCache(
+    max_size=settings.AUTH_CACHE_SIZE,
+    ttl=settings.AUTH_CACHE_TTL,
+)
@@ -0,0 +1,105 @@
+"""
+Keeps the user_hierarchy closure table in step with User.parent_id.
+
+Creating a user copies its parent's ancestor rows (two queries), moving one
+rewrites the rows linking its subtree to the old ancestors, and deleting one
+detaches its children, which parent_id's SET_NULL turns into roots without
+sending any signal. bulk_create()/bulk_update() of parent_id send no signals
+either; call rebuild_hierarchy() after them.
+"""
+from django.db import transaction
+
+from .models import User, UserHierarchy
+
+
+def subtree(user, include_self=True):
+    """Ids of the users under `user`, as a subquery for `__in` filters."""
+    links = UserHierarchy.objects.filter(ancestor_id=user.pk)
+    if not include_self:
+        links = links.filter(depth__gt=0)
+    return links.values('descendant_id')
+
+
+def is_in_subtree(user, other):
+    """Whether `other` reports to `user`, directly or not."""
+    return UserHierarchy.objects.filter(ancestor_id=user.pk, descendant_id=other.pk, depth__gt=0).exists()
+
+
+def ancestor_ids(user_ids):
+    """`user_ids` and everyone above them."""
+    return set(UserHierarchy.objects.filter(descendant_id__in=user_ids).values_list('ancestor_id', flat=True))
+
+
+def _chain(user_id):
+    """[(ancestor id, depth)] from `user_id` itself upward."""
+    return list(UserHierarchy.objects.filter(descendant_id=user_id).values_list('ancestor_id', 'depth'))
+
+
+def add_node(user):
+    above = _chain(user.parent_id_id) if user.parent_id_id else []
+    UserHierarchy.objects.bulk_create([
+        UserHierarchy(ancestor_id=user.pk, descendant_id=user.pk, depth=0),
+        *(UserHierarchy(ancestor_id=ancestor, descendant_id=user.pk, depth=depth + 1) for ancestor, depth in above),
+    ])
+
+
+def _detach(user_id, include_self):
+    """Delete the rows linking the subtree of `user_id` to the users above it."""
+    descendants = UserHierarchy.objects.filter(ancestor_id=user_id)
+    if not include_self:
+        descendants = descendants.filter(depth__gt=0)
+    members = list(descendants.values_list('descendant_id', 'depth'))
+    above   = [ancestor for ancestor, depth in _chain(user_id) if depth > 0 or not include_self]
+    if members and above:
+        UserHierarchy.objects.filter(descendant_id__in=[member for member, _ in members], ancestor_id__in=above).delete()
+    return members
+
+
+def move_node(user):
+    """Re-link the subtree of `user` under its current parent_id."""
+    with transaction.atomic():
+        members = _detach(user.pk, include_self=True)
+        if user.parent_id_id is None:
+            return
+        UserHierarchy.objects.bulk_create(
+            (
+                UserHierarchy(ancestor_id=ancestor, descendant_id=member, depth=above + below + 1)
+                for ancestor, above in _chain(user.parent_id_id)
+                for member, below in members
+            ),
+            batch_size=1000
+        )
+
+
+def remove_node(user):
+    """Make the children of `user` roots; its own rows go with it through the cascade."""
+    _detach(user.pk, include_self=False)
+
+
+def closure(parents):
+    """(ancestor, descendant, depth) rows for a {user id: parent id} forest; a cycle is cut where it closes."""
+    chains = {}
+    for node in parents:
+        path, current = [], node
+        while current is not None and current not in chains and current not in path:
+            path.append(current)
+            current = parents.get(current)
+        chain = chains.get(current, [])
+        for member in reversed(path):
+            chain = chains[member] = [member, *chain]
+    for node, chain in chains.items():
+        for depth, ancestor in enumerate(chain):
+            yield ancestor, node, depth
+
+
+def rebuild_hierarchy():
+    """Recompute the whole closure table from parent_id."""
+    parents = dict(User.objects.values_list('id', 'parent_id_id'))
+    rows    = [
+        UserHierarchy(ancestor_id=ancestor, descendant_id=node, depth=depth)
+        for ancestor, node, depth in closure(parents)
+    ]
+    with transaction.atomic():
+        UserHierarchy.objects.all().delete()
+        UserHierarchy.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_revocations
+
+
+class Command(BaseCommand):
+    help = "Delete token revocations whose tokens have all expired."
+
+    def handle(self, *args, **options):
+        rows = prune_revocations()
+        self.stdout.write(f"Deleted {rows} expired token revocations")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from users.hierarchy import rebuild_hierarchy
+
+
+class Command(BaseCommand):
+    help = "Recompute the user_hierarchy closure table from User.parent_id."
+
+    def handle(self, *args, **options):
+        rows = rebuild_hierarchy()
+        self.stdout.write(f"Rebuilt {rows} hierarchy rows")
@@ -1,4 +1,5 @@
 import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
 from django.http import JsonResponse
 from django.contrib.auth import get_user_model
@@ -6,15 +7,26 @@ from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
+from .cache import token_user_cache
+from .revocation import token_revocations
+from utils.metrics import timed
+
 class JWTAuthenticationMiddleware:
+    sync_capable  = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response            = get_response
         self.jwt_user_authenticator = UserJWTAuthentication()
+        self.async_mode              = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
         self.unprotected_paths = [
             '/auth/login',
             '/auth/refresh-token',
-            '/admin'
+            '/admin',
+            '/metrics'
         ]
     
     def decode_jwt(self, token):
@@ -26,40 +38,132 @@ class JWTAuthenticationMiddleware:
         except jwt.InvalidTokenError:
             return None
 
-    def __call__(self, request):
-        if request.path.startswith('/admin/'):
-            return self.get_response(request)
-
-        if request.path in self.unprotected_paths:
-            return self.get_response(request)
+    def check_token(self, request):
+        """
+        Verify the bearer token. Returns (decoded_token, None) for a valid access
+        token, (None, None) for unprotected paths and (None, error_response) otherwise.
+        """
+        if request.path.startswith('/admin/') or request.path in self.unprotected_paths:
+            return None, None
 
         auth_header = request.headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
-            return JsonResponse({'error': 'Authorization header is missing or invalid'}, status=401)
+            return None, JsonResponse({'error': 'Authorization header is missing or invalid'}, status=401)
 
         token = auth_header.split(' ')[1]
         decoded_token = self.decode_jwt(token)
 
         if decoded_token == "expired":
-            return JsonResponse({'error': 'Token expired', 'refresh_required': True, 'status':False}, status=401)
+            return None, JsonResponse({'error': 'Token expired', 'refresh_required': True, 'status':False}, status=401)
+
+        if not decoded_token or decoded_token.get('token_type') != 'access' or 'jti' not in decoded_token:
+            return None, JsonResponse({'error': 'Invalid token', 'status':False}, status=401)
+
+        return decoded_token, None
+
+    def revoked(self, decoded_token):
+        """
+        The error response when the token has been revoked, else None. Reads only
+        the in-memory revocation list; callers refresh it first when it is stale.
+        """
+        if token_revocations.is_revoked(decoded_token):
+            return JsonResponse({'error': 'Token revoked', 'status':False}, status=401)
+        return None
+
+    def get_user(self, decoded_token):
+        """
+        Resolve the user for an already verified token, serving repeat tokens from the cache.
+        """
+        jti     = decoded_token['jti']
+        user_id = decoded_token.get('user_id')
+
+        user = token_user_cache.get(jti, user_id)
+        if user is None:
+            user = self.jwt_user_authenticator.get_user(decoded_token)
+            token_user_cache.set(jti, user, decoded_token.get('exp'))
+        return user
 
-        if not decoded_token:
+    async def aget_user(self, decoded_token):
+        jti     = decoded_token['jti']
+        user_id = decoded_token.get('user_id')
+
+        user = token_user_cache.get(jti, user_id)
+        if user is None:
+            user = await self.jwt_user_authenticator.aget_user(decoded_token)
+            token_user_cache.set(jti, user, decoded_token.get('exp'))
+        return user
+
+    def authentication_error(self, exc):
+        if isinstance(exc, (InvalidToken, TokenError, AuthenticationFailed)):
             return JsonResponse({'error': 'Invalid token', 'status':False}, status=401)
+        return JsonResponse({'error': 'An error occurred', 'status':False, 'details': str(exc)}, status=500)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        with timed('auth'):
+            decoded_token, error = self.check_token(request)
+            if error:
+                return error
 
+            if decoded_token:
+                token_revocations.refresh_if_stale()
+                error = self.revoked(decoded_token)
+                if error:
+                    return error
+                try:
+                    request.user        = self.get_user(decoded_token)
+                    request.jwt_payload = decoded_token
+                except Exception as e:
+                    return self.authentication_error(e)
+
+        return self.get_response(request)
+
+    async def aauthenticate(self, request):
+        """
+        Verify the token, its revocation and its user; shared by __acall__ and the
+        ASGI endpoints outside the middleware chain. Returns (user, decoded_token, None),
+        (None, None, None) for unprotected paths and (None, None, error_response) otherwise.
+        """
+        decoded_token, error = self.check_token(request)
+        if error or not decoded_token:
+            return None, None, error
+
+        if token_revocations.needs_refresh():
+            await sync_to_async(token_revocations.refresh)()
+        error = self.revoked(decoded_token)
+        if error:
+            return None, None, error
         try:
-            validated_token = self.jwt_user_authenticator.get_validated_token(token)
-            user = self.jwt_user_authenticator.get_user(validated_token)
-            request.user = user
-        except (InvalidToken, TokenError):
-            return JsonResponse({'error': 'Invalid token', 'status':False}, status=401)
+            return await self.aget_user(decoded_token), decoded_token, None
         except Exception as e:
-            return JsonResponse({'error': 'An error occurred', 'status':False, 'details': str(e)}, status=500)
+            return None, None, self.authentication_error(e)
 
-        return self.get_response(request)
+    async def __acall__(self, request):
+        with timed('auth'):
+            user, decoded_token, error = await self.aauthenticate(request)
+            if error:
+                return error
+            if decoded_token:
+                request.user        = user
+                request.jwt_payload = decoded_token
+
+        return await self.get_response(request)
 
 
 
 class UserJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        """
+        Reuse the user and payload already verified by JWTAuthenticationMiddleware
+        instead of decoding the token and loading the user a second time.
+        """
+        payload = getattr(request._request, 'jwt_payload', None)
+        if payload is not None:
+            return request._request.user, payload
+        return super().authenticate(request)
+
     def get_user(self, validated_token):
         """
         Override get_user method to authenticate an User (CustomUser).
@@ -71,4 +175,14 @@ class UserJWTAuthentication(JWTAuthentication):
             user = User.objects.get(id=user_id)
         except User.DoesNotExist:
             raise AuthenticationFailed("No active user found")
-        return user
\ No newline at end of file
+        return user
+
+    async def aget_user(self, validated_token):
+        user_id = validated_token.get("user_id")
+        User = get_user_model()
+
+        try:
+            user = await User.objects.aget(id=user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("No active user found")
+        return user
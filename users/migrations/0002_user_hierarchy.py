@@ -0,0 +1,56 @@
+# Generated by Django 4.2.5 on 2026-10-18 03:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_hierarchy(apps, schema_editor):
+    User          = apps.get_model('users', 'User')
+    UserHierarchy = apps.get_model('users', 'UserHierarchy')
+    parents = dict(User.objects.values_list('id', 'parent_id_id'))
+    chains  = {}
+    for node in parents:
+        path, current = [], node
+        while current is not None and current not in chains and current not in path:
+            path.append(current)
+            current = parents.get(current)
+        chain = chains.get(current, [])
+        for member in reversed(path):
+            chain = chains[member] = [member, *chain]
+    UserHierarchy.objects.bulk_create(
+        (
+            UserHierarchy(ancestor_id=ancestor, descendant_id=node, depth=depth)
+            for node, chain in chains.items()
+            for depth, ancestor in enumerate(chain)
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserHierarchy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to=settings.AUTH_USER_MODEL)),
+                ('descendant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_hierarchy',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='user_hierarchy_descendant_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userhierarchy',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='user_hierarchy_pair_uniq'),
+        ),
+        migrations.RunPython(backfill_hierarchy, migrations.RunPython.noop),
+    ]
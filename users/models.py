@@ -10,4 +10,42 @@ class User(AbstractUser):
         db_table = "users"
 
 
-    
+class UserHierarchy(models.Model):
+    """
+    Closure table of User.parent_id: one row for every (ancestor, descendant)
+    pair, including each user with itself at depth 0, so a subtree is a single
+    indexed lookup on ancestor. Maintained by the signals in hierarchy.py.
+    """
+    # Both foreign keys are covered by the composite indexes below.
+    ancestor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='descendant_links', db_index=False)
+    descendant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ancestor_links', db_index=False)
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        db_table = "user_hierarchy"
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='user_hierarchy_pair_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth'], name='user_hierarchy_descendant_idx'),
+        ]
+
+
+class TokenRevocation(models.Model):
+    """
+    Revoked access tokens. A row with a jti revokes that token; a row without
+    one revokes every token of `user` issued up to `valid_after`. A row is only
+    needed until the tokens it revokes have expired, which is `expires_at`.
+    """
+    jti = models.CharField(max_length=255, unique=True, blank=True, null=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='token_revocations')
+    valid_after = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "token_revocations"
+        indexes = [
+            models.Index(fields=['created_at'], name='token_revocations_created_idx'),
+            models.Index(fields=['expires_at'], name='token_revocations_expires_idx'),
+        ]
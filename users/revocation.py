@@ -0,0 +1,138 @@
+"""
+Access token revocation without a database query per request.
+
+Every revocation is a TokenRevocation row: one token by jti (logout), or all of
+a user's tokens issued up to a moment (password change, logout everywhere).
+Each process keeps the unexpired rows in memory and reads only the rows added
+since its last read, at most every AUTH_REVOCATION_REFRESH_SECONDS, so a
+revocation made by one worker reaches the others within that interval; the
+worker that made it applies it at once.
+"""
+import time
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from .cache import token_user_cache
+from .models import TokenRevocation
+
+# Rows committed out of created_at order (a slow transaction) are still picked
+# up as long as they commit within this many seconds of their created_at.
+REFRESH_LOOKBACK = timedelta(seconds=60)
+
+
+class RevocationList:
+    """
+    In-memory copy of the unexpired TokenRevocation rows: revoked jtis and,
+    per user, the moment before which their tokens are revoked. Token `iat`
+    has one second resolution, so a token issued in the same second as a
+    per-user revocation counts as revoked.
+    """
+
+    def __init__(self):
+        self.jtis      = {}    # jti -> exp (epoch seconds)
+        self.epochs    = {}    # user id -> (valid after, expires) (epoch seconds)
+        self.cursor    = None
+        self.loaded_at = None
+        self.refreshes = 0
+        self._lock     = threading.Lock()
+        self._loading  = threading.Lock()
+
+    def is_revoked(self, payload):
+        if payload.get('jti') in self.jtis:
+            return True
+        epoch = self.epochs.get(payload.get('user_id'))
+        return epoch is not None and payload.get('iat', 0) <= epoch[0]
+
+    def needs_refresh(self):
+        interval = settings.AUTH_REVOCATION_REFRESH_SECONDS
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= interval
+
+    def refresh(self):
+        """Read the rows added since the last refresh; the first call loads every unexpired row."""
+        # Only the first load makes concurrent requests wait; afterwards one
+        # thread refreshes while the others keep using what is in memory.
+        if not self._loading.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if self.loaded_at is not None and not self.needs_refresh():
+                return
+            started = timezone.now()
+            rows    = TokenRevocation.objects.filter(expires_at__gt=started)
+            if self.cursor is not None:
+                rows = rows.filter(created_at__gte=self.cursor - REFRESH_LOOKBACK)
+            for jti, user_id, valid_after, expires_at in rows.values_list('jti', 'user_id', 'valid_after', 'expires_at'):
+                self.add(jti, user_id, valid_after, expires_at)
+            self.prune()
+            self.cursor    = started
+            self.loaded_at = time.monotonic()
+            self.refreshes += 1
+        finally:
+            self._loading.release()
+
+    def refresh_if_stale(self):
+        if self.needs_refresh():
+            self.refresh()
+
+    def add(self, jti, user_id, valid_after, expires_at):
+        expires = expires_at.timestamp()
+        with self._lock:
+            if jti:
+                self.jtis[jti] = expires
+                return
+            current = self.epochs.get(user_id)
+            if current is None or valid_after.timestamp() > current[0]:
+                self.epochs[user_id] = (valid_after.timestamp(), expires)
+
+    def prune(self):
+        """Forget revocations whose tokens have all expired."""
+        now = time.time()
+        with self._lock:
+            self.jtis   = {jti: exp for jti, exp in self.jtis.items() if exp > now}
+            self.epochs = {user_id: epoch for user_id, epoch in self.epochs.items() if epoch[1] > now}
+
+    def clear(self):
+        with self._lock:
+            self.jtis, self.epochs = {}, {}
+            self.cursor = self.loaded_at = None
+
+    def stats(self):
+        return {'jtis': len(self.jtis), 'users': len(self.epochs), 'refreshes': self.refreshes}
+
+
+token_revocations = RevocationList()
+
+
+def revoke_token(payload):
+    """Revoke the access token with the verified `payload` until it expires."""
+    expires_at = datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc)
+    TokenRevocation.objects.get_or_create(
+        jti=payload['jti'],
+        defaults={'user_id': payload['user_id'], 'expires_at': expires_at}
+    )
+    token_revocations.add(payload['jti'], payload['user_id'], None, expires_at)
+    token_user_cache.invalidate_token(payload['jti'])
+
+
+def revoke_user_tokens(user, at=None):
+    """
+    Revoke every access token of `user` issued up to `at` (default now) and
+    blacklist their outstanding refresh tokens, so none can mint new ones.
+    """
+    at         = at or timezone.now()
+    expires_at = at + api_settings.ACCESS_TOKEN_LIFETIME
+    TokenRevocation.objects.create(user=user, valid_after=at, expires_at=expires_at)
+    token_revocations.add(None, user.pk, at, expires_at)
+    token_user_cache.invalidate_user(user.pk)
+
+    outstanding = OutstandingToken.objects.filter(user=user, expires_at__gt=at, blacklistedtoken__isnull=True)
+    BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in outstanding], ignore_conflicts=True)
+
+
+def prune_revocations():
+    """Delete the rows whose tokens have all expired; returns how many."""
+    return TokenRevocation.objects.filter(expires_at__lte=timezone.now()).delete()[0]
@@ -2,16 +2,16 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from .models import User
+from .revocation import revoke_user_tokens
+from utils.fast_serializer import CompiledSerializer
 
 
 class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
     def validate(self, attrs):
         data = super().validate(attrs)
         user = self.user
-        
-        if not user.is_active:
-            raise serializers.ValidationError("Your account is inactive. Please contact admin.")
-        
+
+        # Inactive accounts never get here: the auth backend already rejects them.
         if user.is_superuser:
             role = "super_admin"
         elif user.is_staff:
@@ -29,9 +29,9 @@ class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser']
+        fields = ['id', 'username', 'email', 'first_name', 'last_name', 'is_staff', 'is_superuser', 'password']
         extra_kwargs = {
-            'password': {'write_only': True}
+            'password': {'write_only': True, 'required': False}
         }
 
     def create(self, validated_data):
@@ -42,4 +42,12 @@ class UserSerializer(serializers.ModelSerializer):
         password = validated_data.pop('password', None)
         if password:
             instance.set_password(password)
-        return super().update(instance, validated_data)
\ No newline at end of file
+        instance = super().update(instance, validated_data)
+        if password:
+            # Tokens issued before the change must stop working.
+            revoke_user_tokens(instance)
+        return instance
+
+
+# Read-only fast path for list endpoints; same output as UserSerializer(rows, many=True).data.
+fast_user_serializer = CompiledSerializer(UserSerializer)
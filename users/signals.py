@@ -0,0 +1,48 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete
+
+from .models import User
+from .cache import token_user_cache
+from . import hierarchy
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    token_user_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_parent(sender, instance, **kwargs):
+    instance._loaded_parent_id = instance.__dict__.get('parent_id_id')
+
+
+def _parent_changed(instance, update_fields):
+    # A deferred parent_id, or update_fields without it, is not being written.
+    if 'parent_id_id' not in instance.__dict__ or (update_fields is not None and 'parent_id' not in update_fields):
+        return False
+    return instance.parent_id_id != instance._loaded_parent_id
+
+
+@receiver(pre_save, sender=User)
+def reject_hierarchy_cycle(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or instance._state.adding or not _parent_changed(instance, update_fields):
+        return
+    parent_id = instance.parent_id_id
+    if parent_id is not None and (parent_id == instance.pk or hierarchy.is_in_subtree(instance, User(pk=parent_id))):
+        raise ValueError("A user cannot report to themselves or to someone in their own subtree")
+
+
+@receiver(post_save, sender=User)
+def update_hierarchy(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        hierarchy.add_node(instance)
+    elif _parent_changed(instance, update_fields):
+        hierarchy.move_node(instance)
+    else:
+        return
+    instance._loaded_parent_id = instance.parent_id_id
+
+
+@receiver(pre_delete, sender=User)
+def detach_hierarchy(sender, instance, **kwargs):
+    hierarchy.remove_node(instance)
@@ -1,3 +1,247 @@
-from django.test import TestCase
+from django.db import connection
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from datetime import timedelta
 
-# Create your tests here.
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .models import User, UserHierarchy, TokenRevocation
+from .hierarchy import rebuild_hierarchy
+from .revocation import token_revocations, revoke_user_tokens
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserListQueryCountTests(TestCase):
+    """A list page must cost the same number of queries whatever its size."""
+
+    def setUp(self):
+        self.superuser = User.objects.create_user(
+            username='root', email='root@example.com', password='secret', is_staff=True, is_superuser=True
+        )
+        for i in range(30):
+            User.objects.create_user(username=f'member{i}', email=f'member{i}@example.com', password='secret')
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.superuser).access_token}'}
+
+    def list_queries(self, per_page, **params):
+        url = reverse('user-list')
+        self.client.get(url, {'perPage': 1}, **self.headers)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'perPage': per_page, **params}, **self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), per_page)
+        return len(queries)
+
+    def test_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(5), 2)
+        self.assertEqual(self.list_queries(25), 2)
+
+    def test_cursor_page_size_does_not_change_query_count(self):
+        self.assertEqual(self.list_queries(5, cursor=''), 1)
+        self.assertEqual(self.list_queries(25, cursor=''), 1)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='secret')
+
+    def login(self, password, username='member', **extra):
+        return self.client.post(reverse('login'), {'username': username, 'password': password}, **extra)
+
+    def test_login_returns_tokens(self):
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json()['data'])
+
+    def test_login_upgrades_password_hash(self):
+        with override_settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.ScryptPasswordHasher',
+            'django.contrib.auth.hashers.MD5PasswordHasher',
+        ]):
+            self.assertEqual(self.login('secret').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    @override_settings(LOGIN_MAX_ACCOUNT_FAILURES=3)
+    def test_account_is_throttled_after_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong').status_code, 400)
+        response = self.login('secret')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+        # Other accounts from another address are unaffected.
+        User.objects.create_user(username='other', email='other@example.com', password='secret')
+        self.assertEqual(self.login('secret', username='other', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    @override_settings(LOGIN_MAX_IP_FAILURES=2)
+    def test_ip_is_throttled_across_accounts(self):
+        self.login('wrong', username='nobody1')
+        self.login('wrong', username='nobody2')
+        self.assertEqual(self.login('secret').status_code, 429)
+        self.assertEqual(self.login('secret', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_success_resets_account_failures(self):
+        with override_settings(LOGIN_MAX_ACCOUNT_FAILURES=2):
+            self.login('wrong')
+            self.assertEqual(self.login('secret').status_code, 200)
+            self.login('wrong')
+            self.assertEqual(self.login('secret').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class HierarchyTests(TestCase):
+    """
+    Org chart used below:
+
+        director ─┬─ manager ─── member
+                  └─ lead
+        outsider
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.director = self.create_user('director', is_staff=True)
+        self.manager  = self.create_user('manager', parent_id=self.director, is_staff=True)
+        self.member   = self.create_user('member', parent_id=self.manager)
+        self.lead     = self.create_user('lead', parent_id=self.director, is_staff=True)
+        self.outsider = self.create_user('outsider')
+
+    def create_user(self, username, **extra):
+        return User.objects.create_user(username=username, email=f'{username}@example.com', password='secret', **extra)
+
+    def closure(self):
+        return set(UserHierarchy.objects.values_list('ancestor__username', 'descendant__username', 'depth'))
+
+    def visible_usernames(self, user):
+        headers  = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        response = self.client.get(reverse('user-list'), **headers)
+        self.assertEqual(response.status_code, 200)
+        return {row['username'] for row in response.json()['data']}
+
+    def test_staff_see_their_whole_subtree(self):
+        self.assertEqual(self.visible_usernames(self.director), {'manager', 'member', 'lead'})
+        self.assertEqual(self.visible_usernames(self.manager), {'member'})
+
+    def test_reparenting_moves_the_subtree(self):
+        self.manager.parent_id = self.lead
+        self.manager.save()
+        self.assertIn(('lead', 'member', 2), self.closure())
+        self.assertIn(('director', 'member', 3), self.closure())
+        self.assertNotIn(('director', 'member', 2), self.closure())
+
+        self.manager.parent_id = None
+        self.manager.save()
+        self.assertEqual(self.visible_usernames(self.director), {'lead'})
+
+    def test_deleting_a_manager_detaches_their_reports(self):
+        self.manager.delete()
+        self.assertEqual(self.visible_usernames(self.director), {'lead'})
+        self.assertEqual(
+            {(ancestor, depth) for ancestor, descendant, depth in self.closure() if descendant == 'member'},
+            {('member', 0)}
+        )
+
+    def test_cycles_are_rejected(self):
+        self.director.parent_id = self.member
+        with self.assertRaises(ValueError):
+            self.director.save()
+
+    def test_incremental_maintenance_matches_rebuild(self):
+        self.lead.parent_id = self.manager
+        self.lead.save()
+        self.create_user('intern', parent_id=self.lead)
+        maintained = self.closure()
+        rebuild_hierarchy()
+        self.assertEqual(self.closure(), maintained)
+
+    def test_staff_can_edit_their_subtree_only(self):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.director).access_token}'}
+        url     = lambda user: reverse('user-detail', args=[user.pk])
+        self.assertEqual(self.client.patch(url(self.member), {'first_name': 'M'}, content_type='application/json', **headers).status_code, 200)
+        self.assertEqual(self.client.patch(url(self.outsider), {'first_name': 'O'}, content_type='application/json', **headers).status_code, 403)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        token_revocations.clear()
+        self.addCleanup(token_revocations.clear)
+        self.user = User.objects.create_user(username='member', email='member@example.com', password='secret')
+
+    def tokens(self):
+        refresh = RefreshToken.for_user(self.user)
+        return str(refresh), {'HTTP_AUTHORIZATION': f'Bearer {refresh.access_token}'}
+
+    def get(self, headers):
+        return self.client.get(reverse('user-list'), **headers)
+
+    def logout(self, headers, refresh, **data):
+        return self.client.post(reverse('logout'), {'refresh': refresh, **data}, content_type='application/json', **headers)
+
+    def test_logout_revokes_access_token(self):
+        refresh, headers = self.tokens()
+        _, other = self.tokens()
+        self.assertEqual(self.get(headers).status_code, 200)
+
+        self.assertEqual(self.logout(headers, refresh).status_code, 205)
+        response = self.get(headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['error'], 'Token revoked')
+        # Only the token used to log out is revoked.
+        self.assertEqual(self.get(other).status_code, 200)
+
+    def test_logout_everywhere_revokes_every_token(self):
+        refresh, headers = self.tokens()
+        _, other = self.tokens()
+
+        self.assertEqual(self.logout(headers, refresh, all=True).status_code, 205)
+        self.assertEqual(self.get(other).status_code, 401)
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=self.user).count(), 2)
+
+    def test_password_change_revokes_every_token(self):
+        _, headers = self.tokens()
+        _, other   = self.tokens()
+        response = self.client.patch(
+            reverse('user-detail', args=[self.user.pk]), {'password': 'changed-secret'},
+            content_type='application/json', **headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('password', response.json()['data'])
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('changed-secret'))
+        self.assertEqual(self.get(headers).status_code, 401)
+        self.assertEqual(self.get(other).status_code, 401)
+
+    def test_tokens_issued_after_revocation_stay_valid(self):
+        _, headers = self.tokens()
+        revoke_user_tokens(self.user, at=timezone.now() - timedelta(seconds=5))
+        self.assertEqual(self.get(headers).status_code, 200)
+
+    def test_revocation_by_another_worker_applies_after_refresh(self):
+        access  = RefreshToken.for_user(self.user).access_token
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+        with override_settings(AUTH_REVOCATION_REFRESH_SECONDS=60):
+            self.assertEqual(self.get(headers).status_code, 200)
+            # Written by another process: this one has not read it yet.
+            TokenRevocation.objects.create(
+                jti=access['jti'], user=self.user, expires_at=timezone.now() + timedelta(hours=1)
+            )
+            self.assertEqual(self.get(headers).status_code, 200)
+
+        with override_settings(AUTH_REVOCATION_REFRESH_SECONDS=0):
+            self.assertEqual(self.get(headers).status_code, 401)
+
+    @override_settings(AUTH_REVOCATION_REFRESH_SECONDS=60)
+    def test_fresh_list_is_checked_without_queries(self):
+        _, headers = self.tokens()
+        self.get(headers)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get(headers).status_code, 200)
+        self.assertFalse([query for query in queries if 'token_revocations' in query['sql']])
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+class LoginThrottle:
+    """
+    Counts failed logins per account and per client IP in the Django cache.
+    Once either count reaches its limit, further attempts are refused before any
+    password is hashed until the window that started at the first failure ends.
+    The limits hold across workers only with the shared cache (REDIS_URL); on
+    the default per-process cache each worker counts on its own.
+    """
+
+    def __init__(self, username, ip):
+        self.account_key = f'login-failures:user:{username.lower()}'
+        self.keys        = {
+            self.account_key: settings.LOGIN_MAX_ACCOUNT_FAILURES,
+            f'login-failures:ip:{ip}': settings.LOGIN_MAX_IP_FAILURES,
+        }
+
+    def retry_after(self):
+        """Seconds the client should wait, or None when the attempt may proceed."""
+        counts = cache.get_many(self.keys)
+        if any(counts.get(key, 0) >= limit for key, limit in self.keys.items()):
+            return settings.LOGIN_THROTTLE_WINDOW
+        return None
+
+    def failed(self):
+        for key in self.keys:
+            cache.add(key, 0, settings.LOGIN_THROTTLE_WINDOW)
+            try:
+                cache.incr(key)
+            except ValueError:
+                # Expired between add() and incr(); the next failure starts a new window.
+                pass
+
+    def succeeded(self):
+        cache.delete(self.account_key)
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+UserView = views.AsyncUserAPIView if settings.ASYNC_VIEWS else views.UserAPIView
+
 urlpatterns = [
     path('/login', views.UserLoginAPIView.as_view(), name='login'),
     path('/logout', views.UserLogoutAPIView.as_view(), name='logout'),
-    path('/users',views.UserAPIView.as_view(), name='user-list'),
-    path('/users/<int:pk>', views.UserAPIView.as_view(), name='user-detail'),
+    path('/users',UserView.as_view(), name='user-list'),
+    path('/users/<int:pk>', UserView.as_view(), name='user-detail'),
 ]
\ No newline at end of file
@@ -1,28 +1,52 @@
 from rest_framework import status, serializers
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken
 
 from .models import User
-from utils.pagination import paginate
+from .cache import token_user_cache
+from .revocation import revoke_token, revoke_user_tokens
+from .hierarchy import is_in_subtree
+from .backends import LoginBusy
+from .throttle import LoginThrottle, client_ip
+from utils.pagination import paginate, apaginate
 from utils.common import BaseAPIView
-from .serializer import UserTokenObtainPairSerializer, UserSerializer  
+from utils.async_views import AsyncAPIView
+from utils.db.router import read_from_replica
+from utils.conditional import make_validators, page_validators, validator_headers, conditional_response
+from .serializer import UserTokenObtainPairSerializer, UserSerializer, fast_user_serializer  
 
 class UserLoginAPIView(BaseAPIView, TokenObtainPairView):
     permission_classes = [AllowAny]
     serializer_class = UserTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
+        throttle    = LoginThrottle(str(request.data.get('username', '')), client_ip(request))
+        retry_after = throttle.retry_after()
+        if retry_after:
+            return self._format_response(
+                False,
+                "Too many failed login attempts, try again later",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(retry_after)}
+            )
+
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
+            throttle.succeeded()
             return self._format_response(True, 'Login successful', serializer.validated_data)
         except AuthenticationFailed:
+            throttle.failed()
             return self._format_response(False, "Incorrect username or password", status_code=status.HTTP_400_BAD_REQUEST)
+        except LoginBusy as e:
+            return self._format_response(False, str(e), status_code=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '1'})
         except InvalidToken:
             return self._format_response(False, "Invalid token", status_code=status.HTTP_400_BAD_REQUEST)
         except Exception:
@@ -31,35 +55,66 @@ class UserLoginAPIView(BaseAPIView, TokenObtainPairView):
         
 
 class UserLogoutAPIView(BaseAPIView):
+    """
+    Blacklists the refresh token and revokes the access token the request was
+    made with; with `"all": true`, every token of the user on every device.
+    """
     permission_classes = [IsAuthenticated]
     def post(self, request):
         try:
             refresh_token = request.data["refresh"]
             token = RefreshToken(refresh_token)
             token.blacklist()
+            token_user_cache.invalidate_user(token['user_id'])
+            payload = getattr(request._request, 'jwt_payload', None)
+            if payload is not None:
+                revoke_token(payload)
+            if request.data.get('all') is True:
+                revoke_user_tokens(request.user)
             return self._format_response(True, "Logout successful", status_code=status.HTTP_205_RESET_CONTENT)
         except KeyError:
             return self._format_response(False, "Refresh token is required", status_code=status.HTTP_400_BAD_REQUEST)
         except TokenError:
             return self._format_response(False, "Invalid or expired token", status_code=status.HTTP_400_BAD_REQUEST)
 
+def visible_users(user):
+    """
+    Visible users, loading only the columns UserSerializer and pagination read.
+    Staff see everyone in their subtree through one join on user_hierarchy.
+    """
+    users = User.objects.only(*UserSerializer.Meta.fields, 'created_at', 'updated_at')
+    if user.is_superuser:
+        return users.exclude(id=user.id)
+    elif user.is_staff:
+        return users.filter(ancestor_links__ancestor_id=user.id, ancestor_links__depth__gt=0)
+    return users.filter(id=user.id)
+
+
 class UserAPIView(BaseAPIView):
-    def get(self, request, pk=None):
-        user = request.user
-        if user.is_superuser:
-            users = User.objects.exclude(id=user.id)
-        elif user.is_staff:
-            users = User.objects.filter(created_by=user)
-        else:
-            users = User.objects.filter(id=user.id)
+    version_fields = ('id', 'updated_at')
+
+    def get_queryset(self):
+        return visible_users(self.request.user)
 
+    @read_from_replica
+    def get(self, request, pk=None):
+        users = self.get_queryset()
         if pk:
             user_instance = get_object_or_404(users, id=pk)
+            etag, last_modified = make_validators([user_instance], self.version_fields)
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified:
+                return not_modified
             serializer   = UserSerializer(user_instance)
-            return self._format_response(True, data=serializer.data)
+            return self._format_response(True, data=serializer.data, headers=validator_headers(etag, last_modified))
+
         paginated_data = paginate(users, request)
-        serializer     = UserSerializer(paginated_data['data'], many=True)
-        return self._format_response(True, serializer.data, status_code = status.HTTP_200_OK, pagination = paginated_data)
+        rows           = list(paginated_data['data'])
+        etag, last_modified = page_validators(rows, self.version_fields, paginated_data)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        return self._format_response(True, "Users list retrieved successfully", fast_user_serializer.many(rows), status_code = status.HTTP_200_OK, pagination = paginated_data, headers = validator_headers(etag, last_modified))
 
     def post(self, request):
         if not (request.user.is_staff or request.user.is_superuser):
@@ -67,7 +122,6 @@ class UserAPIView(BaseAPIView):
 
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
-            print(f"request:{request.user.id}")
             new_user = serializer.save(parent_id=request.user)
             return self._format_response(True, "User created successfully", UserSerializer(new_user).data, status_code=status.HTTP_201_CREATED)
         return self._format_response(False, "Validation error", serializer.errors, status_code=status.HTTP_400_BAD_REQUEST)
@@ -75,9 +129,13 @@ class UserAPIView(BaseAPIView):
     def patch(self, request, pk):
         user_instance = get_object_or_404(User, id=pk)
         user = request.user
-        if not (user.is_superuser or (user.is_staff and user_instance.created_by == user) or user_instance == user):
+        if not (user.is_superuser or (user.is_staff and is_in_subtree(user, user_instance)) or user_instance == user):
             return self._format_response(False, "Permission denied", status_code=status.HTTP_403_FORBIDDEN)
 
+        precondition_failed = conditional_response(request, *make_validators([user_instance], self.version_fields))
+        if precondition_failed:
+            return precondition_failed
+
         serializer = UserSerializer(user_instance, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -87,8 +145,37 @@ class UserAPIView(BaseAPIView):
     def delete(self, request, pk):
         user_instance = get_object_or_404(User, id=pk)
         user = request.user
-        if not (user.is_superuser or (user.is_staff and user_instance.created_by == user)):
+        if not (user.is_superuser or (user.is_staff and is_in_subtree(user, user_instance))):
             return self._format_response(False, "Permission denied", status_code=status.HTTP_403_FORBIDDEN)
 
         user_instance.delete()
         return self._format_response(True, "User deleted successfully")
+
+
+
+class AsyncUserAPIView(AsyncAPIView):
+    """UserAPIView with the read path on the async ORM, served when ASYNC_VIEWS is enabled."""
+    sync_view = UserAPIView
+
+    @read_from_replica
+    async def get(self, request, pk=None):
+        users = visible_users(request.user)
+        if pk:
+            try:
+                user_instance = await users.aget(id=pk)
+            except User.DoesNotExist:
+                raise Http404
+            etag, last_modified = make_validators([user_instance], UserAPIView.version_fields)
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified:
+                return not_modified
+            serializer   = UserSerializer(user_instance)
+            return self._format_response(True, data=serializer.data, headers=validator_headers(etag, last_modified))
+
+        paginated_data = await apaginate(users, request)
+        rows           = paginated_data['data']
+        etag, last_modified = page_validators(rows, UserAPIView.version_fields, paginated_data)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        return self._format_response(True, "Users list retrieved successfully", fast_user_serializer.many(rows), status_code = status.HTTP_200_OK, pagination = paginated_data, headers = validator_headers(etag, last_modified))
@@ -0,0 +1,54 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views import View
+from django.utils.decorators import classonlymethod
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+
+from .common import response_payload
+from .renderers import FastJSONRenderer
+
+
+class AsyncAPIView(View):
+    """
+    Serves GET from an async handler on the async ORM, so an ASGI worker is not
+    blocked on database I/O, and hands every other method to `sync_view`, the
+    DRF view it mirrors, in a thread. Responses are rendered with the project's
+    JSON renderer, so both paths return identical bodies.
+    """
+    sync_view    = None
+    sync_handler = None
+    renderer     = FastJSONRenderer()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(sync_handler=sync_to_async(cls.sync_view.as_view()), **initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await self.sync_handler(request, *args, **kwargs)
+
+        try:
+            # The JWT middleware has already resolved request.user for verified tokens.
+            if getattr(request, 'jwt_payload', None) is None:
+                raise NotAuthenticated()
+            return await super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return self._render({'detail': 'Not found.'}, status.HTTP_404_NOT_FOUND)
+        except APIException as e:
+            return self._render({'detail': e.detail}, e.status_code)
+
+    def _render(self, data, status_code, headers=None):
+        response = HttpResponse(
+            self.renderer.render(data),
+            status=status_code,
+            content_type=self.renderer.media_type,
+            headers=headers
+        )
+        response['Allow'] = ', '.join(method.upper() for method in self.sync_view.http_method_names if hasattr(self.sync_view, method))
+        return response
+
+    def _format_response(self, status_bool, message=None, data=None, status_code=status.HTTP_200_OK, pagination = None, headers = None):
+        return self._render(response_payload(status_bool, message, data, pagination), status_code, headers)
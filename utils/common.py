@@ -1,27 +1,41 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from itertools import islice
 from django.shortcuts import get_object_or_404
 
 
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class CommonUtils():
     def __init__(self):
         pass
-    def get_object(self, pk):
-        queryset = self.get_queryset()
+    def get_object(self, queryset, pk):
         return get_object_or_404(queryset, pk=pk)
     
 
-class BaseAPIView(APIView):
-    def _format_response(self, status_bool, message=None, data=None, status_code=status.HTTP_200_OK, pagination = None):
-        response_data = {
-            'status': status_bool,
-            'message': message,
-            'data': data
-        }
-        if pagination:
-            response_data['total_pages'] = pagination.get('total_pages')
-            response_data['total_items'] = pagination.get('count')
-            response_data['current_page'] = pagination.get('number')
+def response_payload(status_bool, message=None, data=None, pagination=None):
+    response_data = {
+        'status': status_bool,
+        'message': message,
+        'data': data
+    }
+    if pagination:
+        response_data['total_pages'] = pagination.get('total_pages')
+        response_data['total_items'] = pagination.get('count')
+        response_data['current_page'] = pagination.get('current_page')
+        if 'next' in pagination:
+            response_data['next'] = pagination.get('next')
+            response_data['prev'] = pagination.get('prev')
+    return response_data
 
-        return Response(response_data, status=status_code)
\ No newline at end of file
+
+class BaseAPIView(APIView):
+    def _format_response(self, status_bool, message=None, data=None, status_code=status.HTTP_200_OK, pagination = None, headers = None):
+        response_data = response_payload(status_bool, message, data, pagination)
+        return Response(response_data, status=status_code, headers=headers)
\ No newline at end of file
@@ -0,0 +1,49 @@
+import hashlib
+from datetime import datetime
+from operator import attrgetter
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+PAGINATION_KEYS = ('count', 'total_pages', 'current_page', 'next', 'prev')
+
+
+def make_validators(rows, fields, *extra):
+    """
+    Return a strong ETag and Last-Modified datetime for already loaded `rows`,
+    built from the `fields` that change whenever their representation does.
+    """
+    getters  = [attrgetter(field.replace('__', '.')) for field in fields]
+    versions = [tuple(getter(row) for getter in getters) for row in rows]
+    digest   = hashlib.blake2b(repr((versions, extra)).encode(), digest_size=16).hexdigest()
+    stamps   = [value for version in versions for value in version if isinstance(value, datetime)]
+    return quote_etag(digest), max(stamps, default=None)
+
+
+def page_validators(rows, fields, pagination):
+    """
+    ETag only: the newest row on a page does not move when a row is deleted or
+    leaves the list, so a Last-Modified would answer If-Modified-Since with 304.
+    """
+    etag, _ = make_validators(rows, fields, *(pagination.get(key) for key in PAGINATION_KEYS))
+    return etag, None
+
+
+def validator_headers(etag, last_modified):
+    headers = {'ETag': etag}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return headers
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Evaluate If-Match / If-None-Match / If-Modified-Since against the validators.
+    Returns a 304 or 412 response to send instead of the resource, or None.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+    response  = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        for header, value in validator_headers(etag, last_modified).items():
+            response[header] = value
+    return response
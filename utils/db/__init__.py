@@ -0,0 +1,19 @@
+"""
+Database backends and routing configured from the DB_* settings in config.py.
+
+`utils.db.sqlite3` and `utils.db.mysql` are Django's own backends with an
+optional per-process connection pool (see pool.py); `router.ReplicaRouter`
+sends reads made inside `replica_reads()` to the read replicas.
+"""
+from django.db import connections
+
+
+def release_connections():
+    """
+    What Django does with this thread's connections at the end of a request,
+    for work done outside one; connections inside a transaction (a test's)
+    are left alone.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
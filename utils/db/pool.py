@@ -0,0 +1,157 @@
+"""
+Per-process database connection pool for threaded workers.
+
+Django gives every thread its own connection and, with CONN_MAX_AGE, keeps it
+open on that thread between requests, so a process holds one connection per
+thread that ever touched the database: gunicorn gthread workers, asgiref's
+executor threads and job worker threads. With POOL_SIZE set on a DATABASES
+entry, closing a connection (which Django does at the end of every request
+when CONN_MAX_AGE is 0) hands the open connection back to a pool shared by the
+process's threads, and opening one takes an idle connection from that pool.
+At most POOL_SIZE connections are open at once; a thread that finds them all
+in use waits up to POOL_TIMEOUT seconds and then fails with OperationalError.
+Pooled connections are replaced once they are POOL_RECYCLE seconds old (0
+keeps them indefinitely) and, with CONN_HEALTH_CHECKS, pinged before reuse.
+"""
+import os
+import time
+import weakref
+import threading
+from collections import deque
+
+_pools      = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, size, timeout=10, recycle=0):
+        self.size      = size
+        self.timeout   = timeout
+        self.recycle   = recycle
+        self.open      = 0
+        self.idle      = deque()
+        self.available = threading.Condition()
+
+    def acquire(self):
+        """
+        An idle (connection, opened_at), newest first, or None once a slot for a
+        new connection is reserved; the caller must release() it if opening fails.
+        Waits up to `timeout` seconds for either and raises TimeoutError.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self.available:
+            while True:
+                if self.idle:
+                    return self.idle.pop()
+                if self.open < self.size:
+                    self.open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError
+                self.available.wait(remaining)
+
+    def checkin(self, connection, opened_at):
+        with self.available:
+            self.idle.append((connection, opened_at))
+            self.available.notify()
+
+    def release(self):
+        with self.available:
+            self.open -= 1
+            self.available.notify()
+
+    def discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        self.release()
+
+    def expired(self, opened_at):
+        return bool(self.recycle) and time.monotonic() - opened_at >= self.recycle
+
+    def stats(self):
+        with self.available:
+            return {'size': self.size, 'open': self.open, 'idle': len(self.idle)}
+
+
+def connection_pool(alias, settings_dict):
+    size = settings_dict.get('POOL_SIZE') or 0
+    if not size:
+        return None
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                size, settings_dict.get('POOL_TIMEOUT', 10), settings_dict.get('POOL_RECYCLE', 0)
+            )
+        return _pools[alias]
+
+
+# A forked child must not reuse the sockets of its parent's idle connections.
+os.register_at_fork(after_in_child=_pools.clear)
+
+
+class PooledDatabaseWrapperMixin:
+    _pool_release = None
+
+    def get_new_connection(self, conn_params):
+        pool = connection_pool(self.alias, self.settings_dict)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        while True:
+            try:
+                entry = pool.acquire()
+            except TimeoutError:
+                raise self.Database.OperationalError(
+                    f"All {pool.size} connections to database \"{self.alias}\" are in use (waited {pool.timeout}s)"
+                )
+            if entry is None:
+                break
+            connection, opened_at = entry
+            if pool.expired(opened_at) or (self.settings_dict.get('CONN_HEALTH_CHECKS') and not self._ping(connection)):
+                pool.discard(connection)
+                continue
+            return self._checked_out(pool, connection, opened_at)
+
+        try:
+            connection = super().get_new_connection(conn_params)
+        except BaseException:
+            pool.release()
+            raise
+        return self._checked_out(pool, connection, time.monotonic())
+
+    def _checked_out(self, pool, connection, opened_at):
+        self._pool_opened_at = opened_at
+        # Gives the slot back if the thread ends without closing its connection.
+        self._pool_release = weakref.finalize(self, pool.release)
+        return connection
+
+    def _ping(self, connection):
+        try:
+            cursor = connection.cursor()
+            cursor.execute('SELECT 1')
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _close(self):
+        if self._pool_release is None:
+            return super()._close()
+
+        pool       = connection_pool(self.alias, self.settings_dict)
+        connection = self.connection
+        self._pool_release.detach()
+        self._pool_release = None
+        if self.errors_occurred:
+            pool.discard(connection)
+            return
+        if self.in_atomic_block or not self.autocommit:
+            try:
+                connection.rollback()
+            except Exception:
+                pool.discard(connection)
+                return
+        pool.checkin(connection, self._pool_opened_at)
@@ -0,0 +1,63 @@
+"""
+Read replica routing. Reads made inside `replica_reads()` (or a view method
+decorated with `read_from_replica`) go to a random alias of DATABASE_REPLICAS;
+everything else, writes, and reads inside a transaction on the primary use
+'default'. Replicas lag the primary, so only endpoints that can serve
+slightly stale rows should read from them.
+"""
+import random
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_from_replica():
+    """Whether reads in the current context may be served by a replica."""
+    return bool(settings.DATABASE_REPLICAS) and _replica_reads.get()
+
+
+def read_from_replica(method):
+    """Run a sync or async view method inside `replica_reads()`."""
+    if iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                return await method(*args, **kwargs)
+    else:
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return method(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not reading_from_replica() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or Django would write an instance back to the replica it was read from.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,145 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Timings of the request being handled in this context, set by PerformanceMiddleware.
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Per-request accumulator for time spent in each phase and the SQL it ran."""
+
+    def __init__(self, capture_sql=False):
+        self.phases      = {}
+        self.query_count = 0
+        self.query_time  = 0.0
+        self.capture_sql = capture_sql
+        self.queries     = []
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def record_query(self, sql, seconds):
+        self.query_count += 1
+        self.query_time  += seconds
+        if self.capture_sql and len(self.queries) < 50:
+            self.queries.append((seconds, sql))
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper() hook installed on every connection. It finds the
+    request through a context variable, which sync_to_async() carries over to the
+    thread that runs the query, so async views are measured too.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.record_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# Connected on import, which the apps' ready() triggers before any connection is opened.
+connection_created.connect(install_query_recorder)
+
+
+@contextmanager
+def timed(phase):
+    """Add the time spent in the block to `phase` of the current request, if any."""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - started)
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms rendered in the Prometheus text format.
+    Each worker process keeps its own registry.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets    = buckets
+        self.counters   = {}   # name -> {label values: value}
+        self.histograms = {}   # name -> {label values: [bucket counts..., sum, count]}
+        self.labels     = {}
+        self.help       = {}
+        self.collectors = []
+        self._lock      = threading.Lock()
+
+    def describe(self, name, help_text, labels):
+        self.help[name]   = help_text
+        self.labels[name] = labels
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            state  = series.get(labels)
+            if state is None:
+                state = series[labels] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def register_collector(self, collector):
+        """`collector()` returns [(name, type, help, value)] gauges or counters read at scrape time."""
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines += [f'# HELP {name} {self.help.get(name, name)}', f'# TYPE {name} counter']
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{{{_labels(self.labels[name], labels)}}} {value}')
+            for name, series in sorted(self.histograms.items()):
+                lines += [f'# HELP {name} {self.help.get(name, name)}', f'# TYPE {name} histogram']
+                for labels, state in sorted(series.items()):
+                    label_text = _labels(self.labels[name], labels)
+                    # Bucket counts are stored cumulatively by observe().
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {state[-1]}')
+                    lines.append(f'{name}_sum{{{label_text}}} {state[-2]}')
+                    lines.append(f'{name}_count{{{label_text}}} {state[-1]}')
+        for collector in self.collectors:
+            for name, metric_type, help_text, value in collector():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {metric_type}', f'{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+registry.describe('http_request_duration_seconds', 'Request latency by route', ('method', 'route'))
+registry.describe('http_requests_total', 'Requests by route and status code', ('method', 'route', 'status'))
+registry.describe('http_request_db_queries_total', 'SQL queries run by requests', ('method', 'route'))
+registry.describe('http_request_db_seconds_total', 'Time spent in SQL queries', ('method', 'route'))
+registry.describe('http_request_phase_seconds_total', 'Time spent in auth, serialization and rendering', ('method', 'route', 'phase'))
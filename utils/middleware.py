@@ -0,0 +1,87 @@
+import time
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .metrics import RequestTimings, current_timings, registry, install_query_recorder
+
+slow_request_logger = logging.getLogger('performance.slow_requests')
+
+
+class PerformanceMiddleware:
+    """
+    Times every request and records, per route: a latency histogram, the SQL
+    query count and time (through utils.metrics.record_query), and the time
+    spent in the auth, serialize and render phases reported by utils.metrics.timed().
+
+    Adds a Server-Timing header with the same breakdown and, when
+    SLOW_REQUEST_MS is set, logs slower requests with the SQL they ran.
+    Must be the first middleware so the whole stack is measured.
+    """
+    sync_capable  = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode   = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Connections opened before this module was imported missed connection_created.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def _start(self):
+        timings = RequestTimings(capture_sql=bool(settings.SLOW_REQUEST_MS))
+        return timings, current_timings.set(timings), time.perf_counter()
+
+    def _finish(self, request, response, timings, token, started):
+        elapsed = time.perf_counter() - started
+        current_timings.reset(token)
+
+        match  = getattr(request, 'resolver_match', None)
+        route  = match.route if match else 'unmatched'
+        labels = (request.method, route)
+        registry.observe('http_request_duration_seconds', labels, elapsed)
+        registry.inc('http_requests_total', (*labels, response.status_code))
+        registry.inc('http_request_db_queries_total', labels, timings.query_count)
+        registry.inc('http_request_db_seconds_total', labels, timings.query_time)
+        for phase, seconds in timings.phases.items():
+            registry.inc('http_request_phase_seconds_total', (*labels, phase), seconds)
+
+        if settings.SERVER_TIMING:
+            entries = [f'{phase};dur={seconds * 1000:.2f}' for phase, seconds in timings.phases.items()]
+            entries.append(f'db;dur={timings.query_time * 1000:.2f};desc="{timings.query_count} queries"')
+            entries.append(f'total;dur={elapsed * 1000:.2f}')
+            response['Server-Timing'] = ', '.join(entries)
+
+        if settings.SLOW_REQUEST_MS and elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            slow_request_logger.warning(
+                "Slow request %s %s (%s): %.1f ms, %d queries in %.1f ms\n%s",
+                request.method, request.get_full_path(), route, elapsed * 1000,
+                timings.query_count, timings.query_time * 1000,
+                '\n'.join(f'  {seconds * 1000:.1f} ms  {sql}' for seconds, sql in timings.queries)
+            )
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        timings, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        except BaseException:
+            current_timings.reset(token)
+            raise
+        return self._finish(request, response, timings, token, started)
+
+    async def __acall__(self, request):
+        timings, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            current_timings.reset(token)
+            raise
+        return self._finish(request, response, timings, token, started)
@@ -1,15 +1,46 @@
+import json
+import math
+import heapq
+import itertools
+import base64
+import binascii
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+
+from django.db import connection
+from django.db.models import Q
 from django.core.paginator import Paginator
+from rest_framework.exceptions import NotFound
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE     = 100
+COUNT_MODES      = ('exact', 'estimate', 'none')
+
+
+def _int_param(request, name, default):
+    try:
+        return max(1, int(request.GET.get(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _per_page(request):
+    return min(_int_param(request, 'perPage', DEFAULT_PER_PAGE), MAX_PER_PAGE)
 
 
 def paginate(queryset, request):
     """Paginates a queryset and returns paginated data with the paginator object."""
-    queryset  = queryset.order_by('-created_at')
-    page      = request.GET.get('page', 1)
-    per_page  = request.GET.get('perPage', 10)
+    if 'cursor' in request.GET or request.GET.get('pagination') == 'cursor':
+        return cursor_paginate(queryset, request)
+
+    queryset  = queryset.order_by('-created_at', '-id')
+    page      = _int_param(request, 'page', 1)
+    per_page  = _per_page(request)
     paginator = Paginator(queryset, per_page)
-    
+
     page = max(1, min(page, paginator.num_pages))
-    
+
     paginated_data = paginator.get_page(page)
     return {
         "count": paginator.count,
@@ -17,4 +48,181 @@ def paginate(queryset, request):
         "current_page": paginated_data.number,
         "data": paginated_data.object_list
     }
-    
\ No newline at end of file
+
+
+def encode_cursor(instance, direction):
+    payload = json.dumps([instance.created_at.isoformat(), instance.pk, direction])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, pk, direction = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('next', 'prev'):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(pk), direction
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+        raise NotFound("Invalid cursor")
+
+
+def estimate_count(queryset):
+    """
+    Cheap row estimate from table statistics. Only available for unfiltered
+    querysets on MySQL; returns None when no estimate can be made.
+    """
+    if connection.vendor != 'mysql' or queryset.query.where:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _count_mode(request):
+    count_mode = request.GET.get('count', 'none')
+    return count_mode if count_mode in COUNT_MODES else 'none'
+
+
+def _cursor_page(queryset, request):
+    """Build the keyset query for the requested cursor: (query, per_page, direction, token)."""
+    per_page  = _per_page(request)
+    token     = request.GET.get('cursor')
+    direction = 'next'
+    page      = queryset
+    if token:
+        created_at, pk, direction = decode_cursor(token)
+        if direction == 'next':
+            page = page.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        else:
+            page = page.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+    if direction == 'next':
+        page = page.order_by('-created_at', '-id')
+    else:
+        page = page.order_by('created_at', 'id')
+    return page[:per_page + 1], per_page, direction, token
+
+
+def _cursor_result(rows, per_page, direction, token, count):
+    has_more = len(rows) > per_page
+    if direction == 'next':
+        rows = rows[:per_page]
+        has_next, has_prev = has_more, bool(token)
+    else:
+        rows = rows[:per_page][::-1]
+        has_next, has_prev = True, has_more
+
+    return {
+        "count": count,
+        "total_pages": None,
+        "current_page": None,
+        "next": encode_cursor(rows[-1], 'next') if rows and has_next else None,
+        "prev": encode_cursor(rows[0], 'prev') if rows and has_prev else None,
+        "data": rows
+    }
+
+
+def cursor_paginate(queryset, request):
+    """
+    Keyset pagination over (created_at, id) descending.
+
+    Every page is a single indexed range scan, so deep pages cost the same as the
+    first one. The total count is skipped unless requested with `count=exact`
+    or `count=estimate`.
+    """
+    count_mode = _count_mode(request)
+    if count_mode == 'exact':
+        count = queryset.count()
+    elif count_mode == 'estimate':
+        count = estimate_count(queryset)
+    else:
+        count = None
+
+    page, per_page, direction, token = _cursor_page(queryset, request)
+    return _cursor_result(list(page), per_page, direction, token, count)
+
+
+async def apaginate(queryset, request):
+    """Async counterpart of paginate() built on the async ORM methods."""
+    if 'cursor' in request.GET or request.GET.get('pagination') == 'cursor':
+        count_mode = _count_mode(request)
+        if count_mode == 'exact':
+            count = await queryset.acount()
+        elif count_mode == 'estimate':
+            count = await sync_to_async(estimate_count)(queryset)
+        else:
+            count = None
+
+        page, per_page, direction, token = _cursor_page(queryset, request)
+        return _cursor_result([row async for row in page], per_page, direction, token, count)
+
+    queryset    = queryset.order_by('-created_at', '-id')
+    page        = _int_param(request, 'page', 1)
+    per_page    = _per_page(request)
+    count       = await queryset.acount()
+    total_pages = max(1, math.ceil(count / per_page))
+    page        = max(1, min(page, total_pages))
+    offset      = (page - 1) * per_page
+    return {
+        "count": count,
+        "total_pages": total_pages,
+        "current_page": page,
+        "data": [row async for row in queryset[offset:offset + per_page]]
+    }
+
+
+def _merged(row_lists, descending, limit):
+    """The first `limit` rows of lists each already ordered by (created_at, id)."""
+    rows = heapq.merge(*row_lists, key=lambda row: (row.created_at, row.pk), reverse=descending)
+    return list(itertools.islice(rows, limit))
+
+
+def _merged_count(counts):
+    return None if None in counts else sum(counts)
+
+
+def paginate_merged(querysets, request):
+    """
+    Keyset pagination over querysets of the same shape with disjoint ids, as if
+    they were one: each is read through its own (created_at, id) index and the
+    pages are merged. Always cursor paginated, whatever `page` asks for, so a
+    request never reads more than perPage + 1 rows from each queryset.
+    """
+    if len(querysets) == 1:
+        return paginate(querysets[0], request)
+
+    count_mode = _count_mode(request)
+    if count_mode == 'exact':
+        count = sum(queryset.count() for queryset in querysets)
+    elif count_mode == 'estimate':
+        count = _merged_count([estimate_count(queryset) for queryset in querysets])
+    else:
+        count = None
+
+    pages = [_cursor_page(queryset, request) for queryset in querysets]
+    _, per_page, direction, token = pages[0]
+    rows = _merged([list(page) for page, *_ in pages], direction == 'next', per_page + 1)
+    return _cursor_result(rows, per_page, direction, token, count)
+
+
+async def apaginate_merged(querysets, request):
+    """Async counterpart of paginate_merged()."""
+    if len(querysets) == 1:
+        return await apaginate(querysets[0], request)
+
+    count_mode = _count_mode(request)
+    if count_mode == 'exact':
+        count = sum([await queryset.acount() for queryset in querysets])
+    elif count_mode == 'estimate':
+        count = _merged_count([await sync_to_async(estimate_count)(queryset) for queryset in querysets])
+    else:
+        count = None
+
+    pages = [_cursor_page(queryset, request) for queryset in querysets]
+    _, per_page, direction, token = pages[0]
+    rows = _merged([[row async for row in page] for page, *_ in pages], direction == 'next', per_page + 1)
+    return _cursor_result(rows, per_page, direction, token, count)